@@ -0,0 +1,34 @@
+## @file: area_frames.py
+# @brief: This script shows how to get the images of an area sensor while a continuous measurement is running.
+# @details: The samples of every block are assembled into frames of fft_lines / lines_binning lines in a worker thread. The newest frame of every batch is shown until the window is closed. This example is written for 1 camera on 1 PCIe board with fft_mode = 2 in config.ini.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released as public domain under the Unlicense.
+
+import stresing
+# matplotlib is used for the image
+import matplotlib.pyplot as plt
+
+# Always use board 0. There is only one PCIe board in this example script.
+drvno = 0
+stresing.init_driver()
+# Set all settings that are needed for the measurement in config.ini. nos should be a multiple of the lines per frame.
+stresing.load_config_file("config.ini")
+stresing.settings.contiuous_measurement = 1
+# At most 4 batches of frames are kept. When the display is too slow, older frames are dropped.
+assembler = stresing.FrameAssembler(drvno=drvno, camera=0, maxsize=4)
+image = None
+with stresing.BlockStream([assembler], drvno=drvno):
+	stresing.init_measurement()
+	stresing.start_measurement_nonblocking()
+	for batch in assembler.batches(timeout=5):
+		if image is None:
+			image = plt.imshow(batch.data[-1], aspect="auto")
+		else:
+			image.set_data(batch.data[-1])
+		plt.pause(0.01)
+		if not plt.get_fignums():
+			break
+	stresing.abort_measurement()
+print(f"Frames assembled: {assembler.frames_assembled}, dropped: {assembler.frames_dropped}")
+# Exit the driver
+stresing.exit_driver()
@@ -0,0 +1,26 @@
+## @file: auto_exposure.py
+# @brief: This script finds the exposure time at which the brightest pixels reach 70 % of the ADC range.
+# @details: Instead of sweeping stime over a fixed range, auto_exposure does a few short measurements and interpolates the next stime from the measured fill levels. The found stime is used for the final measurement.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released as public domain under the Unlicense.
+
+import stresing
+
+# Always use board 0. There is only one PCIe board in this example script.
+drvno = 0
+stresing.init_driver()
+# Set all settings that are needed for the measurement in config.ini. The search starts at the stime of the config file.
+stresing.load_config_file("config.ini")
+# Search the stime at which the 99.5 % percentile of every frame reaches 70 % of the 16 bit ADC range
+result = stresing.auto_exposure(drvno, target=0.7, tolerance=0.05, adc_bits=16)
+for i, step in enumerate(result.history):
+	print(f"Measurement {i + 1}: stime = {step.stime} µs, fill level = {step.fill:.3f}, saturated values = {step.saturated_fraction:.2%}")
+if result.converged:
+	print(f"Found stime = {result.stime} µs")
+else:
+	print(f"Target not reached, using stime = {result.stime} µs with fill level {result.fill:.3f}")
+# The chosen stime is already written to stresing.settings
+stresing.init_measurement()
+stresing.start_measurement_blocking()
+# Exit the driver
+stresing.exit_driver()
@@ -0,0 +1,36 @@
+## @file: band_integrator.py
+# @brief: This script integrates three spectral bands of every sample while the measurement is running.
+# @details: Only the band sums are kept, one float per band and sample, instead of the raw spectra. Before the measurement, the processing time of one block is compared with the expected block period. This example is written for 1 camera on 1 PCIe board.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released as public domain under the Unlicense.
+
+import stresing
+# matplotlib is used for the data plot
+import matplotlib.pyplot as plt
+import numpy as np
+
+# Always use board 0. There is only one PCIe board in this example script.
+drvno = 0
+stresing.init_driver()
+# Set all settings that are needed for the measurement in config.ini.
+stresing.load_config_file("config.ini")
+# Two bands with equal weights and one band weighted with a triangle
+integrator = stresing.BandIntegrator([(100, 20), (400, 50), stresing.Band(800, 21, weights=1 - np.abs(np.linspace(-1, 1, 21)), name="triangle")])
+# Compare the processing time with the block period of the settings
+cs = stresing.settings.camera_settings[drvno]
+speed = stresing.benchmark_stage(integrator, (stresing.settings.nos, cs.camcnt, cs.pixel))
+integrator.store.clear()
+block_period_s = stresing.plan(log_warnings=False).boards[drvno].block_period_s
+print(f"Processing: {speed['seconds_per_block'] * 1e3:.2f} ms per block, {speed['bytes_per_s'] / 1e9:.2f} GB/s")
+if block_period_s is not None:
+	print(f"Block period: {block_period_s * 1e3:.2f} ms, the integrator uses {speed['seconds_per_block'] / block_period_s:.1%} of it")
+with stresing.BlockStream([integrator], drvno=drvno):
+	stresing.init_measurement()
+	stresing.start_measurement_blocking()
+# Plot the time series of all bands
+for name in integrator.names:
+	plt.plot(integrator.store[name], label=name)
+plt.legend()
+plt.show()
+# Exit the driver
+stresing.exit_driver()
@@ -0,0 +1,33 @@
+## @file: block_stream.py
+# @brief: This script shows how to process every block while the measurement is running.
+# @details: Every block is reduced by summing 10 samples and binning 4 pixels as soon as it is done. Only the reduced data is kept. This example is written for 1 camera on 1 PCIe board.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released as public domain under the Unlicense.
+
+import stresing
+# matplotlib is used for the data plot
+import matplotlib.pyplot as plt
+import numpy as np
+
+# Always use board 0. There is only one PCIe board in this example script.
+drvno = 0
+# Initialize the driver.
+stresing.init_driver()
+# Set all settings that are needed for the measurement in config.ini. The file config.ini is also compatible with the exported settings of Escam. Settings that are not found in the file, will be left as default. You can find a description of all settings here: https://entwicklungsburo-stresing.github.io/structmeasurement__settings.html
+stresing.load_config_file("config.ini")
+# Sum every 10 samples and bin 4 adjacent pixels into uint32.
+reducer = stresing.SampleReducer(samples_per_sum=10, pixel_binning=4, dtype=np.uint32)
+# The stream calls the reducer for every finished block in a worker thread.
+with stresing.BlockStream([reducer], drvno=drvno):
+	# Initialize the measurement.
+	stresing.init_measurement()
+	# Start the measurement. This is the blocking call, which means it will return when the measurement is finished.
+	stresing.start_measurement_blocking()
+# The result has the shape (nos * nob / 10, camcnt, pixel / 4)
+reduced = reducer.result()
+print("Reduced data shape: " + str(reduced.shape))
+# Plot the first reduced sample of camera 0
+plt.plot(reduced[0, 0])
+plt.show()
+# Exit the driver
+stresing.exit_driver()
@@ -8,7 +8,6 @@
 import stresing
 # matplotlib is used for the data plot
 import matplotlib.pyplot as plt
-import time
 
 # Initialize the driver.
 number_of_boards = stresing.init_driver()
@@ -18,14 +17,14 @@ stresing.load_config_file("config.ini")
 stresing.init_measurement()
 # Start the measurement. This is the nonblocking call, which means it will return immediately. 
 stresing.start_measurement_nonblocking()
-cur_sample = -2
-cur_block = -2
 # Always use board 0. There is only one PCIe board in this example script.
 drvno = 0
-while cur_sample < stresing.settings.nos-1 or cur_block < stresing.settings.nob-1:
-	(cur_sample, cur_block) = stresing.get_current_scan_number(drvno)
-	print("sample: "+str(cur_sample)+" block: "+str(cur_block))
-	time.sleep(1)
+# Wait until sample 5 of block 0 is measured. The call returns at the end of a block as soon as the block is done and polls within a block every 0.5 ms at most (max_interval), without keeping the CPU busy.
+stresing.wait_for_scan(drvno, 5, 0)
+(cur_sample, cur_block) = stresing.get_current_scan_number(drvno)
+print("sample: "+str(cur_sample)+" block: "+str(cur_block))
+# Wait until the whole measurement is done.
+stresing.wait_measurement_done()
 frame_buffer = stresing.copy_one_sample(drvno, 5, 0 ,0)
 # Plot the frame
 plt.plot(frame_buffer)
@@ -1,6 +1,6 @@
 ## @file: sensor_reset_sweep.py
 # @brief: This script does a sweep of the parameter sensor reset.
-# @details:
+# @details: The sweep starts with a coarse grid and adds points where the plotted pixel changes most, so the steep part of the curves is resolved without measuring the flat parts with the same step size.
 # @author: Florian Hahn
 # @date: 25.06.2025
 # @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released as public domain under the Unlicense.
@@ -17,21 +17,12 @@ stresing.init_driver()
 stresing.load_config_file("config.ini")
 stresing.settings.camera_settings[drvno].sensor_reset_or_hsir_ec = 0
 stresing.settings.camera_settings[drvno].sec_in_10ns = 0
-# create an empty list to store the data
-list_x = []
-list_y1 = []
-list_y2 = []
-list_y3 = []
-list_y4 = []
 # plot this pixel
 pixel_plot = 506
 # this is the reset time at which the sweep starts
 start_value = stresing.settings.camera_settings[drvno].sensor_reset_or_hsir_ec
-# this is the exposure time at which the sweep stops
+# this is the reset time at which the sweep stops
 stop_value = 11500
-# this is the step size for the first measurements
-step_size = 100
-measurement_cnt = int((stop_value - start_value) / step_size)
 
 print("Create a measurement with reset time 0")
 # Initialize the measurement.
@@ -62,35 +53,24 @@ plt.grid(True)
 plt.tight_layout()
 plt.show()
 
-for i in range(measurement_cnt):
-	print("Measurement " + str(i + 1) + " of " + str(measurement_cnt) + ", sensor reset = " + str(stresing.settings.camera_settings[drvno].sensor_reset_or_hsir_ec) + " (" + str(stresing.settings.camera_settings[drvno].sensor_reset_or_hsir_ec * 4) +" ns)")
-	# Initialize the measurement.
-	stresing.init_measurement()
-	# Start the measurement. This is the blocking call, which means it will return when the measurement is finished. This is done to ensure that no data access happens before all data is collected.
-	stresing.start_measurement_blocking()
-	list_x.append(stresing.settings.camera_settings[drvno].sensor_reset_or_hsir_ec * 4)
-	# Get all the data in a 2D list
-	frame_buffer_2d = stresing.copy_all_data_2d(drvno)
-	# Drop the first 200 samples
-	frame_buffer_2d = frame_buffer_2d[200:]
-	# Calculate the 4 averages of every 4th row of frame_buffer_2d
-	import numpy as np
-	avg0 = np.mean([row for i, row in enumerate(frame_buffer_2d) if i % 4 == 0], axis=0)
-	avg1 = np.mean([row for i, row in enumerate(frame_buffer_2d) if i % 4 == 1], axis=0)
-	avg2 = np.mean([row for i, row in enumerate(frame_buffer_2d) if i % 4 == 2], axis=0)
-	avg3 = np.mean([row for i, row in enumerate(frame_buffer_2d) if i % 4 == 3], axis=0)
-	list_y1.append(avg0[pixel_plot])
-	list_y2.append(avg1[pixel_plot])
-	list_y3.append(avg2[pixel_plot])
-	list_y4.append(avg3[pixel_plot])
-	stresing.settings.camera_settings[drvno].sensor_reset_or_hsir_ec += step_size
+# Read only the plotted pixel of block 0, camera 0 after each measurement, drop the first 200 samples and return the 4 averages of every 4th sample
+def read_pixel(drvno):
+	pixel_series = stresing.probe(drvno, pixel_plot, samples=slice(200, None))
+	averages = [pixel_series[i::4].mean() for i in range(4)]
+	print("sensor reset = " + str(stresing.settings.camera_settings[drvno].sensor_reset_or_hsir_ec * 4) + " ns, averages of pixel " + str(pixel_plot) + " = " + str(averages))
+	return averages
+
+# Measure 60 points: 9 on an even grid, the others where the 4 curves change most
+result = stresing.adaptive_sweep("sensor_reset_or_hsir_ec", start_value, stop_value, read_pixel, drvno=drvno, initial_points=9, max_points=60)
+list_x = result.values * 4
+list_y1, list_y2, list_y3, list_y4 = result.results.T
 
 # Plot all four lists as separate graphs in one figure
 plt.figure(figsize=(10, 8))
-plt.plot(list_x, list_y1, label='On 1')
-plt.plot(list_x, list_y2, label='On 2')
-plt.plot(list_x, list_y3, label='Off 1')
-plt.plot(list_x, list_y4, label='Off 2')
+plt.plot(list_x, list_y1, marker='.', label='On 1')
+plt.plot(list_x, list_y2, marker='.', label='On 2')
+plt.plot(list_x, list_y3, marker='.', label='Off 1')
+plt.plot(list_x, list_y4, marker='.', label='Off 2')
 plt.xlabel('sensor reset in ns')
 plt.ylabel('Pixel Value')
 plt.title('Sensor Reset Sweep - Pixel ' + str(pixel_plot))
@@ -99,6 +79,8 @@ plt.legend()
 plt.tight_layout()
 plt.show()
 
+# adaptive_sweep restores the setting, measure once more at the end of the sweep
+stresing.settings.camera_settings[drvno].sensor_reset_or_hsir_ec = stop_value
 print("Create a measurement with reset time " + str(stresing.settings.camera_settings[drvno].sensor_reset_or_hsir_ec * 4) + " ns")
 # Initialize the measurement.
 stresing.init_measurement()
@@ -1,11 +1,10 @@
 ## @file: shutter.py
 # @brief: This script is closing and opening all shutters 10 times once per second.
-# @details:
+# @details: The transitions are executed by a ShutterSequencer with absolute deadlines. At the end the deviation of the transitions from their deadlines is printed.
 # @author: Florian Hahn
 # @date: 19.06.2025
 # @copyright: Copyright (c) 202, Entwicklungsbüro Stresing. Released as public domain under the Unlicense.
 
-import time
 import stresing
 
 # Always use board 0. There is only one PCIe board in this example script.
@@ -13,22 +12,21 @@ drvno = 0
 
 stresing.init_driver()
 
-# Loop for closing and opening all shutters 10 times once per second
+# Timeline for opening and closing all shutters 10 times once per second: (time in seconds, shutter states)
+# 15 = 0b00001111, which means all shutters are set to closed, 0 means all shutters are open
+timeline = []
 for i in range(10):
-	print("Open")
-	# Set all shutters to open
-	stresing.set_shutter_states(drvno, 0)
-	
-	# Wait for 1 second
-	time.sleep(1)
+	timeline.append((2 * i, 0))
+	timeline.append((2 * i + 1, 15))
 
-	print("Close")
-	# Set all shutters to closed
-	# 15 = 0b00001111, which means all shutters are set to open
-	stresing.set_shutter_states(drvno, 15)
+# The sequencer sets the shutter states from its own thread
+with stresing.ShutterSequencer(timeline, drvno) as sequencer:
+	sequencer.wait()
 
-	# Wait for 1 second
-	time.sleep(1)
+# Print the deviation of the transitions from the schedule
+for entry in sequencer.log:
+	print(f"{'Close' if entry.states else 'Open'}: {entry.error_ns / 1000:.1f} us late")
+print(sequencer.jitter())
 
 # Exit the driver
 stresing.exit_driver()
\ No newline at end of file
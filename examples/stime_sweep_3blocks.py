@@ -29,10 +29,10 @@ for i in range(measurement_cnt1):
 	stresing.init_measurement()
 	# Start the measurement. This is the blocking call, which means it will return when the measurement is finished. This is done to ensure that no data access happens before all data is collected.
 	stresing.start_measurement_blocking()
-	# Get the data of one frame. Sample settings.nos-1, block 0, camera 0
-	frame_buffer = stresing.copy_one_sample(drvno, stresing.settings.nos-1, 0, 0)
+	# Read only the plotted pixel of sample settings.nos-1, block 0, camera 0
+	pixel_value = stresing.probe(drvno, pixel_plot, samples=stresing.settings.nos-1, block=0, camera=0)[0]
 	list_x.append(stresing.settings.camera_settings[drvno].stime)
-	list_y.append(frame_buffer[pixel_plot])
+	list_y.append(pixel_value)
 	stresing.settings.camera_settings[drvno].stime += step_size1
 
 
@@ -44,10 +44,10 @@ for i in range(measurement_cnt2):
 	stresing.init_measurement()
 	# Start the measurement. This is the blocking call, which means it will return when the measurement is finished. This is done to ensure that no data access happens before all data is collected.
 	stresing.start_measurement_blocking()
-	# Get the data of one frame. Sample settings.nos-1, block 0, camera 0
-	frame_buffer = stresing.copy_one_sample(drvno, stresing.settings.nos-1, 0, 0)
+	# Read only the plotted pixel of sample settings.nos-1, block 0, camera 0
+	pixel_value = stresing.probe(drvno, pixel_plot, samples=stresing.settings.nos-1, block=0, camera=0)[0]
 	list_x.append(stresing.settings.camera_settings[drvno].stime)
-	list_y.append(frame_buffer[pixel_plot])
+	list_y.append(pixel_value)
 	stresing.settings.camera_settings[drvno].stime += step_size2
 
 measurement_cnt3= 25
@@ -58,10 +58,10 @@ for i in range(measurement_cnt3):
 	stresing.init_measurement()
 	# Start the measurement. This is the blocking call, which means it will return when the measurement is finished. This is done to ensure that no data access happens before all data is collected.
 	stresing.start_measurement_blocking()
-	# Get the data of one frame. Sample settings.nos-1, block 0, camera 0
-	frame_buffer = stresing.copy_one_sample(drvno, stresing.settings.nos-1, 0, 0)
+	# Read only the plotted pixel of sample settings.nos-1, block 0, camera 0
+	pixel_value = stresing.probe(drvno, pixel_plot, samples=stresing.settings.nos-1, block=0, camera=0)[0]
 	list_x.append(stresing.settings.camera_settings[drvno].stime)
-	list_y.append(frame_buffer[pixel_plot])
+	list_y.append(pixel_value)
 	stresing.settings.camera_settings[drvno].stime += step_size3
 
 # Plot
@@ -1,2 +1,19 @@
 from .core import *
-
+from .correction import *
+from .stream import *
+from .reduction import *
+from .timing import *
+from .multiboard import *
+from .preview import *
+from .peaks import *
+from .planner import *
+from .replay import *
+from .registers import *
+from .sequencer import *
+from .exposure import *
+from .sweep import *
+from .pixel_health import *
+from .wavelength import *
+from .frames import *
+from .trigger import *
+from .bands import *
@@ -0,0 +1,10 @@
+## @file: __main__.py
+# @brief: Entry point of "python -m stresing", see cli.py.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,236 @@
+## @file: bands.py
+# @brief: Integration of spectral bands while the measurement is running.
+# @details: The BandIntegrator stage reduces every sample of every block to the weighted sums of a few pixel ranges with one matrix multiplication per chunk of samples. The results are appended to a ColumnStore, which keeps one growable array per column, so a long measurement is reduced to a few values per sample.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .stream import BlockStage
+from .timing import BlockTimestamps
+
+__all__ = ["Band", "ColumnStore", "BandIntegrator"]
+
+# Size of the float32 copy of the samples that is multiplied at once in bytes.
+_CHUNK_BYTES = 256 * 1024
+
+@dataclass
+class Band:
+	"""
+	One spectral band.
+
+	Attributes:
+		start (int): First pixel.
+		length (int): Number of pixels.
+		camera (int): Camera number.
+		weights (Sequence[float], optional): Weight of each pixel. When None, all pixels have the weight 1.
+		name (str, optional): Name of the column in the store. When None, "band<i>" is used.
+	"""
+	start: int
+	length: int
+	camera: int = 0
+	weights: Optional[Sequence[float]] = None
+	name: Optional[str] = None
+
+class ColumnStore:
+	"""
+	Table with one growable numpy array per column. Rows are appended in chunks, the arrays grow by doubling, so appending is amortized constant time.
+	"""
+	def __init__(self, columns: Dict[str, object], capacity: int = 1024):
+		"""
+		Args:
+			columns (Dict[str, object]): Name and numpy dtype of each column.
+			capacity (int): Number of preallocated rows.
+		"""
+		self._columns = {name: np.empty(max(capacity, 1), dtype=dtype) for name, dtype in columns.items()}
+		self.rows = 0
+
+	@property
+	def columns(self) -> List[str]:
+		return list(self._columns)
+
+	def _ensure_capacity(self, rows: int):
+		capacity = next(iter(self._columns.values())).size
+		if rows <= capacity:
+			return
+		capacity = max(rows, 2 * capacity)
+		for name, column in self._columns.items():
+			grown = np.empty(capacity, dtype=column.dtype)
+			grown[:self.rows] = column[:self.rows]
+			self._columns[name] = grown
+
+	def append(self, values: Dict[str, np.ndarray]):
+		"""
+		Append rows.
+
+		Args:
+			values (Dict[str, numpy.ndarray]): Values of each column with the same length. Scalars are repeated for all rows.
+		"""
+		rows = max(np.size(value) for value in values.values())
+		self._ensure_capacity(self.rows + rows)
+		for name, column in self._columns.items():
+			column[self.rows:self.rows + rows] = values[name]
+		self.rows += rows
+
+	def __getitem__(self, name: str) -> np.ndarray:
+		"""
+		View of the filled rows of one column. It is invalid after the next append that grows the store.
+		"""
+		return self._columns[name][:self.rows]
+
+	def __len__(self) -> int:
+		return self.rows
+
+	def as_dict(self) -> Dict[str, np.ndarray]:
+		"""
+		Copy of all columns.
+		"""
+		return {name: column[:self.rows].copy() for name, column in self._columns.items()}
+
+	def save(self, path: str, timestamps: Optional[BlockTimestamps] = None):
+		"""
+		Save all columns. Files ending with .csv are written as text with one line per row, everything else as .npz.
+
+		Args:
+			path (str): File path.
+			timestamps (BlockTimestamps, optional): Block timestamps of the measurement, they are exported next to the file in the same format, see BlockTimestamps.export.
+		"""
+		data = self.as_dict()
+		csv = path.endswith(".csv")
+		if csv:
+			np.savetxt(path, np.column_stack(list(data.values())), delimiter=",", header=",".join(data), comments="")
+		else:
+			np.savez(path, **data)
+		if timestamps is not None:
+			timestamps.export(path, csv)
+
+	def clear(self):
+		"""
+		Remove all rows and keep the capacity.
+		"""
+		self.rows = 0
+
+class BandIntegrator(BlockStage):
+	"""
+	Stage for BlockStream that integrates spectral bands in every sample. All bands are combined in one weight matrix. The pixels of the bands are copied next to each other and converted to float32 in chunks of samples that fit into the cache, and each chunk is multiplied with the matrix. Pixels outside of the bands are not read. Usage:
+
+		integrator = stresing.BandIntegrator([(100, 20), (400, 50), stresing.Band(800, 10, camera=1, name="reference")])
+		with stresing.BlockStream([integrator]):
+			stresing.init_measurement()
+			stresing.start_measurement_blocking()
+		bands = integrator.store["band0"]
+
+	Attributes:
+		bands (List[Band]): The bands.
+		store (ColumnStore): "block" and "sample" of each processed sample and one float32 column per band.
+	"""
+	def __init__(self, bands: Sequence[Union[Band, Tuple[int, int], Tuple[int, int, int]]], capacity: int = 1024):
+		"""
+		Args:
+			bands: Band objects or tuples (start, length) or (start, length, camera).
+			capacity (int): Number of preallocated rows of the store.
+		"""
+		if not bands:
+			raise ValueError("At least one band is needed")
+		self.bands: List[Band] = [band if isinstance(band, Band) else Band(*band) for band in bands]
+		for i, band in enumerate(self.bands):
+			if band.length < 1 or band.start < 0:
+				raise ValueError(f"Band {i} has an invalid range ({band.start}, {band.length})")
+			if band.weights is not None and len(band.weights) != band.length:
+				raise ValueError(f"Band {i} has {len(band.weights)} weights for {band.length} pixels")
+		self.names = [band.name if band.name is not None else f"band{i}" for i, band in enumerate(self.bands)]
+		if len(set(self.names)) != len(self.names) or {"block", "sample"} & set(self.names):
+			raise ValueError("The band names must be unique and not block or sample")
+		self.store = ColumnStore({"block": np.int64, "sample": np.int64, **{name: np.float32 for name in self.names}}, capacity)
+		self._matrix: Optional[np.ndarray] = None
+		self._segments: List[Tuple[int, int]] = []
+		self._shape: Optional[Tuple[int, int]] = None
+		self._scratch: Optional[np.ndarray] = None
+		self._result: Optional[np.ndarray] = None
+
+	def weight_matrix(self, camcnt: int, pixel: int) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
+		"""
+		Weight matrix of all bands for samples with camcnt cameras of pixel pixels. Overlapping and adjacent bands are merged into segments, only the pixels of the segments are multiplied.
+
+		Returns:
+			Tuple[numpy.ndarray, List[Tuple[int, int]]]: float32 matrix with the shape (pixels of all segments, bands) and the segments as (start, stop) of flat indices into a (camcnt * pixel) sample, in the order of the rows of the matrix.
+		"""
+		if self._shape == (camcnt, pixel):
+			return self._matrix, self._segments
+		ranges = []
+		for i, band in enumerate(self.bands):
+			if band.camera >= camcnt or band.start + band.length > pixel:
+				raise ValueError(f"Band {i} is outside of {camcnt} cameras with {pixel} pixels")
+			first = band.camera * pixel + band.start
+			ranges.append((first, first + band.length))
+		segments: List[List[int]] = []
+		for start, stop in sorted(ranges):
+			if segments and start <= segments[-1][1]:
+				segments[-1][1] = max(segments[-1][1], stop)
+			else:
+				segments.append([start, stop])
+		# Row of the first pixel of each segment in the matrix.
+		offsets = np.cumsum([0] + [stop - start for start, stop in segments])
+		matrix = np.zeros((offsets[-1], len(self.bands)), dtype=np.float32)
+		for i, ((first, _), band) in enumerate(zip(ranges, self.bands)):
+			segment = next(j for j, (start, stop) in enumerate(segments) if start <= first < stop)
+			row = offsets[segment] + first - segments[segment][0]
+			matrix[row:row + band.length, i] = 1 if band.weights is None else band.weights
+		self._matrix, self._segments, self._shape = matrix, [tuple(segment) for segment in segments], (camcnt, pixel)
+		return self._matrix, self._segments
+
+	def integrate(self, data: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+		"""
+		Integrate the bands of samples.
+
+		Args:
+			data (numpy.ndarray): Samples with the shape (samples, camcnt, pixel).
+			out (numpy.ndarray, optional): float32 array with the shape (samples, bands) for the result.
+
+		Returns:
+			numpy.ndarray: float32 array with the shape (samples, bands).
+		"""
+		matrix, segments = self.weight_matrix(data.shape[1], data.shape[2])
+		frames = data.reshape(data.shape[0], -1)
+		if out is None:
+			out = np.empty((data.shape[0], matrix.shape[1]), dtype=np.float32)
+		rows = max(1, _CHUNK_BYTES // (matrix.shape[0] * 4))
+		if self._scratch is None or self._scratch.shape[1] != matrix.shape[0]:
+			self._scratch = np.empty((rows, matrix.shape[0]), dtype=np.float32)
+		for first in range(0, data.shape[0], rows):
+			last = min(first + rows, data.shape[0])
+			scratch = self._scratch[:last - first]
+			# Only the pixels of the bands are converted to float32, next to each other.
+			column = 0
+			for start, stop in segments:
+				np.copyto(scratch[:, column:column + stop - start], frames[first:last, start:stop])
+				column += stop - start
+			np.matmul(scratch, matrix, out=out[first:last])
+		return out
+
+	def process_block(self, block: int, data: np.ndarray) -> None:
+		"""
+		Stage interface for BlockStream. Integrates the bands of all samples of the block and appends them to the store.
+
+		Args:
+			block (int): Block number.
+			data (numpy.ndarray): Block data with the shape (nos, camcnt, pixel).
+		"""
+		if self._result is None or self._result.shape[0] != data.shape[0]:
+			self._result = np.empty((data.shape[0], len(self.bands)), dtype=np.float32)
+		result = self.integrate(data, out=self._result)
+		values = {"block": block, "sample": np.arange(data.shape[0])}
+		values.update((name, result[:, i]) for i, name in enumerate(self.names))
+		self.store.append(values)
+
+	def result(self) -> Dict[str, np.ndarray]:
+		"""
+		Get all integrated bands.
+
+		Returns:
+			Dict[str, numpy.ndarray]: Copy of all columns of the store.
+		"""
+		return self.store.as_dict()
@@ -0,0 +1,355 @@
+## @file: cli.py
+# @brief: Command line interface of the stresing module.
+# @details: "python -m stresing capture" loads a config file, measures a number of blocks and streams every block of all selected boards to one raw file. Blocks are copied from the DLL buffer into aligned staging buffers and written by a second thread, so copying the next block overlaps with writing the previous one. Where the operating system supports it, the file is opened with O_DIRECT and written in aligned chunks that bypass the page cache.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import argparse
+import json
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import core
+from .planner import plan
+from .timing import BlockTimestamps
+
+__all__ = ["CaptureWriter", "main"]
+
+# Alignment of buffers, file offsets and write sizes for O_DIRECT. 4096 covers the logical block size of common disks.
+_ALIGNMENT = 4096
+_MB = 1024 * 1024
+
+def _aligned_buffer(size: int) -> np.ndarray:
+	"""
+	uint8 array of size bytes whose address is a multiple of _ALIGNMENT.
+	"""
+	raw = np.empty(size + _ALIGNMENT, dtype=np.uint8)
+	offset = -raw.ctypes.data % _ALIGNMENT
+	return raw[offset:offset + size]
+
+class CaptureWriter:
+	"""
+	Writes every finished block of the selected boards to one raw file while the measurement is running. Each record of the file is one block of all boards in the order of the boards, without header, so the file can be read with numpy.fromfile and the shapes from the metadata file.
+
+	The block done hook queues the block, a copy thread copies it from the DLL buffer into one of the staging buffers and a write thread writes full staging buffers to the file. In continuous mode, a block is overwritten by the DLL when the block nob blocks later starts. Blocks that were overwritten before they were copied completely are counted as overruns.
+
+	Attributes:
+		blocks_written (int): Number of blocks that were copied to the staging buffers.
+		bytes_written (int): Number of bytes written to the file.
+		overruns (int): Number of blocks that were overwritten before they were copied.
+		max_backlog (int): Largest number of blocks that waited for the copy thread.
+		direct (bool): True when the file is written with O_DIRECT.
+	"""
+	def __init__(self, path: str, boards: Optional[Sequence[int]] = None, max_blocks: Optional[int] = None, buffer_bytes: int = 8 * _MB, buffers: int = 2, direct: bool = True):
+		"""
+		Args:
+			path (str): File path of the raw data.
+			boards (Sequence[int], optional): Board numbers. When None, the boards selected by settings.board_sel are used.
+			max_blocks (int, optional): Stop queueing blocks after this number of blocks. None queues all blocks.
+			buffer_bytes (int): Size of each staging buffer. It is rounded up to the alignment and to at least one record.
+			buffers (int): Number of staging buffers, at least 2.
+			direct (bool): Use O_DIRECT where the operating system and the file system support it.
+		"""
+		self.path = path
+		self.boards = list(boards) if boards is not None else core.selected_boards()
+		if not self.boards:
+			raise ValueError("No board selected")
+		self.max_blocks = max_blocks
+		self.use_direct = direct
+		ms = core.settings
+		self.nob = int(ms.nob)
+		self.continuous = bool(ms.contiuous_measurement)
+		self.block_shape = {drvno: (int(ms.nos), int(ms.camera_settings[drvno].camcnt), int(ms.camera_settings[drvno].pixel)) for drvno in self.boards}
+		self.record_bytes = sum(int(np.prod(shape)) * 2 for shape in self.block_shape.values())
+		buffer_bytes = max(buffer_bytes, self.record_bytes)
+		buffer_bytes += -buffer_bytes % _ALIGNMENT
+		self._buffers: List[np.ndarray] = [_aligned_buffer(buffer_bytes) for _ in range(max(buffers, 2))]
+		self._free: "queue.Queue[np.ndarray]" = queue.Queue()
+		# Full staging buffers with the number of valid bytes.
+		self._full: "queue.Queue[Optional[Tuple[np.ndarray, int]]]" = queue.Queue()
+		self._blocks: "queue.Queue[Optional[int]]" = queue.Queue()
+		self._lock = threading.Lock()
+		self.blocks_queued = 0
+		self.blocks_started = 0
+		self.blocks_written = 0
+		self.bytes_written = 0
+		self.overruns = 0
+		self.max_backlog = 0
+		self.direct = False
+		self.records: List[int] = []
+		self._fd: Optional[int] = None
+		self._threads: List[threading.Thread] = []
+		self._error: Optional[BaseException] = None
+
+	@property
+	def backlog(self) -> int:
+		"""
+		Number of blocks that wait for the copy thread.
+		"""
+		return self._blocks.qsize()
+
+	def _open(self) -> int:
+		flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+		if self.use_direct and hasattr(os, "O_DIRECT"):
+			try:
+				fd = os.open(self.path, flags | os.O_DIRECT)
+				self.direct = True
+				return fd
+			except OSError:
+				# Some file systems, e.g. tmpfs, do not support O_DIRECT.
+				core.logger.debug(f"O_DIRECT is not supported for {self.path}, using buffered writes")
+		return os.open(self.path, flags)
+
+	def _on_block_start(self, block: int):
+		self.blocks_started += 1
+
+	def _on_block_done(self, block: int):
+		with self._lock:
+			if self.max_blocks is not None and self.blocks_queued >= self.max_blocks:
+				return
+			self.blocks_queued += 1
+		self._blocks.put(block)
+		self.max_backlog = max(self.max_backlog, self._blocks.qsize())
+
+	def _copy(self):
+		buffer = self._free.get()
+		filled = 0
+		row = 0
+		try:
+			while True:
+				block = self._blocks.get()
+				if block is None:
+					break
+				index = block % self.nob
+				for drvno in self.boards:
+					source = core.get_block_array(drvno, index).reshape(-1).view(np.uint8)
+					offset = 0
+					while offset < source.size:
+						length = min(source.size - offset, buffer.size - filled)
+						buffer[filled:filled + length] = source[offset:offset + length]
+						filled += length
+						offset += length
+						if filled == buffer.size:
+							self._full.put((buffer, filled))
+							buffer = self._free.get()
+							filled = 0
+				# The block was overwritten when the DLL started the block nob blocks after it.
+				if self.continuous and self.blocks_started > row + self.nob:
+					self.overruns += 1
+				self.records.append(block)
+				self.blocks_written += 1
+				row += 1
+		except BaseException as e:
+			self._error = e
+			core.logger.exception("Copying blocks failed")
+		self._full.put((buffer, filled))
+		self._full.put(None)
+
+	def _write(self):
+		while True:
+			item = self._full.get()
+			if item is None:
+				return
+			buffer, size = item
+			if self._error is None:
+				try:
+					self._write_buffer(buffer, size)
+				except BaseException as e:
+					self._error = e
+					core.logger.exception(f"Writing {self.path} failed")
+			self._free.put(buffer)
+
+	def _write_all(self, buffer: np.ndarray):
+		view = memoryview(buffer)
+		while view:
+			written = os.write(self._fd, view)
+			view = view[written:]
+			self.bytes_written += written
+
+	def _write_buffer(self, buffer: np.ndarray, size: int):
+		"""
+		Write the first size bytes of a staging buffer. Only the last buffer can have a size that is not aligned. With O_DIRECT it is padded with zeros to the alignment and the file is truncated to the real size afterwards.
+		"""
+		padding = -size % _ALIGNMENT if self.direct else 0
+		buffer[size:size + padding] = 0
+		self._write_all(buffer[:size + padding])
+		if padding:
+			self.bytes_written -= padding
+			os.ftruncate(self._fd, self.bytes_written)
+
+	def start(self):
+		"""
+		Open the file, start the threads and listen to the block hooks. Call this after init_measurement and before start_measurement_*.
+		"""
+		if self._fd is not None:
+			return
+		self._fd = self._open()
+		for buffer in self._buffers:
+			self._free.put(buffer)
+		self._threads = [threading.Thread(target=self._copy, name="stresing-capture-copy", daemon=True), threading.Thread(target=self._write, name="stresing-capture-write", daemon=True)]
+		for thread in self._threads:
+			thread.start()
+		core.add_hook_listener("block_start", self._on_block_start)
+		core.add_hook_listener("block_done", self._on_block_done)
+
+	def stop(self):
+		"""
+		Stop listening to the hooks, write all queued blocks and close the file.
+
+		Raises:
+			Exception: The first error that occurred while copying or writing.
+		"""
+		if self._fd is None:
+			return
+		core.remove_hook_listener("block_start", self._on_block_start)
+		core.remove_hook_listener("block_done", self._on_block_done)
+		self._blocks.put(None)
+		for thread in self._threads:
+			thread.join()
+		self._threads = []
+		os.close(self._fd)
+		self._fd = None
+		if self._error is not None:
+			raise self._error
+
+	def __enter__(self) -> "CaptureWriter":
+		self.start()
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.stop()
+
+	def metadata(self) -> dict:
+		"""
+		Description of the raw file, written next to it as JSON.
+		"""
+		return {
+			"dtype": "uint16",
+			"boards": self.boards,
+			"block_shape": {str(drvno): shape for drvno, shape in self.block_shape.items()},
+			"record_bytes": self.record_bytes,
+			"blocks": self.blocks_written,
+			"records": self.records,
+			"overruns": self.overruns,
+		}
+
+def _parse_boards(text: Optional[str]) -> Optional[List[int]]:
+	if text is None:
+		return None
+	return [int(drvno) for drvno in text.split(",") if drvno.strip()]
+
+def _apply_arguments(args: argparse.Namespace):
+	"""
+	Apply the command line options to the settings.
+	"""
+	ms = core.settings
+	if args.boards is not None:
+		ms.board_sel = sum(1 << drvno for drvno in args.boards)
+	if args.blocks is not None:
+		if args.blocks < 1:
+			raise ValueError("--blocks must be at least 1")
+		# Up to nob blocks fit into the buffer of the DLL, more blocks are measured in continuous mode with the buffer as ring.
+		if args.blocks <= ms.nob:
+			ms.nob = args.blocks
+			ms.contiuous_measurement = 0
+		else:
+			ms.contiuous_measurement = 1
+
+def _dry_run(args: argparse.Namespace) -> int:
+	measurement = plan(log_warnings=False)
+	print(measurement.summary())
+	blocks = args.blocks if args.blocks is not None else core.settings.nob
+	record_bytes = sum(board.bytes_per_block for board in measurement.boards.values())
+	total = record_bytes * blocks
+	print(f"Capture: {blocks} blocks of {record_bytes / _MB:.3f} MB, {total / _MB:.1f} MB on disk")
+	rate = measurement.data_rate_bytes_per_s
+	if rate:
+		print(f"Projected duration: {total / rate:.1f} s at {rate / _MB:.2f} MB/s")
+	directory = os.path.dirname(os.path.abspath(args.out))
+	free = shutil.disk_usage(directory).free
+	print(f"Free disk space in {directory}: {free / _MB:.0f} MB")
+	if total > free:
+		print(f"Error: the capture needs {total / _MB:.0f} MB, but only {free / _MB:.0f} MB are free", file=sys.stderr)
+		return 1
+	return 0
+
+def _print_status(writer: CaptureWriter, blocks: int, elapsed: float, last: list, end: str = "\r"):
+	now = time.monotonic()
+	interval = max(now - last[0], 1e-9)
+	rate = (writer.bytes_written - last[1]) / interval / _MB
+	block_rate = (writer.blocks_written - last[2]) / interval
+	last[:] = [now, writer.bytes_written, writer.blocks_written]
+	print(f"{writer.blocks_written}/{blocks} blocks, {elapsed:.1f} s, {rate:.1f} MB/s, {block_rate:.1f} blocks/s, backlog {writer.backlog}, overruns {writer.overruns}   ", end=end, flush=True)
+
+def _capture(args: argparse.Namespace) -> int:
+	core.load_config_file(args.config)
+	_apply_arguments(args)
+	if args.dry_run:
+		return _dry_run(args)
+	core.init_driver()
+	try:
+		blocks = args.blocks if args.blocks is not None else core.settings.nob
+		core.init_measurement()
+		writer = CaptureWriter(args.out, max_blocks=blocks, buffer_bytes=args.buffer_mb * _MB, direct=not args.no_direct)
+		timestamps = BlockTimestamps(writer.boards, capacity=blocks)
+		start = time.monotonic()
+		last = [start, 0, 0]
+		with writer, timestamps:
+			core.start_measurement_nonblocking()
+			while writer.blocks_queued < blocks:
+				# Also ends continuous measurements that were stopped by the DLL.
+				if core.wait_measurement_done(timeout=0):
+					break
+				time.sleep(args.interval)
+				_print_status(writer, blocks, time.monotonic() - start, last)
+			if writer.continuous:
+				core.abort_measurement()
+			else:
+				core.wait_measurement_done(timeout=10)
+		elapsed = time.monotonic() - start
+		_print_status(writer, blocks, elapsed, last, end="\n")
+		print(f"Wrote {writer.bytes_written / _MB:.1f} MB in {elapsed:.1f} s, {writer.bytes_written / _MB / max(elapsed, 1e-9):.1f} MB/s average, {'O_DIRECT' if writer.direct else 'buffered'}, largest backlog {writer.max_backlog} blocks")
+		with open(args.out + ".json", "w") as f:
+			json.dump(writer.metadata(), f)
+		timestamps.export(args.out)
+		if writer.overruns or writer.blocks_written < blocks:
+			print(f"Error: {writer.overruns} blocks were overwritten before they were written, {blocks - writer.blocks_written} blocks are missing", file=sys.stderr)
+			return 1
+		return 0
+	finally:
+		core.exit_driver()
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+	"""
+	Entry point of "python -m stresing".
+
+	Args:
+		argv (Sequence[str], optional): Command line arguments without the program name. When None, sys.argv is used.
+
+	Returns:
+		int: Exit status. 0 on success, 1 when blocks were overwritten or are missing or the disk is too small, 2 for invalid arguments.
+	"""
+	parser = argparse.ArgumentParser(prog="python -m stresing", description="Stresing camera tools")
+	commands = parser.add_subparsers(dest="command", required=True)
+	capture = commands.add_parser("capture", help="Measure blocks and stream them to a raw file", description="Measure blocks of all selected boards and stream them to a raw file. Each record of the file is one block of all boards. The shapes are written to <out>.json and the block timestamps to <out>.timestamps.npz.")
+	capture.add_argument("--config", required=True, help="Config file, see load_config_file")
+	capture.add_argument("--blocks", type=int, help="Number of blocks. More than nob of the config are measured in continuous mode. Default: nob")
+	capture.add_argument("--out", required=True, help="Path of the raw data file")
+	capture.add_argument("--boards", type=_parse_boards, help="Comma separated board numbers. Default: board_sel of the config")
+	capture.add_argument("--buffer-mb", type=int, default=8, help="Size of each of the two staging buffers in MB")
+	capture.add_argument("--no-direct", action="store_true", help="Do not use O_DIRECT")
+	capture.add_argument("--interval", type=float, default=0.5, help="Interval of the status line in seconds")
+	capture.add_argument("--dry-run", action="store_true", help="Only print the data volume, data rate and disk requirement")
+	args = parser.parse_args(argv)
+	try:
+		return _capture(args)
+	except ValueError as e:
+		print(f"Error: {e}", file=sys.stderr)
+		return 2
@@ -10,7 +10,10 @@ from ctypes import c_uint8, POINTER, c_uint32, c_double, Structure, c_char, c_in
 import os
 import logging
 import configparser
-from typing import Callable, List, Tuple
+import threading
+import time
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
 
 logger = logging.getLogger(__name__)
 # Load ESLSCDLL.dll
@@ -96,6 +99,136 @@ class measurement_settings(Structure):
 		("contiuous_measurement", c_uint32),
 		("cont_pause_in_microseconds", c_uint32),
 		("camera_settings", camera_settings * 5)]
+
+def _structure_dtype(ctype: type) -> np.dtype:
+	"""
+	Generate the numpy dtype of a ctypes type from its _fields_, with the offsets and the size of the structure, so it describes the same memory.
+	"""
+	if isinstance(ctype, type) and issubclass(ctype, Structure):
+		names = [name for name, _ in ctype._fields_]
+		return np.dtype({
+			"names": names,
+			"formats": [_structure_dtype(field_type) for _, field_type in ctype._fields_],
+			"offsets": [getattr(ctype, name).offset for name in names],
+			"itemsize": ctypes.sizeof(ctype),
+		})
+	if isinstance(ctype, type) and issubclass(ctype, ctypes.Array):
+		if ctype._type_ is c_char:
+			return np.dtype(f"S{ctype._length_}")
+		# Nested arrays like c_uint32 * 8 * 8 become subarrays with the shape (8, 8).
+		return np.dtype((_structure_dtype(ctype._type_), (ctype._length_,)))
+	return np.dtype(ctype)
+
+# numpy dtypes with the same layout as the settings structs.
+camera_settings_dtype = _structure_dtype(camera_settings)
+measurement_settings_dtype = _structure_dtype(measurement_settings)
+
+def _field_mask(dtype: np.dtype) -> np.ndarray:
+	"""
+	Bool array with one entry per byte of dtype, True for bytes that belong to a field and False for padding.
+	"""
+	mask = np.zeros(dtype.itemsize, dtype=bool)
+	for name in dtype.names:
+		field_dtype, offset = dtype.fields[name][:2]
+		# Arrays of structures like camera_settings * 5 are subarrays, their structure is the base dtype.
+		if field_dtype.base.names is not None:
+			count = int(np.prod(field_dtype.shape)) if field_dtype.shape else 1
+			inner = _field_mask(field_dtype.base)
+			mask[offset:offset + count * inner.size] = np.tile(inner, count)
+		else:
+			mask[offset:offset + field_dtype.itemsize] = True
+	return mask
+
+def _field_bytes(ctype: type) -> int:
+	"""
+	Number of bytes of a ctypes type that belong to fields, without padding.
+	"""
+	if isinstance(ctype, type) and issubclass(ctype, Structure):
+		return sum(_field_bytes(field_type) for _, field_type in ctype._fields_)
+	if isinstance(ctype, type) and issubclass(ctype, ctypes.Array) and ctype._type_ is not c_char:
+		return ctype._length_ * _field_bytes(ctype._type_)
+	return ctypes.sizeof(ctype)
+
+_SETTINGS_FIELD_MASK = _field_mask(measurement_settings_dtype)
+if np.count_nonzero(~_SETTINGS_FIELD_MASK) != ctypes.sizeof(measurement_settings) - _field_bytes(measurement_settings):
+	raise Exception("The padding of measurement_settings_dtype does not match the measurement_settings structure")
+
+class SettingsView:
+	"""
+	Zero-copy numpy view of a measurement_settings structure. Fields are read and written as numpy arrays on the memory of the structure, for all boards at once. Usage:
+
+		view = stresing.SettingsView()
+		view.boards["stime"][:] = 1000
+		view.boards["dac_output"][0, 0] = 55000
+		snapshot = view.copy()
+		...
+		changed = view != snapshot
+
+	Equality and hash compare the bytes of all fields and ignore padding. The hash follows the current content of the structure, so a view must not be changed while it is used as key of a dict or member of a set, use copy for that.
+
+	Attributes:
+		structure (measurement_settings): The structure that is viewed.
+		array (numpy.ndarray): 0-dimensional structured array with the dtype measurement_settings_dtype on the memory of structure.
+	"""
+	def __init__(self, ms: Optional[measurement_settings] = None):
+		"""
+		Args:
+			ms (measurement_settings, optional): The structure. When None, the module settings are used.
+		"""
+		self.structure = settings if ms is None else ms
+		self.array = np.frombuffer(self.structure, dtype=measurement_settings_dtype).reshape(())
+		self._raw = np.frombuffer(self.structure, dtype=np.uint8)
+
+	@property
+	def boards(self) -> np.ndarray:
+		"""
+		Structured array with the shape (5,) of the camera_settings of all boards, e.g. view.boards["stime"] is a uint32 array with the exposure time of each board.
+		"""
+		return self.array["camera_settings"]
+
+	def __getitem__(self, name: str) -> np.ndarray:
+		return self.array[name]
+
+	def __setitem__(self, name: str, value):
+		self.array[name] = value
+
+	def tobytes(self) -> bytes:
+		"""
+		Snapshot of the structure with all padding bytes set to zero. It can be written back with restore.
+		"""
+		raw = self._raw.copy()
+		raw[~_SETTINGS_FIELD_MASK] = 0
+		return raw.tobytes()
+
+	def restore(self, data: bytes):
+		"""
+		Write a snapshot from tobytes back into the structure.
+
+		Args:
+			data (bytes): The snapshot.
+		"""
+		if len(data) != self._raw.size:
+			raise ValueError(f"The snapshot has {len(data)} bytes, the structure {self._raw.size}")
+		self._raw[:] = np.frombuffer(data, dtype=np.uint8)
+
+	def copy(self) -> "SettingsView":
+		"""
+		View of a new copy of the structure.
+		"""
+		return SettingsView(measurement_settings.from_buffer_copy(self.structure))
+
+	def __eq__(self, other) -> bool:
+		if isinstance(other, measurement_settings):
+			other = SettingsView(other)
+		if not isinstance(other, SettingsView):
+			return NotImplemented
+		return bool(np.array_equal(self._raw[_SETTINGS_FIELD_MASK], other._raw[_SETTINGS_FIELD_MASK]))
+
+	def __hash__(self) -> int:
+		return hash(self._raw[_SETTINGS_FIELD_MASK].tobytes())
+
+	def __repr__(self) -> str:
+		return f"SettingsView({self.array!r})"
 	
 def init_settings_struct(ms: measurement_settings):
 	"""
@@ -278,8 +411,10 @@ def start_measurement_blocking():
 
 def start_measurement_nonblocking():
 	"""
-	Start the measurement in non-blocking mode (returns immediately).
+	Start the measurement in non-blocking mode (returns immediately). Use wait_for_scan or wait_measurement_done to wait for the data.
 	"""
+	_install_wait_hooks()
+	_on_wait_measure_start()
 	dll.DLLStartMeasurement_nonblocking()
 
 def abort_measurement():
@@ -374,7 +509,6 @@ def copy_one_block(drvno: int, block: int) -> List[int]:
 		raise Exception(convert_error_code_to_msg(status))
 	return list(frame_buffer0)
 
-import numpy as np
 def copy_one_block_numpy(drvno: int, block: int) -> List[int]:
     """
     Copy one block from the specified board and block number.
@@ -681,6 +815,358 @@ def get_pixel_pointer(drvno: int, pixel: int, sample: int, block: int, camera: i
 		raise Exception(convert_error_code_to_msg(status))
 	return pdest, bytes_to_end_of_buffer.value
 
+def get_all_data_array(drvno: int) -> np.ndarray:
+	"""
+	Get a zero-copy numpy view of all data of the specified board. The view is only valid as long as the DLL keeps the data buffer, so it must not be used after the next init_measurement or exit_driver.
+
+	Args:
+		drvno (int): Board number.
+
+	Returns:
+		numpy.ndarray: The data as numpy.uint16 array with the shape (nob, nos, camcnt, pixel).
+
+	Raises:
+		Exception: If the DLL call returns a non-zero status (error) or the buffer is smaller than the current settings require.
+	"""
+	cs = settings.camera_settings[drvno]
+	shape = (settings.nob, settings.nos, cs.camcnt, cs.pixel)
+	data_pointer, bytes_to_end_of_buffer = get_all_data_pointer(drvno)
+	if int(np.prod(shape)) * ctypes.sizeof(c_uint16) > bytes_to_end_of_buffer:
+		raise Exception(f"Data buffer of board {drvno} is smaller than nob * nos * camcnt * pixel. Call init_measurement after changing the settings.")
+	return np.ctypeslib.as_array(data_pointer, shape=shape)
+
+def get_block_array(drvno: int, block: int) -> np.ndarray:
+	"""
+	Get a zero-copy numpy view of one block of the specified board. The view is only valid as long as the DLL keeps the data buffer, so it must not be used after the next init_measurement or exit_driver.
+
+	Args:
+		drvno (int): Board number.
+		block (int): Block number.
+
+	Returns:
+		numpy.ndarray: The block as numpy.uint16 array with the shape (nos, camcnt, pixel).
+
+	Raises:
+		Exception: If the DLL call returns a non-zero status (error) or the buffer is smaller than the current settings require.
+	"""
+	cs = settings.camera_settings[drvno]
+	shape = (settings.nos, cs.camcnt, cs.pixel)
+	data_pointer, bytes_to_end_of_buffer = get_one_block_pointer(drvno, block)
+	if int(np.prod(shape)) * ctypes.sizeof(c_uint16) > bytes_to_end_of_buffer:
+		raise Exception(f"Data buffer of board {drvno} is smaller than nos * camcnt * pixel after block {block}. Call init_measurement after changing the settings.")
+	return np.ctypeslib.as_array(data_pointer, shape=shape)
+
+# Values of camera_settings.fft_mode.
+FFT_MODE_FULL_BINNING = 0
+FFT_MODE_PARTIAL_BINNING = 1
+FFT_MODE_AREA = 2
+
+def get_region_layout(drvno: int) -> List[Tuple[int, int]]:
+	"""
+	Get the position of each region in a frame of the specified board, interpreted from fft_mode, number_of_regions, region_size, fft_lines and lines_binning. A frame is the group of consecutive samples of one readout of the sensor:
+
+	- Full binning: Every sample is one frame with one region.
+	- Partial binning: Every region is binned to one sample, so a frame has number_of_regions samples.
+	- Area mode: Every sample is one line after binning lines_binning sensor lines, so a frame has fft_lines / lines_binning samples. When the first number_of_regions entries of region_size add up to fft_lines and are multiples of lines_binning, they split the frame into regions of lines. Otherwise the frame is one region.
+
+	Args:
+		drvno (int): Board number.
+
+	Returns:
+		List[Tuple[int, int]]: (first sample in the frame, number of samples) of each region. The regions cover the frame without gaps.
+
+	Raises:
+		ValueError: If the settings do not describe a valid layout.
+	"""
+	cs = settings.camera_settings[drvno]
+	if cs.fft_mode == FFT_MODE_PARTIAL_BINNING:
+		if not 1 <= cs.number_of_regions <= len(cs.region_size):
+			raise ValueError(f"number_of_regions {cs.number_of_regions} of board {drvno} is outside of 1..{len(cs.region_size)}")
+		return [(region, 1) for region in range(cs.number_of_regions)]
+	if cs.fft_mode == FFT_MODE_AREA:
+		lines_binning = max(cs.lines_binning, 1)
+		if cs.fft_lines < lines_binning or cs.fft_lines % lines_binning:
+			raise ValueError(f"fft_lines {cs.fft_lines} of board {drvno} is not a multiple of lines_binning {lines_binning}")
+		sizes = list(cs.region_size)[:cs.number_of_regions]
+		if not sizes or sum(sizes) != cs.fft_lines or any(size == 0 or size % lines_binning for size in sizes):
+			sizes = [cs.fft_lines]
+		layout = []
+		offset = 0
+		for size in sizes:
+			layout.append((offset, size // lines_binning))
+			offset += size // lines_binning
+		return layout
+	return [(0, 1)]
+
+def samples_per_frame(drvno: int) -> int:
+	"""
+	Get the number of consecutive samples that form one frame of the specified board, see get_region_layout.
+
+	Args:
+		drvno (int): Board number.
+
+	Returns:
+		int: Samples per frame.
+	"""
+	offset, length = get_region_layout(drvno)[-1]
+	return offset + length
+
+def _frame_view(drvno: int, block: Optional[int]) -> np.ndarray:
+	"""
+	Zero-copy view of all data or one block with the samples split into frames, with the shape ([nob,] frames, samples per frame, camcnt, pixel).
+	"""
+	data = get_all_data_array(drvno) if block is None else get_block_array(drvno, block)
+	frame_samples = samples_per_frame(drvno)
+	if settings.nos % frame_samples:
+		raise ValueError(f"nos {settings.nos} is not a multiple of the {frame_samples} samples per frame of board {drvno}")
+	sample_axis = data.ndim - 3
+	return data.reshape(data.shape[:sample_axis] + (settings.nos // frame_samples, frame_samples) + data.shape[sample_axis + 1:])
+
+def get_region_arrays(drvno: int, block: Optional[int] = None) -> List[np.ndarray]:
+	"""
+	Get zero-copy numpy views of every region of the specified board, see get_region_layout. Each view only covers the samples of its region, so processing one region, for example the signal stripe, does not touch the data of the other regions. The views are only valid as long as the DLL keeps the data buffer, so they must not be used after the next init_measurement or exit_driver.
+
+	Args:
+		drvno (int): Board number.
+		block (int, optional): Block number. When None, the views cover all blocks.
+
+	Returns:
+		List[numpy.ndarray]: One numpy.uint16 view per region with the shape (nob, frames, lines, camcnt, pixel), or (frames, lines, camcnt, pixel) for one block. lines is the number of samples of the region, 1 in partial binning.
+
+	Raises:
+		ValueError: If nos is not a multiple of the samples per frame or the settings do not describe a valid layout.
+		Exception: If the DLL call returns a non-zero status (error) or the buffer is smaller than the current settings require.
+	"""
+	frames = _frame_view(drvno, block)
+	return [frames[..., offset:offset + length, :, :] for offset, length in get_region_layout(drvno)]
+
+def get_region_array(drvno: int, region: int, block: Optional[int] = None) -> np.ndarray:
+	"""
+	Get a zero-copy numpy view of one region of the specified board, see get_region_arrays.
+
+	Args:
+		drvno (int): Board number.
+		region (int): Region number, starting at 0.
+		block (int, optional): Block number. When None, the view covers all blocks.
+
+	Returns:
+		numpy.ndarray: numpy.uint16 view with the shape (nob, frames, lines, camcnt, pixel), or (frames, lines, camcnt, pixel) for one block.
+
+	Raises:
+		ValueError: If the region does not exist, nos is not a multiple of the samples per frame or the settings do not describe a valid layout.
+		Exception: If the DLL call returns a non-zero status (error) or the buffer is smaller than the current settings require.
+	"""
+	layout = get_region_layout(drvno)
+	if not 0 <= region < len(layout):
+		raise ValueError(f"region {region} is out of range 0..{len(layout) - 1}")
+	offset, length = layout[region]
+	return _frame_view(drvno, block)[..., offset:offset + length, :, :]
+
+def get_region_stack(drvno: int, block: Optional[int] = None) -> np.ndarray:
+	"""
+	Get a zero-copy numpy view of all regions of the specified board stacked along one axis. All regions must have the same number of lines, which is always the case in partial binning.
+
+	Args:
+		drvno (int): Board number.
+		block (int, optional): Block number. When None, the view covers all blocks.
+
+	Returns:
+		numpy.ndarray: numpy.uint16 view with the shape (nob, frames, regions, lines, camcnt, pixel), or (frames, regions, lines, camcnt, pixel) for one block.
+
+	Raises:
+		ValueError: If the regions have different numbers of lines, nos is not a multiple of the samples per frame or the settings do not describe a valid layout.
+		Exception: If the DLL call returns a non-zero status (error) or the buffer is smaller than the current settings require.
+	"""
+	lengths = {length for _, length in get_region_layout(drvno)}
+	if len(lengths) != 1:
+		raise ValueError(f"The regions of board {drvno} have different numbers of lines {sorted(lengths)}")
+	length = lengths.pop()
+	frames = _frame_view(drvno, block)
+	sample_axis = frames.ndim - 3
+	return frames.reshape(frames.shape[:sample_axis] + (frames.shape[sample_axis] // length, length) + frames.shape[sample_axis + 1:])
+
+def _resolve_selection(selection: Union[None, int, slice, Sequence[int]], length: int, name: str) -> Union[slice, np.ndarray]:
+	"""
+	Convert a sample, block or camera selection to a slice or an index array. Integers are converted to slices of length 1, so the axis is kept.
+
+	Args:
+		selection: None for all, an integer, a slice or a sequence of integers.
+		length (int): Length of the axis the selection is applied to.
+		name (str): Name of the axis, used for error messages.
+
+	Returns:
+		Union[slice, numpy.ndarray]: A slice or an array of non-negative indices.
+
+	Raises:
+		ValueError: If an index is out of range.
+	"""
+	if selection is None:
+		return slice(None)
+	if isinstance(selection, slice):
+		return slice(*selection.indices(length))
+	if isinstance(selection, (int, np.integer)):
+		index = int(selection) + length if selection < 0 else int(selection)
+		if not 0 <= index < length:
+			raise ValueError(f"{name} {selection} is out of range 0..{length - 1}")
+		return slice(index, index + 1)
+	indices = np.asarray(selection, dtype=np.intp).reshape(-1)
+	indices = np.where(indices < 0, indices + length, indices)
+	if indices.size and (indices.min() < 0 or indices.max() >= length):
+		raise ValueError(f"{name} selection {selection} is out of range 0..{length - 1}")
+	return indices
+
+def extract_rois(drvno: int, rois: Sequence[Tuple[int, int]], samples: Union[None, int, slice, Sequence[int]] = None, blocks: Union[None, int, slice, Sequence[int]] = None, cameras: Union[None, int, slice, Sequence[int]] = None, out: Optional[np.ndarray] = None) -> np.ndarray:
+	"""
+	Extract several pixel regions of interest for many samples, blocks and cameras in one call. The data buffer is resolved once with get_all_data_pointer and all regions are gathered with numpy indexing, instead of one copy_data_arbitrary call per sample and region.
+
+	Args:
+		drvno (int): Board number.
+		rois (Sequence[Tuple[int, int]]): Regions of interest as (start pixel, length in pixel).
+		samples: Samples to extract. None for all samples, an integer, a slice or a sequence of sample numbers.
+		blocks: Blocks to extract. Same format as samples.
+		cameras: Cameras to extract. Same format as samples.
+		out (numpy.ndarray, optional): Preallocated array to write the result to. It must have the shape and dtype of the returned array.
+
+	Returns:
+		numpy.ndarray: numpy.uint16 array with the shape (blocks, samples, cameras, sum of all ROI lengths). The regions are concatenated along the last axis in the given order. When all regions have the same length, out.reshape(out.shape[:3] + (len(rois), length)) separates them without copying.
+
+	Raises:
+		ValueError: If a region or selection is outside of the measurement.
+		Exception: If the DLL call returns a non-zero status (error), an exception is raised with the error message.
+	"""
+	cs = settings.camera_settings[drvno]
+	for start, length in rois:
+		if length <= 0 or start < 0 or start + length > cs.pixel:
+			raise ValueError(f"ROI ({start}, {length}) is outside of 0..{cs.pixel - 1}")
+	data = get_all_data_array(drvno)
+	block_index = _resolve_selection(blocks, settings.nob, "block")
+	sample_index = _resolve_selection(samples, settings.nos, "sample")
+	camera_index = _resolve_selection(cameras, cs.camcnt, "camera")
+	selection = (block_index, sample_index, camera_index)
+	if all(isinstance(index, slice) for index in selection):
+		# Only basic indexing: source is a strided view without any copy.
+		source = data[selection]
+		shape = source.shape[:3]
+		def roi_source(start, length):
+			return source[..., start:start + length]
+	else:
+		# Mix of index arrays: broadcast them to an open mesh, so each region is one gather.
+		mesh = np.ix_(*[np.arange(data.shape[axis])[index] if isinstance(index, slice) else index for axis, index in enumerate(selection)])
+		shape = tuple(index.size for index in mesh)
+		def roi_source(start, length):
+			return data[mesh + (slice(start, start + length),)]
+	total_length = sum(length for _, length in rois)
+	if out is None:
+		out = np.empty(shape + (total_length,), dtype=np.uint16)
+	elif out.shape != shape + (total_length,):
+		raise ValueError(f"out has shape {out.shape}, expected {shape + (total_length,)}")
+	offset = 0
+	for start, length in rois:
+		out[..., offset:offset + length] = roi_source(start, length)
+		offset += length
+	return out
+
+def probe(drvno: int, pixels: Union[int, Sequence[int]], samples: Union[None, int, slice, Sequence[int]] = None, block: int = 0, camera: int = 0) -> np.ndarray:
+	"""
+	Read the time series of single pixels without copying whole samples. Only the requested pixel columns are read from a strided view of the data buffer.
+
+	Args:
+		drvno (int): Board number.
+		pixels (Union[int, Sequence[int]]): Pixel index or a sequence of pixel indices.
+		samples: Samples to read. None for all samples, an integer, a slice or a sequence of sample numbers.
+		block (int): Block number.
+		camera (int): Camera number.
+
+	Returns:
+		numpy.ndarray: numpy.uint16 array with the shape (pixels, samples), one time series per pixel. When pixels is an integer, the shape is (samples,).
+
+	Raises:
+		ValueError: If a pixel, sample, block or camera is outside of the measurement.
+		Exception: If the DLL call returns a non-zero status (error), an exception is raised with the error message.
+	"""
+	cs = settings.camera_settings[drvno]
+	pixel_index = _resolve_selection([pixels] if isinstance(pixels, (int, np.integer)) else pixels, cs.pixel, "pixel")
+	block_index = _resolve_selection(block, settings.nob, "block").start
+	camera_index = _resolve_selection(camera, cs.camcnt, "camera").start
+	sample_index = _resolve_selection(samples, settings.nos, "sample")
+	# (nos, pixel) view of one block and camera. Nothing is copied until the columns are read.
+	data = get_all_data_array(drvno)[block_index, :, camera_index, :]
+	number_of_samples = len(range(settings.nos)[sample_index]) if isinstance(sample_index, slice) else sample_index.size
+	out = np.empty((pixel_index.size, number_of_samples), dtype=np.uint16)
+	for i, pixel in enumerate(pixel_index):
+		out[i] = data[sample_index, pixel]
+	if isinstance(pixels, (int, np.integer)):
+		return out[0]
+	return out
+
+def iter_all_data(drvno: int, chunk_samples: int = 10000, cameras: Union[None, int, slice, Sequence[int]] = None) -> Iterator[np.ndarray]:
+	"""
+	Iterate over all data of a finished measurement in chunks of a fixed number of samples. Chunks span block boundaries, the samples of all blocks are walked in measurement order. All chunks are copied into the same buffer, so the memory needed stays the same for any nos and nob.
+
+	Args:
+		drvno (int): Board number.
+		chunk_samples (int): Number of samples per chunk. The last chunk may be shorter.
+		cameras: Cameras to include. None for all cameras, an integer, a slice or a sequence of camera numbers.
+
+	Yields:
+		numpy.ndarray: numpy.uint16 array with the shape (samples, cameras, pixel). It is overwritten by the next chunk, copy it to keep it.
+
+	Raises:
+		ValueError: If chunk_samples is not positive or a camera is out of range.
+		Exception: If the DLL call returns a non-zero status (error), an exception is raised with the error message.
+	"""
+	if chunk_samples < 1:
+		raise ValueError("chunk_samples must be at least 1")
+	camera_index = _resolve_selection(cameras, settings.camera_settings[drvno].camcnt, "camera")
+	data = get_all_data_array(drvno)
+	# All samples of all blocks in measurement order with the shape (nob * nos, camcnt, pixel).
+	scans = data.reshape((-1,) + data.shape[2:])
+	number_of_cameras = len(range(scans.shape[1])[camera_index]) if isinstance(camera_index, slice) else camera_index.size
+	buffer = np.empty((min(chunk_samples, scans.shape[0]), number_of_cameras, scans.shape[2]), dtype=np.uint16)
+	for start in range(0, scans.shape[0], chunk_samples):
+		stop = min(start + chunk_samples, scans.shape[0])
+		chunk = buffer[:stop - start]
+		if isinstance(camera_index, slice):
+			np.copyto(chunk, scans[start:stop, camera_index])
+		else:
+			np.take(scans[start:stop], camera_index, axis=1, out=chunk)
+		yield chunk
+
+def selected_boards() -> List[int]:
+	"""
+	Get the board numbers that are selected by settings.board_sel.
+
+	Returns:
+		List[int]: The selected board numbers in ascending order.
+	"""
+	return [drvno for drvno in range(len(settings.camera_settings)) if settings.board_sel >> drvno & 1]
+
+# Values of camera_settings.timer_resolution_mode, the unit of stime and btime.
+TIMER_RESOLUTION_1US = 0
+TIMER_RESOLUTION_10US = 1
+TIMER_RESOLUTION_100US = 2
+TIMER_RESOLUTION_1MS = 3
+_TIMER_RESOLUTION_NS = {TIMER_RESOLUTION_1US: 1000, TIMER_RESOLUTION_10US: 10000, TIMER_RESOLUTION_100US: 100000, TIMER_RESOLUTION_1MS: 1000000}
+
+def timer_resolution_ns(drvno: int, ms: Optional[measurement_settings] = None) -> int:
+	"""
+	Get the unit of stime and btime of the specified board, which is set by timer_resolution_mode.
+
+	Args:
+		drvno (int): Board number.
+		ms (measurement_settings, optional): Settings to read. When None, the module settings are used.
+
+	Returns:
+		int: Length of one unit of stime and btime in nanoseconds.
+
+	Raises:
+		ValueError: If timer_resolution_mode has an unknown value.
+	"""
+	mode = (settings if ms is None else ms).camera_settings[drvno].timer_resolution_mode
+	if mode not in _TIMER_RESOLUTION_NS:
+		raise ValueError(f"timer_resolution_mode {mode} of board {drvno} is not supported")
+	return _TIMER_RESOLUTION_NS[mode]
+
 def exit_driver():
 	"""
 	Exit and clean up the driver.
@@ -758,6 +1244,87 @@ def calc_trms(drvno: int, first_sample: int, last_sample: int, tmrs_pixel: int,
 		raise Exception(convert_error_code_to_msg(status))
 	return mean.value, rms.value
 
+# Prototypes and DLL setters of all hooks. Each hook is installed once as a trampoline, that calls the hook set by the user and all listeners added with add_hook_listener.
+_HOOKS = {
+	"measure_start": ("DLLSetMeasureStartHook", CFUNCTYPE(None)),
+	"measure_done": ("DLLSetMeasureDoneHook", CFUNCTYPE(None)),
+	"block_start": ("DLLSetBlockStartHook", CFUNCTYPE(None, c_uint32)),
+	"block_done": ("DLLSetBlockDoneHook", CFUNCTYPE(None, c_uint32)),
+	"all_blocks_done": ("DLLSetAllBlocksDoneHook", CFUNCTYPE(None, c_uint64)),
+}
+_user_hooks = {}
+_hook_listeners = {name: [] for name in _HOOKS}
+# time.monotonic_ns() of the last call of each hook, taken before any hook function runs.
+_hook_time_ns = {name: 0 for name in _HOOKS}
+# The trampolines must be kept referenced, otherwise they are garbage collected while the DLL still calls them.
+_hook_trampolines = {}
+
+def _install_hook(name: str) -> object:
+	"""
+	Install the trampoline of one hook in the DLL, when it is not installed yet.
+
+	Args:
+		name (str): Name of the hook, one of the keys of _HOOKS.
+
+	Returns:
+		object: The reference to the trampoline.
+	"""
+	if name in _hook_trampolines:
+		return _hook_trampolines[name]
+	setter_name, prototype = _HOOKS[name]
+	def trampoline(*args):
+		_hook_time_ns[name] = time.monotonic_ns()
+		user_hook = _user_hooks.get(name)
+		if user_hook is not None:
+			user_hook(*args)
+		for listener in tuple(_hook_listeners[name]):
+			try:
+				listener(*args)
+			except Exception:
+				logger.exception(f"Listener {listener} of hook {name} failed")
+	hook_func_ref = prototype(trampoline)
+	setter = getattr(dll, setter_name)
+	setter.argtypes = [prototype]
+	setter(hook_func_ref)
+	_hook_trampolines[name] = hook_func_ref
+	return hook_func_ref
+
+def get_hook_time_ns(name: str) -> int:
+	"""
+	Get the host time of the last call of a hook. The time is taken when the DLL calls the hook, before the hook function and the listeners run, so it is also valid inside of listeners.
+
+	Args:
+		name (str): Name of the hook: "measure_start", "measure_done", "block_start", "block_done" or "all_blocks_done".
+
+	Returns:
+		int: time.monotonic_ns() of the last call or 0 if the hook was not called yet.
+	"""
+	return _hook_time_ns[name]
+
+def add_hook_listener(name: str, listener: Callable[..., None]):
+	"""
+	Add a function that is called by a hook in addition to the hook function set with set_*_hook. Listeners are called from the thread of the DLL, so they should return quickly.
+
+	Args:
+		name (str): Name of the hook: "measure_start", "measure_done", "block_start", "block_done" or "all_blocks_done".
+		listener: The function to call. It gets the same arguments as the hook function.
+	"""
+	if name not in _HOOKS:
+		raise ValueError(f"Unknown hook {name}, must be one of {', '.join(_HOOKS)}")
+	_install_hook(name)
+	_hook_listeners[name].append(listener)
+
+def remove_hook_listener(name: str, listener: Callable[..., None]):
+	"""
+	Remove a function added with add_hook_listener. Nothing happens when it is not registered.
+
+	Args:
+		name (str): Name of the hook.
+		listener: The function to remove.
+	"""
+	if listener in _hook_listeners.get(name, []):
+		_hook_listeners[name].remove(listener)
+
 def set_measure_start_hook(hook_function: Callable[[], None]) -> object:
 	"""
 	Set a hook function that will be called when the measurement starts.
@@ -765,10 +1332,8 @@ def set_measure_start_hook(hook_function: Callable[[], None]) -> object:
 	Args:
 		hook_function: The function to call when the measurement starts.
 	"""
-	dll.DLLSetMeasureStartHook.argtypes = [CFUNCTYPE(None)]
-	hook_func_ref = CFUNCTYPE(None)(hook_function)
-	dll.DLLSetMeasureStartHook(hook_func_ref)
-	return hook_func_ref
+	_user_hooks["measure_start"] = hook_function
+	return _install_hook("measure_start")
 
 def set_measure_done_hook(hook_function: Callable[[], None]) -> object:
 	"""
@@ -777,10 +1342,8 @@ def set_measure_done_hook(hook_function: Callable[[], None]) -> object:
 	Args:
 		hook_function: The function to call when the measurement is done.
 	"""
-	dll.DLLSetMeasureDoneHook.argtypes = [CFUNCTYPE(None)]
-	hook_func_ref = CFUNCTYPE(None)(hook_function)
-	dll.DLLSetMeasureDoneHook(hook_func_ref)
-	return hook_func_ref
+	_user_hooks["measure_done"] = hook_function
+	return _install_hook("measure_done")
 
 def set_block_start_hook(hook_function: Callable[[int], None]) -> object:
 	"""
@@ -789,10 +1352,8 @@ def set_block_start_hook(hook_function: Callable[[int], None]) -> object:
 	Args:
 		hook_function: The function to call when a new block starts. The function should accept one argument, which is the block index.
 	"""
-	dll.DLLSetBlockStartHook.argtypes = [CFUNCTYPE(None, c_uint32)]
-	hook_func_ref = CFUNCTYPE(None, c_uint32)(hook_function)
-	dll.DLLSetBlockStartHook(hook_func_ref)
-	return hook_func_ref
+	_user_hooks["block_start"] = hook_function
+	return _install_hook("block_start")
 
 def set_block_done_hook(hook_function: Callable[[int], None]) -> object:
 	"""
@@ -801,10 +1362,8 @@ def set_block_done_hook(hook_function: Callable[[int], None]) -> object:
 	Args:
 		hook_function: The function to call when a block is done.  The function should accept one argument, which is the block index.
 	"""
-	dll.DLLSetBlockDoneHook.argtypes = [CFUNCTYPE(None, c_uint32)]
-	hook_func_ref = CFUNCTYPE(None, c_uint32)(hook_function)
-	dll.DLLSetBlockDoneHook(hook_func_ref)
-	return hook_func_ref
+	_user_hooks["block_done"] = hook_function
+	return _install_hook("block_done")
 
 def set_all_blocks_done_hook(hook_function: Callable[[int], None]) -> object:
 	"""
@@ -813,10 +1372,162 @@ def set_all_blocks_done_hook(hook_function: Callable[[int], None]) -> object:
 	Args:
 		hook_function: The function to call when all blocks are done. The function should accept one argument, which is the number of the completed measurement cycle.
 	"""
-	dll.DLLSetAllBlocksDoneHook.argtypes = [CFUNCTYPE(None, c_uint64)]
-	hook_func_ref = CFUNCTYPE(None, c_uint64)(hook_function)
-	dll.DLLSetAllBlocksDoneHook(hook_func_ref)
-	return hook_func_ref
+	_user_hooks["all_blocks_done"] = hook_function
+	return _install_hook("all_blocks_done")
+
+def set_dll(new_dll: object) -> object:
+	"""
+	Replace the library that all functions of this module call, e.g. with a replay backend. The hooks that were installed in the old library are installed in the new one, so user hooks and listeners keep working. Note that stresing.dll still refers to the library that was loaded on import, use stresing.core.dll for direct calls.
+
+	Args:
+		new_dll: The new library. It must provide the DLL* functions that are used.
+
+	Returns:
+		object: The library that was used before.
+	"""
+	global dll
+	old_dll = dll
+	dll = new_dll
+	installed = list(_hook_trampolines)
+	_hook_trampolines.clear()
+	for name in installed:
+		_install_hook(name)
+	return old_dll
+
+# State for wait_for_scan and wait_measurement_done. It is updated by hook listeners and protected by _scan_condition.
+_scan_condition = threading.Condition()
+_scan_generation = 0
+# Number of block start and block done hook calls since the measure start hook. They keep counting over the cycles of a continuous measurement.
+_blocks_started = 0
+_blocks_done = 0
+_measurement_done = threading.Event()
+_wait_hooks_available = None
+# Limits of the poll interval of wait_for_scan and wait_measurement_done in seconds. The interval starts at the minimum and doubles up to the maximum, so a sample within a block is detected at most about 0.5 ms late.
+_POLL_MIN_INTERVAL = 50e-6
+_POLL_MAX_INTERVAL = 500e-6
+
+def _notify_scan_waiters():
+	global _scan_generation
+	with _scan_condition:
+		_scan_generation += 1
+		_scan_condition.notify_all()
+
+def _on_wait_measure_start():
+	global _blocks_started, _blocks_done
+	with _scan_condition:
+		_blocks_started = 0
+		_blocks_done = 0
+		_measurement_done.clear()
+
+def _on_wait_block_start(block: int):
+	global _blocks_started
+	with _scan_condition:
+		_blocks_started += 1
+
+def _on_wait_block_done(block: int):
+	global _blocks_done
+	with _scan_condition:
+		_blocks_done += 1
+	_notify_scan_waiters()
+
+def _on_wait_measure_done():
+	_measurement_done.set()
+	_notify_scan_waiters()
+
+def _install_wait_hooks() -> bool:
+	"""
+	Add the hook listeners of wait_for_scan and wait_measurement_done once.
+
+	Returns:
+		bool: True if the DLL provides the hooks, False if waiting has to fall back to polling.
+	"""
+	global _wait_hooks_available
+	if _wait_hooks_available is None:
+		try:
+			add_hook_listener("measure_start", _on_wait_measure_start)
+			add_hook_listener("block_start", _on_wait_block_start)
+			add_hook_listener("block_done", _on_wait_block_done)
+			add_hook_listener("measure_done", _on_wait_measure_done)
+			_wait_hooks_available = True
+		except AttributeError:
+			logger.warning("The DLL does not provide hooks, waiting falls back to polling")
+			_wait_hooks_available = False
+	return _wait_hooks_available
+
+def _wait_until(predicate: Callable[[], bool], timeout: Optional[float], max_interval: float) -> bool:
+	"""
+	Wait until predicate returns True. The predicate is checked with an exponentially growing interval and immediately when a hook reports progress.
+	"""
+	deadline = None if timeout is None else time.monotonic() + timeout
+	interval = _POLL_MIN_INTERVAL
+	while True:
+		with _scan_condition:
+			generation = _scan_generation
+		if predicate():
+			return True
+		wait = interval
+		if deadline is not None:
+			remaining = deadline - time.monotonic()
+			if remaining <= 0:
+				return False
+			wait = min(wait, remaining)
+		with _scan_condition:
+			# Do not sleep when a hook was called since the predicate was checked.
+			if generation == _scan_generation:
+				_scan_condition.wait(wait)
+		interval = min(interval * 2, max_interval)
+
+def _scan_reached(drvno: int, sample: int, block: int) -> bool:
+	cur_sample, cur_block = get_current_scan_number(drvno)
+	return cur_block > block or (cur_block == block and cur_sample >= sample)
+
+def wait_for_scan(drvno: int, sample: int, block: int, timeout: Optional[float] = None, max_interval: float = _POLL_MAX_INTERVAL) -> bool:
+	"""
+	Wait until the specified board has reached a sample in a block. This returns immediately when the block done hook reports the block, between hooks get_current_scan_number is polled with an exponentially growing interval up to max_interval, so the CPU is not kept busy. A sample within a block is therefore detected up to max_interval late. In continuous mode, the block refers to the cycle that runs when the wait starts.
+
+	Args:
+		drvno (int): Board number.
+		sample (int): Sample number.
+		block (int): Block number.
+		timeout (float, optional): Maximum time to wait in seconds. None waits forever.
+		max_interval (float): Maximum interval between two polls in seconds. Smaller values detect samples within a block earlier and cost more CPU time.
+
+	Returns:
+		bool: True when the scan was reached, False when the timeout expired.
+
+	Raises:
+		Exception: If the DLL call returns a non-zero status (error), an exception is raised with the error message.
+	"""
+	hooks_available = _install_wait_hooks()
+	with _scan_condition:
+		# Count of done blocks after which the block of the current cycle is done.
+		cycle = max(_blocks_started - 1, 0) // settings.nob if settings.nob else 0
+		target = cycle * settings.nob + block
+	def reached() -> bool:
+		if hooks_available and _blocks_done > target:
+			return True
+		return _scan_reached(drvno, sample, block)
+	return _wait_until(reached, timeout, max_interval)
+
+def wait_measurement_done(timeout: Optional[float] = None, max_interval: float = _POLL_MAX_INTERVAL) -> bool:
+	"""
+	Wait until the measurement started with start_measurement_nonblocking is done. The measure done hook ends the wait. Without hooks, the last sample of the last block of all selected boards is polled.
+
+	Args:
+		timeout (float, optional): Maximum time to wait in seconds. None waits forever.
+		max_interval (float): Maximum interval between two polls in seconds.
+
+	Returns:
+		bool: True when the measurement is done, False when the timeout expired.
+
+	Raises:
+		Exception: If the DLL call returns a non-zero status (error), an exception is raised with the error message.
+	"""
+	if _install_wait_hooks():
+		return _wait_until(_measurement_done.is_set, timeout, max_interval)
+	def done() -> bool:
+		return all(_scan_reached(drvno, settings.nos - 1, settings.nob - 1) for drvno in selected_boards())
+	return _wait_until(done, timeout, max_interval)
 
 def cam_send_data(drvno: int, maddr: int, adaddr: int, data: int) -> None:
 	dll.DLLCam_SendData.argtypes = [c_uint32, c_uint8, c_uint8, c_uint16]
@@ -824,3 +1535,43 @@ def cam_send_data(drvno: int, maddr: int, adaddr: int, data: int) -> None:
 	status = dll.DLLCam_SendData(c_uint32(drvno), c_uint8(maddr), c_uint8(adaddr), c_uint16(data))
 	if status != 0:
 		raise Exception(convert_error_code_to_msg(status))
+
+def read_register_s0_32(drvno: int, address: int) -> int:
+	"""
+	Read a 32 bit register of the S0 space of the PCIe board. You can find the addresses here: https://entwicklungsburo-stresing.github.io/enum__hardware_8h.html
+
+	Args:
+		drvno (int): Board number.
+		address (int): Address of the register.
+
+	Returns:
+		int: The value of the register.
+
+	Raises:
+		Exception: If the DLL call returns a non-zero status (error), an exception is raised with the error message.
+	"""
+	dll.DLLreadRegisterS0_32.argtypes = [c_uint32, POINTER(c_uint32), c_uint32]
+	dll.DLLreadRegisterS0_32.restype = c_int
+	data = c_uint32(0)
+	status = dll.DLLreadRegisterS0_32(c_uint32(drvno), ctypes.byref(data), c_uint32(address))
+	if status != 0:
+		raise Exception(convert_error_code_to_msg(status))
+	return data.value
+
+def write_register_s0_32(drvno: int, address: int, data: int) -> None:
+	"""
+	Write a 32 bit register of the S0 space of the PCIe board.
+
+	Args:
+		drvno (int): Board number.
+		address (int): Address of the register.
+		data (int): The value to write.
+
+	Raises:
+		Exception: If the DLL call returns a non-zero status (error), an exception is raised with the error message.
+	"""
+	dll.DLLwriteRegisterS0_32.argtypes = [c_uint32, c_uint32, c_uint32]
+	dll.DLLwriteRegisterS0_32.restype = c_int
+	status = dll.DLLwriteRegisterS0_32(c_uint32(drvno), c_uint32(data), c_uint32(address))
+	if status != 0:
+		raise Exception(convert_error_code_to_msg(status))
@@ -0,0 +1,280 @@
+## @file: correction.py
+# @brief: Dark, background and flat-field correction with cached calibration frames.
+# @details: Reference frames are acquired or loaded once per camera configuration and cached by a fingerprint of the settings that change them. Corrections are applied per block with numpy on float32 buffers.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import hashlib
+import os
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from . import core
+
+__all__ = ["FINGERPRINT_FIELDS", "settings_fingerprint", "acquire_reference", "CalibrationCache", "Correction"]
+
+# Camera settings that change the dark level or the sensitivity of the sensor. A reference frame is only reused when all of these are equal.
+FINGERPRINT_FIELDS = ("stime", "sensor_gain", "adc_gain", "temp_level", "pixel", "camcnt")
+
+def settings_fingerprint(drvno: int, fields: Sequence[str] = FINGERPRINT_FIELDS) -> str:
+	"""
+	Calculate a fingerprint of the settings of one board, that identifies a camera configuration for calibration frames.
+
+	Args:
+		drvno (int): Board number.
+		fields (Sequence[str]): Names of the camera_settings fields that are part of the fingerprint.
+
+	Returns:
+		str: Hexadecimal fingerprint. It is equal for equal board number and settings.
+	"""
+	cs = core.settings.camera_settings[drvno]
+	description = f"board={drvno};" + ";".join(f"{field}={getattr(cs, field)}" for field in fields)
+	return hashlib.sha1(description.encode()).hexdigest()[:16]
+
+def acquire_reference(drvno: int) -> np.ndarray:
+	"""
+	Do one blocking measurement with the current settings and return the mean frame of all samples and blocks for each camera. The light conditions (closed shutter for dark frames, uniform illumination for flat frames) must be set up before calling this function.
+
+	Args:
+		drvno (int): Board number.
+
+	Returns:
+		numpy.ndarray: numpy.float32 array with the shape (camcnt, pixel).
+
+	Raises:
+		Exception: If a DLL call returns a non-zero status (error), an exception is raised with the error message.
+	"""
+	core.init_measurement()
+	core.start_measurement_blocking()
+	data = core.get_all_data_array(drvno)
+	return data.mean(axis=(0, 1), dtype=np.float64).astype(np.float32)
+
+class CalibrationCache:
+	"""
+	Cache of calibration frames keyed by kind and settings fingerprint. Frames are kept in memory and, when a directory is given, stored as .npy files, so they survive between sessions.
+	"""
+	def __init__(self, directory: Optional[str] = None):
+		"""
+		Args:
+			directory (str, optional): Directory for the .npy files. None keeps the frames only in memory.
+		"""
+		self.directory = directory
+		self._frames: Dict[str, np.ndarray] = {}
+		if directory is not None:
+			os.makedirs(directory, exist_ok=True)
+
+	def _path(self, key: str) -> str:
+		return os.path.join(self.directory, key + ".npy")
+
+	def get(self, kind: str, fingerprint: str) -> Optional[np.ndarray]:
+		"""
+		Get a cached frame.
+
+		Args:
+			kind (str): Kind of the frame, e.g. "dark", "background" or "flat".
+			fingerprint (str): Settings fingerprint, see settings_fingerprint.
+
+		Returns:
+			Optional[numpy.ndarray]: The frame or None, when there is no frame for this kind and fingerprint.
+		"""
+		key = f"{kind}_{fingerprint}"
+		if key not in self._frames and self.directory is not None and os.path.exists(self._path(key)):
+			self._frames[key] = np.load(self._path(key))
+		return self._frames.get(key)
+
+	def put(self, kind: str, fingerprint: str, frame: np.ndarray):
+		"""
+		Store a frame in the cache.
+
+		Args:
+			kind (str): Kind of the frame, e.g. "dark", "background" or "flat".
+			fingerprint (str): Settings fingerprint, see settings_fingerprint.
+			frame (numpy.ndarray): The frame with the shape (camcnt, pixel).
+		"""
+		key = f"{kind}_{fingerprint}"
+		self._frames[key] = np.asarray(frame, dtype=np.float32)
+		if self.directory is not None:
+			np.save(self._path(key), self._frames[key])
+
+class Correction:
+	"""
+	Dark, background and flat-field correction for one board. The corrected value of each pixel is (raw - offset) * gain, where offset is the background frame when one is set and the dark frame otherwise, and gain is the mean of (flat - offset) divided by (flat - offset). Both are precomputed, so applying the correction is one subtraction and one multiplication per block.
+
+	The frames belong to the settings fingerprint they were acquired or loaded with. When the settings change, apply switches to the cached frames of the new fingerprint and raises ValueError when one of the used frames is not cached for it.
+
+	Attributes:
+		fingerprint (str): Settings fingerprint of the current frames, None before the first frame.
+	"""
+	def __init__(self, drvno: int = 0, cache: Optional[CalibrationCache] = None):
+		"""
+		Args:
+			drvno (int): Board number.
+			cache (CalibrationCache, optional): Cache for the reference frames. A new in-memory cache is created when None.
+		"""
+		self.drvno = drvno
+		self.cache = cache if cache is not None else CalibrationCache()
+		self.dark: Optional[np.ndarray] = None
+		self.background: Optional[np.ndarray] = None
+		self.flat: Optional[np.ndarray] = None
+		self.fingerprint: Optional[str] = None
+		self._offset: Optional[np.ndarray] = None
+		self._gain: Optional[np.ndarray] = None
+		self._buffer: Optional[np.ndarray] = None
+
+	def _acquire(self, kind: str, force: bool) -> np.ndarray:
+		fingerprint = settings_fingerprint(self.drvno)
+		frame = None if force else self.cache.get(kind, fingerprint)
+		if frame is None:
+			core.logger.info(f"Acquiring {kind} frame for board {self.drvno}, fingerprint {fingerprint}")
+			frame = acquire_reference(self.drvno)
+			self.cache.put(kind, fingerprint, frame)
+		self._set(fingerprint, {kind: frame})
+		return getattr(self, kind)
+
+	def acquire_dark(self, force: bool = False) -> np.ndarray:
+		"""
+		Get the dark frame for the current settings. It is only measured when the cache has no dark frame for this configuration. Close the shutter or switch off the light before calling this.
+
+		Args:
+			force (bool): Measure a new dark frame even when one is cached.
+
+		Returns:
+			numpy.ndarray: The dark frame with the shape (camcnt, pixel).
+		"""
+		return self._acquire("dark", force)
+
+	def acquire_background(self, force: bool = False) -> np.ndarray:
+		"""
+		Get the background frame for the current settings. The background includes the dark signal and replaces the dark frame as offset. It is only measured when the cache has no background frame for this configuration.
+
+		Args:
+			force (bool): Measure a new background frame even when one is cached.
+
+		Returns:
+			numpy.ndarray: The background frame with the shape (camcnt, pixel).
+		"""
+		return self._acquire("background", force)
+
+	def acquire_flat(self, force: bool = False) -> np.ndarray:
+		"""
+		Get the flat frame for the current settings. It is only measured when the cache has no flat frame for this configuration. Illuminate the sensor uniformly before calling this.
+
+		Args:
+			force (bool): Measure a new flat frame even when one is cached.
+
+		Returns:
+			numpy.ndarray: The flat frame with the shape (camcnt, pixel).
+		"""
+		return self._acquire("flat", force)
+
+	def load(self, dark: Optional[np.ndarray] = None, background: Optional[np.ndarray] = None, flat: Optional[np.ndarray] = None) -> "Correction":
+		"""
+		Set reference frames from arrays, e.g. loaded from earlier runs, and store them in the cache for the current settings. Frames that are None are left unchanged, unless the settings changed since the last frames were set, then they are replaced by the cached frames of the current settings.
+
+		Args:
+			dark (numpy.ndarray, optional): Dark frame with the shape (camcnt, pixel).
+			background (numpy.ndarray, optional): Background frame with the shape (camcnt, pixel).
+			flat (numpy.ndarray, optional): Flat frame with the shape (camcnt, pixel).
+
+		Returns:
+			Correction: self, to allow chaining.
+		"""
+		fingerprint = settings_fingerprint(self.drvno)
+		frames = {kind: frame for kind, frame in (("dark", dark), ("background", background), ("flat", flat)) if frame is not None}
+		self._set(fingerprint, frames)
+		for kind in frames:
+			self.cache.put(kind, fingerprint, getattr(self, kind))
+		return self
+
+	def _set(self, fingerprint: str, frames: Dict[str, np.ndarray]):
+		"""
+		Set frames for a fingerprint. When the fingerprint changes, the other frames are replaced by the cached frames of the new fingerprint or None.
+		"""
+		if fingerprint != self.fingerprint:
+			for kind in ("dark", "background", "flat"):
+				setattr(self, kind, self.cache.get(kind, fingerprint))
+			self.fingerprint = fingerprint
+		for kind, frame in frames.items():
+			frame = np.asarray(frame, dtype=np.float32)
+			if frame.ndim == 1:
+				frame = frame[np.newaxis, :]
+			setattr(self, kind, frame)
+		self._update()
+
+	def _check_fingerprint(self):
+		"""
+		Switch to the cached frames of the current settings when they changed since the frames were set.
+
+		Raises:
+			ValueError: If a frame that is used is not cached for the current settings.
+		"""
+		if self.fingerprint is None:
+			return
+		fingerprint = settings_fingerprint(self.drvno)
+		if fingerprint == self.fingerprint:
+			return
+		used = [kind for kind in ("dark", "background", "flat") if getattr(self, kind) is not None]
+		missing = [kind for kind in used if self.cache.get(kind, fingerprint) is None]
+		if missing:
+			raise ValueError(f"The settings of board {self.drvno} changed and there is no {', '.join(missing)} frame for fingerprint {fingerprint}, acquire or load it first")
+		core.logger.info(f"Switching to the reference frames of board {self.drvno} for fingerprint {fingerprint}")
+		self._set(fingerprint, {})
+
+	def _update(self):
+		offset = self.background if self.background is not None else self.dark
+		self._offset = offset
+		if self.flat is None:
+			self._gain = None
+			return
+		# The response is measured against the same reference that apply subtracts.
+		response = self.flat - offset if offset is not None else self.flat.copy()
+		valid = response > 0
+		mean_response = np.array([r[v].mean() if v.any() else 0.0 for r, v in zip(response, valid)], dtype=np.float32)
+		# Pixels without response can not be corrected and are set to 0.
+		self._gain = np.where(valid, mean_response[:, np.newaxis] / np.where(valid, response, 1), 0).astype(np.float32)
+
+	def apply(self, block: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+		"""
+		Apply the correction to one block.
+
+		Args:
+			block (numpy.ndarray): Block data with the shape (nos, camcnt, pixel), for example the view of get_block_array. A flat (nos * camcnt * pixel) array as returned by copy_one_block_numpy is reshaped.
+			out (numpy.ndarray, optional): float32 array with the shape (nos, camcnt, pixel) for the result, it may be block itself to correct a float32 block in place. When None, a new array is allocated.
+
+		Returns:
+			numpy.ndarray: The corrected block as float32 array with the shape (nos, camcnt, pixel).
+
+		Raises:
+			ValueError: If the settings changed and the cache has no frames for them.
+		"""
+		self._check_fingerprint()
+		camcnt, pixel = core.settings.camera_settings[self.drvno].camcnt, core.settings.camera_settings[self.drvno].pixel
+		block = block.reshape(-1, camcnt, pixel)
+		if out is None:
+			out = np.empty(block.shape, dtype=np.float32)
+		if self._offset is not None:
+			np.subtract(block, self._offset, out=out, dtype=np.float32)
+		elif out is not block:
+			out[...] = block
+		if self._gain is not None:
+			np.multiply(out, self._gain, out=out)
+		return out
+
+	def process_block(self, block: int, data: np.ndarray) -> np.ndarray:
+		"""
+		Stage interface for BlockStream. The block is corrected into a float32 buffer that is reused for every block and passed on to the next stage.
+
+		Args:
+			block (int): Block number.
+			data (numpy.ndarray): Block data with the shape (nos, camcnt, pixel).
+
+		Returns:
+			numpy.ndarray: The corrected block. It is overwritten by the next block.
+
+		Raises:
+			ValueError: If the settings changed and the cache has no frames for them.
+		"""
+		if self._buffer is None or self._buffer.shape != data.shape:
+			self._buffer = np.empty(data.shape, dtype=np.float32)
+		return self.apply(data, out=self._buffer)
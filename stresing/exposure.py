@@ -0,0 +1,165 @@
+## @file: exposure.py
+# @brief: Automatic exposure ranging.
+# @details: auto_exposure does short measurements and searches the exposure time stime at which a high percentile of the frames reaches a target fill level of the ADC range. The search interpolates the fill level linearly between the measurements and bisects inside the known bracket when the interpolation fails, so it usually needs 3 to 5 measurements.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import ctypes
+import math
+from dataclasses import dataclass, field
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from . import core
+
+__all__ = ["ExposureStep", "ExposureResult", "frame_level", "auto_exposure"]
+
+@dataclass
+class ExposureStep:
+	"""
+	One measurement of the search.
+
+	Attributes:
+		stime (int): Exposure time in units of timer_resolution_mode.
+		level (float): Highest percentile of all frames in counts.
+		fill (float): level relative to the full scale of the ADC.
+		saturated_fraction (float): Fraction of values at full scale.
+	"""
+	stime: int
+	level: float
+	fill: float
+	saturated_fraction: float
+
+	@property
+	def saturated(self) -> bool:
+		return self.saturated_fraction > 0
+
+@dataclass
+class ExposureResult:
+	"""
+	Result of auto_exposure.
+
+	Attributes:
+		drvno (int): Board number.
+		stime (int): Chosen exposure time in units of timer_resolution_mode. It is also written to settings.
+		fill (float): Fill level that was measured with the chosen stime.
+		converged (bool): True when the fill level is within the tolerance of the target.
+		history (List[ExposureStep]): All measurements in the order they were done.
+	"""
+	drvno: int
+	stime: int
+	fill: float
+	converged: bool
+	history: List[ExposureStep] = field(default_factory=list)
+
+def frame_level(data: np.ndarray, percentile: float = 99.5, full_scale: int = 0xFFFF) -> Tuple[float, float]:
+	"""
+	Calculate the exposure level of frames.
+
+	Args:
+		data (numpy.ndarray): Frames with the shape (frames, ...).
+		percentile (float): Percentile of each frame that is used as its level. A high percentile ignores a few hot pixels.
+		full_scale (int): Highest value of the ADC.
+
+	Returns:
+		Tuple[float, float]: The highest level of all frames and the fraction of values at full scale.
+	"""
+	frames = data.reshape(data.shape[0], -1)
+	level = float(np.percentile(frames, percentile, axis=1).max())
+	saturated = float(np.count_nonzero(frames >= full_scale)) / frames.size
+	return level, saturated
+
+def _next_stime(history: List[ExposureStep], target: float, stime_min: int, stime_max: int, max_factor: float) -> int:
+	"""
+	Choose the next stime from the measurements so far.
+	"""
+	last = history[-1]
+	valid = [step for step in history if not step.saturated]
+	below = [step.stime for step in valid if step.fill < target]
+	above = [step.stime for step in history if step.saturated or step.fill > target]
+	low = max(below) if below else stime_min
+	high = min(above) if above else stime_max
+	if len(valid) >= 2:
+		# Secant through the two valid measurements closest to the target. The level grows linearly with stime on top of the dark offset.
+		a, b = sorted(valid, key=lambda step: abs(step.fill - target))[:2]
+		slope = (b.fill - a.fill) / (b.stime - a.stime) if b.stime != a.stime else 0
+		estimate = b.stime + (target - b.fill) / slope if slope > 0 else math.nan
+	elif valid and last.fill > 0:
+		# One valid measurement: assume the level is proportional to stime.
+		estimate = valid[-1].stime * target / valid[-1].fill
+	else:
+		estimate = math.nan
+	estimate = min(max(estimate, last.stime / max_factor), last.stime * max_factor) if math.isfinite(estimate) else math.nan
+	if not math.isfinite(estimate) or not low < estimate < high:
+		# Bisect the bracket, geometrically when it spans a large range.
+		if above and not below:
+			estimate = max(last.stime / max_factor, stime_min) if last.saturated else (low + high) / 2
+		elif below and not above:
+			estimate = min(last.stime * max_factor, stime_max)
+		else:
+			estimate = math.sqrt(low * high) if high > 4 * low else (low + high) / 2
+	return int(min(max(round(estimate), stime_min), stime_max))
+
+def auto_exposure(drvno: int = 0, target: float = 0.7, tolerance: float = 0.05, percentile: float = 99.5, adc_bits: int = 16, samples: int = 10, camera: Union[None, int] = None, stime_min: int = 1, stime_max: int = 0xFFFFFFFF, max_measurements: int = 8, max_factor: float = 10.0) -> ExposureResult:
+	"""
+	Find the exposure time at which the frames of one board reach a target fill level. The measurements use only this board, one block of a few samples and no continuous mode. All settings except stime of this board are restored afterwards. stime, stime_min and stime_max are in units of timer_resolution_mode and the search starts at the current stime.
+
+	Args:
+		drvno (int): Board number.
+		target (float): Target fill level of the percentile relative to the ADC full scale.
+		tolerance (float): Allowed deviation of the fill level from the target.
+		percentile (float): Percentile of each frame that is compared with the ADC range.
+		adc_bits (int): Resolution of the ADC, 16 or 14 bit.
+		samples (int): Number of samples of each measurement.
+		camera (int, optional): Use only this camera. When None, all cameras are used.
+		stime_min (int): Smallest allowed stime.
+		stime_max (int): Largest allowed stime.
+		max_measurements (int): Maximum number of measurements.
+		max_factor (float): Maximum factor between two consecutive stime values.
+
+	Returns:
+		ExposureResult: The chosen stime and all measurements. When the target was not reached, the stime with the fill level closest to the target without saturation is chosen.
+
+	Raises:
+		ValueError: If target is not between 0 and 1 or timer_resolution_mode has an unknown value.
+		Exception: If a DLL call returns a non-zero status (error), an exception is raised with the error message.
+	"""
+	if not 0 < target < 1:
+		raise ValueError("target must be between 0 and 1")
+	timer_unit_us = core.timer_resolution_ns(drvno) / 1000
+	full_scale = (1 << adc_bits) - 1
+	ms = core.settings
+	saved = core.measurement_settings.from_buffer_copy(ms)
+	stime = int(min(max(ms.camera_settings[drvno].stime, stime_min), stime_max))
+	history: List[ExposureStep] = []
+	try:
+		ms.board_sel = 1 << drvno
+		ms.nob = 1
+		ms.nos = samples
+		ms.contiuous_measurement = 0
+		while len(history) < max_measurements:
+			ms.camera_settings[drvno].stime = stime
+			core.init_measurement()
+			core.start_measurement_blocking()
+			data = core.get_all_data_array(drvno)[0]
+			if camera is not None:
+				data = data[:, camera]
+			level, saturated = frame_level(data, percentile, full_scale)
+			step = ExposureStep(stime, level, level / full_scale, saturated)
+			history.append(step)
+			core.logger.debug(f"Auto exposure board {drvno}: stime {stime} ({stime * timer_unit_us:g} µs), fill {step.fill:.3f}, saturated {saturated:.2e}")
+			if not step.saturated and abs(step.fill - target) <= tolerance:
+				break
+			next_stime = _next_stime(history, target, stime_min, stime_max, max_factor)
+			if any(previous.stime == next_stime for previous in history):
+				# The search is stuck at a limit or between two adjacent values.
+				break
+			stime = next_stime
+	finally:
+		ctypes.memmove(ctypes.addressof(ms), ctypes.addressof(saved), ctypes.sizeof(ms))
+	valid = [step for step in history if not step.saturated] or history
+	best = min(valid, key=lambda step: abs(step.fill - target))
+	ms.camera_settings[drvno].stime = best.stime
+	converged = not best.saturated and abs(best.fill - target) <= tolerance
+	return ExposureResult(drvno, best.stime, best.fill, converged, history)
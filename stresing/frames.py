@@ -0,0 +1,216 @@
+## @file: frames.py
+# @brief: Assembly of image frames from the samples of area and partial binning sensors.
+# @details: One readout of the sensor arrives as consecutive samples, one sample per line, see get_region_layout. frame_view reshapes samples into frames without copying. A FrameAssembler stage assembles the frames of every finished block, including frames that span two blocks, and hands them to the consumer through a bounded queue, so a slow consumer drops frames instead of delaying the acquisition.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import queue
+import time
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import numpy as np
+
+from . import core
+from .stream import BlockStage
+
+__all__ = ["FrameBatch", "frame_view", "get_frames_array", "FrameAssembler"]
+
+@dataclass
+class FrameBatch:
+	"""
+	Frames that were assembled from one block.
+
+	Attributes:
+		data (numpy.ndarray): Copy of the frames with the shape (frames, lines, camcnt, pixel), or (frames, lines, pixel) for one camera.
+		block (int): Block that completed the frames.
+		first_frame (int): Number of the first frame, counted from the start of the assembler.
+		time_ns (int): time.monotonic_ns() when the frames were assembled.
+	"""
+	data: np.ndarray
+	block: int
+	first_frame: int
+	time_ns: int
+
+def frame_view(data: np.ndarray, lines: int) -> np.ndarray:
+	"""
+	Split samples into frames of consecutive lines without copying.
+
+	Args:
+		data (numpy.ndarray): Samples with the shape (..., samples, camcnt, pixel), for example one block or all data of get_all_data_array.
+		lines (int): Number of samples per frame.
+
+	Returns:
+		numpy.ndarray: View with the shape (..., frames, lines, camcnt, pixel).
+
+	Raises:
+		ValueError: If the number of samples is not a multiple of lines.
+	"""
+	samples = data.shape[-3]
+	if lines < 1 or samples % lines:
+		raise ValueError(f"{samples} samples can not be split into frames of {lines} lines")
+	return data.reshape(data.shape[:-3] + (samples // lines, lines) + data.shape[-2:])
+
+def get_frames_array(drvno: int, block: Optional[int] = None, camera: Optional[int] = None) -> np.ndarray:
+	"""
+	Get a zero-copy numpy view of the frames of the specified board. The number of lines per frame is taken from the settings, see samples_per_frame. The view is only valid as long as the DLL keeps the data buffer, so it must not be used after the next init_measurement or exit_driver.
+
+	Args:
+		drvno (int): Board number.
+		block (int, optional): Block number. When None, the view covers all blocks.
+		camera (int, optional): Only this camera. When None, all cameras are included.
+
+	Returns:
+		numpy.ndarray: numpy.uint16 view with the shape ([nob,] frames, lines, camcnt, pixel), without the camcnt axis for one camera.
+
+	Raises:
+		ValueError: If nos is not a multiple of the lines per frame or the settings do not describe a valid layout.
+		Exception: If the DLL call returns a non-zero status (error) or the buffer is smaller than the current settings require.
+	"""
+	lines = core.samples_per_frame(drvno)
+	data = core.get_all_data_array(drvno) if block is None else core.get_block_array(drvno, block)
+	frames = frame_view(data, lines)
+	if camera is not None:
+		return frames[..., camera, :]
+	return frames
+
+class FrameAssembler(BlockStage):
+	"""
+	Stage for BlockStream that assembles the frames of every block. The frames of each block are copied once into one FrameBatch, so they stay valid when the DLL overwrites the block in continuous mode. When nos is not a multiple of the lines per frame, the last lines of a block are kept and completed with the first lines of the next block. Usage:
+
+		assembler = stresing.FrameAssembler(drvno=0, camera=0)
+		with stresing.BlockStream([assembler], drvno=0):
+			stresing.init_measurement()
+			stresing.start_measurement_nonblocking()
+			for batch in assembler.batches(timeout=1):
+				image = batch.data[-1]
+
+	The queue holds at most maxsize batches. When the consumer falls behind, the oldest batch is dropped, so the stream never waits for the consumer.
+
+	Attributes:
+		frames_assembled (int): Number of assembled frames.
+		frames_dropped (int): Number of frames that were dropped because the queue was full.
+		lines_discarded (int): Number of lines of incomplete frames that were discarded because a block was skipped.
+	"""
+	def __init__(self, drvno: int = 0, lines: Optional[int] = None, camera: Optional[int] = None, maxsize: int = 16):
+		"""
+		Args:
+			drvno (int): Board number.
+			lines (int, optional): Number of samples per frame. When None, samples_per_frame of the board is used at the first block.
+			camera (int, optional): Only assemble frames of this camera. When None, all cameras are included.
+			maxsize (int): Maximum number of batches in the queue.
+		"""
+		if maxsize < 1:
+			raise ValueError("maxsize must be at least 1")
+		self.drvno = drvno
+		self.lines = lines
+		self.camera = camera
+		self.maxsize = maxsize
+		# One more place for the end of the stream, so it never replaces a batch.
+		self._queue: "queue.Queue[Optional[FrameBatch]]" = queue.Queue(maxsize + 1)
+		self.reset()
+
+	def reset(self):
+		"""
+		Forget incomplete frames and reset the counters. Batches in the queue are kept.
+		"""
+		self.frames_assembled = 0
+		self.frames_dropped = 0
+		self.lines_discarded = 0
+		self._lines = self.lines
+		self._carry: Optional[np.ndarray] = None
+		self._pending = 0
+		self._last_block: Optional[int] = None
+
+	def _put(self, batch: FrameBatch):
+		# Only the thread of the stream puts batches, so the queue can not fill up between the check and the put.
+		while self._queue.qsize() >= self.maxsize:
+			try:
+				dropped = self._queue.get_nowait()
+			except queue.Empty:
+				break
+			if dropped is not None:
+				self.frames_dropped += dropped.data.shape[0]
+		self._queue.put_nowait(batch)
+
+	def process_block(self, block: int, data: np.ndarray) -> None:
+		"""
+		Stage interface for BlockStream. Assembles all frames that are completed by this block and puts them into the queue. The data is passed on unchanged.
+
+		Args:
+			block (int): Block number.
+			data (numpy.ndarray): Block data with the shape (nos, camcnt, pixel).
+		"""
+		if self._lines is None:
+			self._lines = core.samples_per_frame(self.drvno)
+		lines = self._lines
+		camera = slice(None) if self.camera is None else self.camera
+		if self._carry is None:
+			self._carry = np.empty((lines,) + data[:1, camera].shape[1:], dtype=data.dtype)
+		if self._pending and self._last_block is not None and block != (self._last_block + 1) % core.settings.nob:
+			# A block was skipped, the incomplete frame can not be continued.
+			self.lines_discarded += self._pending
+			self._pending = 0
+		self._last_block = block
+		start = 0
+		head = False
+		if self._pending:
+			start = min(lines - self._pending, data.shape[0])
+			self._carry[self._pending:self._pending + start] = data[:start, camera]
+			self._pending += start
+			if self._pending < lines:
+				return None
+			head = True
+			self._pending = 0
+		count = (data.shape[0] - start) // lines
+		stop = start + count * lines
+		if head or count:
+			out = np.empty((count + head,) + self._carry.shape, dtype=data.dtype)
+			if head:
+				out[0] = self._carry
+			if count:
+				# The frames of the block are a strided view, they are copied in one operation.
+				out[head:] = frame_view(data[start:stop], lines)[:, :, camera]
+			self._put(FrameBatch(out, block, self.frames_assembled, time.monotonic_ns()))
+			self.frames_assembled += out.shape[0]
+		self._pending = data.shape[0] - stop
+		if self._pending:
+			self._carry[:self._pending] = data[stop:, camera]
+		return None
+
+	def finish(self):
+		"""
+		Called by BlockStream when it is stopped. Ends the iteration of batches after the queued batches.
+		"""
+		self._queue.put_nowait(None)
+
+	def get(self, timeout: Optional[float] = None) -> Optional[FrameBatch]:
+		"""
+		Get the oldest batch of frames in the queue.
+
+		Args:
+			timeout (float, optional): Maximum time in seconds to wait for a batch. None waits forever.
+
+		Returns:
+			Optional[FrameBatch]: The batch or None if there was no batch within the timeout or the stream was stopped.
+		"""
+		try:
+			return self._queue.get(timeout=timeout)
+		except queue.Empty:
+			return None
+
+	def batches(self, timeout: Optional[float] = None) -> Iterator[FrameBatch]:
+		"""
+		Iterate over the batches until the stream is stopped or no batch arrives within the timeout.
+
+		Args:
+			timeout (float, optional): Maximum time in seconds to wait for each batch. None waits until the stream is stopped.
+
+		Yields:
+			FrameBatch: The batches in the order they were assembled.
+		"""
+		while True:
+			batch = self.get(timeout)
+			if batch is None:
+				return
+			yield batch
@@ -0,0 +1,166 @@
+## @file: multiboard.py
+# @brief: Synchronized acquisition with several PCIe boards.
+# @details: The progress of every selected board is tracked with get_current_scan_number. A block is read out from all boards concurrently as soon as every board has completed it and is delivered as one bundle with host timestamps.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from . import core
+from .timing import BlockTimestamps
+
+__all__ = ["BlockBundle", "MultiBoardAcquisition"]
+
+@dataclass
+class BlockBundle:
+	"""
+	The data of one block from all boards.
+
+	Attributes:
+		block (int): Block number in the buffer, 0..nob-1.
+		cycle (int): Number of the measurement cycle, counts up in continuous mode.
+		data (Dict[int, numpy.ndarray]): Block data of each board with the shape (nos, camcnt, pixel).
+		completed_ns (Dict[int, int]): time.monotonic_ns() at which the completion of the block was detected for each board.
+		read_ns (int): time.monotonic_ns() after all boards were read out.
+	"""
+	block: int
+	cycle: int
+	data: Dict[int, np.ndarray]
+	completed_ns: Dict[int, int]
+	read_ns: int = 0
+
+	@property
+	def skew_ns(self) -> int:
+		"""
+		Time between the first and the last board completing this block in nanoseconds. The resolution is limited by the poll interval.
+		"""
+		return max(self.completed_ns.values()) - min(self.completed_ns.values())
+
+@dataclass
+class _BoardProgress:
+	cycle: int = 0
+	# Position of the last scan in the buffer, block * nos + sample.
+	last_scan: int = -1
+	completed: int = 0
+	# Completion times of the blocks that were not delivered yet, the first entry belongs to the next bundle.
+	completed_ns: Deque[int] = field(default_factory=deque)
+
+class MultiBoardAcquisition:
+	"""
+	Starts a measurement on all selected boards and delivers the blocks of all boards aligned. Usage:
+
+		acquisition = stresing.MultiBoardAcquisition()
+		for bundle in acquisition.run():
+			process(bundle.data[0], bundle.data[1])
+		print(acquisition.skew_statistics())
+	"""
+	def __init__(self, boards: Optional[Sequence[int]] = None, poll_interval: float = 0.0002, copy: bool = True, timestamps: Optional[BlockTimestamps] = None):
+		"""
+		Args:
+			boards (Sequence[int], optional): Board numbers. When None, the boards selected by settings.board_sel are used.
+			poll_interval (float): Time in seconds between two calls of get_current_scan_number.
+			copy (bool): Copy the blocks out of the DLL buffers. When False, the bundles contain zero-copy views, which are only valid until the DLL writes the block again.
+			timestamps (BlockTimestamps, optional): When given, the completion time of every block of every board is recorded in it.
+		"""
+		self.boards = list(boards) if boards is not None else core.selected_boards()
+		if not self.boards:
+			raise ValueError("No board selected")
+		self.poll_interval = poll_interval
+		self.copy = copy
+		self.timestamps = timestamps
+		self.skews_ns: List[int] = []
+		self._stop = False
+
+	def _completed_blocks(self, drvno: int, progress: _BoardProgress) -> int:
+		"""
+		Update the progress of one board and return the number of blocks it has completed since the start.
+		"""
+		sample, block = core.get_current_scan_number(drvno)
+		if block < 0 or sample < 0:
+			return progress.completed
+		scan = block * core.settings.nos + sample
+		if scan < progress.last_scan:
+			# The scan counter went back, continuous mode started the next cycle. The sample is compared as well, so this also works with one block.
+			progress.cycle += 1
+		progress.last_scan = scan
+		completed = progress.cycle * core.settings.nob + block
+		if sample >= core.settings.nos - 1:
+			completed += 1
+		now = time.monotonic_ns()
+		while progress.completed < completed:
+			progress.completed_ns.append(now)
+			progress.completed += 1
+		return progress.completed
+
+	def _read(self, drvno: int, block: int) -> np.ndarray:
+		data = core.get_block_array(drvno, block)
+		return data.copy() if self.copy else data
+
+	def run(self, init: bool = True, timeout: Optional[float] = None) -> Iterator[BlockBundle]:
+		"""
+		Start the measurement and yield one bundle per block as soon as all boards have completed it. Without continuous mode, the iteration ends after nob blocks. In continuous mode it runs until stop() is called, the measurement is aborted or the timeout expires.
+
+		Args:
+			init (bool): Call init_measurement before starting the measurement.
+			timeout (float, optional): Maximum time in seconds to wait for the next block.
+
+		Yields:
+			BlockBundle: The data of one block from all boards.
+
+		Raises:
+			TimeoutError: If no block is completed by all boards within the timeout.
+		"""
+		if init:
+			core.init_measurement()
+		self._stop = False
+		self.skews_ns = []
+		progress = {drvno: _BoardProgress() for drvno in self.boards}
+		nob = core.settings.nob
+		continuous = bool(core.settings.contiuous_measurement)
+		delivered = 0
+		core.start_measurement_nonblocking()
+		with ThreadPoolExecutor(max_workers=len(self.boards), thread_name_prefix="stresing-multiboard") as pool:
+			last_progress = time.monotonic()
+			while not self._stop and (continuous or delivered < nob):
+				ready = min(self._completed_blocks(drvno, progress[drvno]) for drvno in self.boards)
+				if ready <= delivered:
+					if timeout is not None and time.monotonic() - last_progress > timeout:
+						raise TimeoutError(f"No block completed by all boards within {timeout} s")
+					time.sleep(self.poll_interval)
+					continue
+				last_progress = time.monotonic()
+				while delivered < ready:
+					block = delivered % nob
+					# All boards are read out concurrently, numpy releases the GIL while copying.
+					arrays = list(pool.map(lambda drvno: self._read(drvno, block), self.boards))
+					bundle = BlockBundle(block=block, cycle=delivered // nob, data=dict(zip(self.boards, arrays)), completed_ns={drvno: progress[drvno].completed_ns.popleft() for drvno in self.boards}, read_ns=time.monotonic_ns())
+					self.skews_ns.append(bundle.skew_ns)
+					if self.timestamps is not None:
+						for drvno, completed_ns in bundle.completed_ns.items():
+							self.timestamps.record_done(drvno, delivered, block, completed_ns)
+					delivered += 1
+					yield bundle
+
+	def stop(self):
+		"""
+		Stop the iteration of run after the current block. The measurement itself is not aborted, call abort_measurement for that.
+		"""
+		self._stop = True
+
+	def skew_statistics(self) -> Dict[str, float]:
+		"""
+		Statistics of the skew between the boards of all delivered blocks.
+
+		Returns:
+			Dict[str, float]: "blocks", and "mean_ns", "median_ns", "p95_ns" and "max_ns" of the skew.
+		"""
+		skews = np.asarray(self.skews_ns, dtype=np.float64)
+		if skews.size == 0:
+			return {"blocks": 0, "mean_ns": 0.0, "median_ns": 0.0, "p95_ns": 0.0, "max_ns": 0.0}
+		return {"blocks": int(skews.size), "mean_ns": float(skews.mean()), "median_ns": float(np.median(skews)), "p95_ns": float(np.percentile(skews, 95)), "max_ns": float(skews.max())}
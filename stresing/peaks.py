@@ -0,0 +1,136 @@
+## @file: peaks.py
+# @brief: Peak finding and centroid tracking while the measurement is running.
+# @details: The PeakTracker stage computes sub-pixel centroid, height and FWHM of one peak per window for every sample of every block with numpy. Only these values are kept, not the raw frames.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .stream import BlockStage
+
+__all__ = ["peak_parameters", "PeakTracker"]
+
+def peak_parameters(spectra: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+	"""
+	Calculate the centroid, height and FWHM of one peak in each spectrum. The minimum of each spectrum is used as baseline. The FWHM is the distance between the first and the last half maximum crossing, linearly interpolated between pixels.
+
+	Args:
+		spectra (numpy.ndarray): Array with the shape (n, pixel), one spectrum per row.
+
+	Returns:
+		Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]: Centroid in pixels relative to the first pixel of the spectrum, height above baseline and FWHM in pixels, each a float32 array with the shape (n,). The centroid is NaN for flat spectra.
+	"""
+	y = spectra.astype(np.float32)
+	y -= y.min(axis=-1, keepdims=True)
+	height = y.max(axis=-1)
+	total = y.sum(axis=-1)
+	x = np.arange(y.shape[-1], dtype=np.float32)
+	with np.errstate(invalid="ignore", divide="ignore"):
+		centroid = (y @ x) / total
+	half = (height / 2)[:, np.newaxis]
+	above = y >= half
+	width = y.shape[-1]
+	left = np.argmax(above, axis=-1)
+	right = width - 1 - np.argmax(above[:, ::-1], axis=-1)
+	rows = np.arange(y.shape[0])
+	# Interpolate the crossing between the last pixel below and the first pixel above half maximum.
+	left_outer = np.maximum(left - 1, 0)
+	right_outer = np.minimum(right + 1, width - 1)
+	with np.errstate(invalid="ignore", divide="ignore"):
+		left_fraction = np.where(left > 0, (y[rows, left] - half[:, 0]) / (y[rows, left] - y[rows, left_outer]), 0)
+		right_fraction = np.where(right < width - 1, (y[rows, right] - half[:, 0]) / (y[rows, right] - y[rows, right_outer]), 0)
+	fwhm = (right - left) + np.nan_to_num(left_fraction) + np.nan_to_num(right_fraction)
+	fwhm = np.where(height > 0, fwhm, 0)
+	return centroid.astype(np.float32), height.astype(np.float32), fwhm.astype(np.float32)
+
+class PeakTracker(BlockStage):
+	"""
+	Stage for BlockStream that tracks one peak per pixel window in every sample. With follow, each window is moved after every block so that it is centered on the median centroid of the peak in that block.
+	"""
+	def __init__(self, windows: Sequence[Tuple[int, int]], camera: int = 0, follow: bool = False):
+		"""
+		Args:
+			windows (Sequence[Tuple[int, int]]): Initial windows as (start pixel, length in pixel), one per peak.
+			camera (int): Camera number.
+			follow (bool): Move the windows with the peaks.
+		"""
+		if not windows:
+			raise ValueError("At least one window is needed")
+		self.windows = [(int(start), int(length)) for start, length in windows]
+		for i, (start, length) in enumerate(self.windows):
+			if length < 1 or start < 0:
+				raise ValueError(f"Window {i} has an invalid range ({start}, {length})")
+		self.camera = camera
+		self.follow = follow
+		self._centroid: List[np.ndarray] = []
+		self._height: List[np.ndarray] = []
+		self._fwhm: List[np.ndarray] = []
+		self._block: List[np.ndarray] = []
+		self._window_start: List[np.ndarray] = []
+		self._pixel: Optional[int] = None
+
+	def _check_windows(self, camcnt: int, pixel: int):
+		"""
+		Check that the camera and all windows are inside of the sensor.
+		"""
+		if self.camera >= camcnt:
+			raise ValueError(f"Camera {self.camera} does not exist, there are {camcnt} cameras")
+		for i, (start, length) in enumerate(self.windows):
+			if start + length > pixel:
+				raise ValueError(f"Window {i} ({start}, {length}) is outside of the {pixel} pixels of the camera")
+		self._pixel = pixel
+
+	def process_block(self, block: int, data: np.ndarray) -> None:
+		"""
+		Track the peaks in all samples of one block.
+
+		Args:
+			block (int): Block number.
+			data (numpy.ndarray): Block data with the shape (nos, camcnt, pixel).
+
+		Raises:
+			ValueError: If a window is outside of the pixels of the camera, checked at the first block.
+		"""
+		if self._pixel is None:
+			self._check_windows(data.shape[1], data.shape[2])
+		spectra = data[:, self.camera, :]
+		nos, pixel = spectra.shape
+		centroid = np.empty((nos, len(self.windows)), dtype=np.float32)
+		height = np.empty_like(centroid)
+		fwhm = np.empty_like(centroid)
+		for i, (start, length) in enumerate(self.windows):
+			c, h, w = peak_parameters(spectra[:, start:start + length])
+			centroid[:, i] = c + start
+			height[:, i] = h
+			fwhm[:, i] = w
+		self._centroid.append(centroid)
+		self._height.append(height)
+		self._fwhm.append(fwhm)
+		self._block.append(np.full(nos, block, dtype=np.int64))
+		self._window_start.append(np.array([start for start, _ in self.windows], dtype=np.int64))
+		if self.follow:
+			medians = np.nanmedian(centroid, axis=0)
+			for i, (start, length) in enumerate(self.windows):
+				if np.isfinite(medians[i]):
+					new_start = int(round(medians[i] - length / 2))
+					self.windows[i] = (min(max(new_start, 0), pixel - length), length)
+
+	def result(self) -> Dict[str, np.ndarray]:
+		"""
+		Get the tracked values of all processed samples.
+
+		Returns:
+			Dict[str, numpy.ndarray]: "centroid" (absolute pixel position), "height" and "fwhm" as float32 arrays with the shape (samples, windows), "block" with the block number of each sample and "window_start" with the start pixel of each window in each block, with the shape (blocks, windows).
+		"""
+		windows = len(self.windows)
+		def join(chunks, shape, dtype):
+			return np.concatenate(chunks) if chunks else np.empty(shape, dtype=dtype)
+		return {
+			"centroid": join(self._centroid, (0, windows), np.float32),
+			"height": join(self._height, (0, windows), np.float32),
+			"fwhm": join(self._fwhm, (0, windows), np.float32),
+			"block": join(self._block, (0,), np.int64),
+			"window_start": np.stack(self._window_start) if self._window_start else np.empty((0, windows), dtype=np.int64),
+		}
@@ -0,0 +1,242 @@
+## @file: pixel_health.py
+# @brief: Map of defective pixels that is updated while the measurement is running.
+# @details: The PixelHealth stage keeps running statistics of every pixel of every camera and flags saturated, stuck, hot, dead and outlier pixels after each block. Defective pixels can be replaced by linear interpolation between their nearest good neighbours with precomputed indices, so repairing a block is a few numpy operations.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from .stream import BlockStage
+
+__all__ = ["PIXEL_SATURATED", "PIXEL_STUCK", "PIXEL_HOT", "PIXEL_DEAD", "PIXEL_OUTLIER", "PixelHealth"]
+
+# Flags of the pixel map. One pixel can have several flags.
+PIXEL_SATURATED = 1
+PIXEL_STUCK = 2
+PIXEL_HOT = 4
+PIXEL_DEAD = 8
+PIXEL_OUTLIER = 16
+_FLAG_NAMES = {PIXEL_SATURATED: "saturated", PIXEL_STUCK: "stuck", PIXEL_HOT: "hot", PIXEL_DEAD: "dead", PIXEL_OUTLIER: "outlier"}
+
+def _robust_sigma(values: np.ndarray, axis: int = -1) -> np.ndarray:
+	"""
+	Standard deviation estimated from the median absolute deviation, which ignores the outliers it is used to find.
+	"""
+	median = np.median(values, axis=axis, keepdims=True)
+	return 1.4826 * np.median(np.abs(values - median), axis=axis, keepdims=True)
+
+def _local_median(values: np.ndarray, neighbours: int) -> np.ndarray:
+	"""
+	Median of the neighbourhood of every pixel along the last axis. The first and last neighbours pixels have no complete neighbourhood, their median is extrapolated linearly from the medians of the first and last complete neighbourhoods. Padding the line with copies of the edge pixel instead would put an outlier at the edge into its own neighbourhood.
+	"""
+	size = 2 * neighbours + 1
+	pixel = values.shape[-1]
+	if neighbours == 0:
+		return values.copy()
+	if pixel < size + neighbours:
+		# Too short to extrapolate, the line is padded with the edge pixels.
+		padded = np.pad(values, ((0, 0), (neighbours, neighbours)), mode="edge")
+		return np.median(np.lib.stride_tricks.sliding_window_view(padded, size, axis=-1), axis=-1)
+	local = np.empty_like(values, dtype=np.float64)
+	inner = np.median(np.lib.stride_tricks.sliding_window_view(values, size, axis=-1), axis=-1)
+	local[..., neighbours:pixel - neighbours] = inner
+	steps = np.arange(-neighbours, 0)
+	local[..., :neighbours] = inner[..., :1] + steps * (inner[..., neighbours:neighbours + 1] - inner[..., :1]) / neighbours
+	local[..., pixel - neighbours:] = inner[..., -1:] - steps[::-1] * (inner[..., -1:] - inner[..., -neighbours - 1:-neighbours]) / neighbours
+	return local
+
+class PixelHealth(BlockStage):
+	"""
+	Stage for BlockStream that flags defective pixels of one board. After every block the flags are evaluated from the statistics of all samples so far:
+
+	- PIXEL_SATURATED: More than saturation_fraction of the samples are at the ADC full scale.
+	- PIXEL_STUCK: The value did not change in at least min_samples samples.
+	- PIXEL_HOT: The dark frame is more than hot_sigma robust standard deviations above the median dark level of the camera. Only evaluated when a dark frame is set.
+	- PIXEL_DEAD, PIXEL_OUTLIER: The mean is more than outlier_sigma robust standard deviations of the neighbourhood below or above the median of its neighbours.
+
+	With repair, process_block passes a copy of the block with all flagged pixels interpolated to the next stage.
+
+	Attributes:
+		flags (numpy.ndarray): uint8 array with the shape (camcnt, pixel) with the flags of each pixel, None before the first block.
+		samples (int): Number of samples in the statistics.
+	"""
+	def __init__(self, adc_bits: int = 16, saturation_fraction: float = 0.0, min_samples: int = 16, dark: Optional[np.ndarray] = None, hot_sigma: float = 6.0, outlier_sigma: float = 5.0, neighbours: int = 2, repair: bool = False):
+		"""
+		Args:
+			adc_bits (int): Resolution of the ADC, 16 or 14 bit. Values at (1 << adc_bits) - 1 are saturated.
+			saturation_fraction (float): Fraction of saturated samples above which a pixel is flagged.
+			min_samples (int): Number of samples before pixels are flagged as stuck.
+			dark (numpy.ndarray, optional): Dark frame with the shape (camcnt, pixel) for hot pixels, for example Correction.dark.
+			hot_sigma (float): Threshold for hot pixels in robust standard deviations.
+			outlier_sigma (float): Threshold for dead and outlier pixels in robust standard deviations.
+			neighbours (int): Number of pixels on each side that form the neighbourhood of a pixel.
+			repair (bool): Pass repaired blocks to the next stage.
+		"""
+		self.full_scale = (1 << adc_bits) - 1
+		self.saturation_fraction = saturation_fraction
+		self.min_samples = min_samples
+		self.hot_sigma = hot_sigma
+		self.outlier_sigma = outlier_sigma
+		self.neighbours = neighbours
+		self.repair_blocks = repair
+		self.dark = None if dark is None else np.atleast_2d(np.asarray(dark, dtype=np.float32))
+		self.reset()
+
+	def reset(self):
+		"""
+		Forget all statistics and flags.
+		"""
+		self.flags: Optional[np.ndarray] = None
+		self.samples = 0
+		self._sum: Optional[np.ndarray] = None
+		self._minimum: Optional[np.ndarray] = None
+		self._maximum: Optional[np.ndarray] = None
+		self._saturated: Optional[np.ndarray] = None
+		self._plan = None
+		self._buffer: Optional[np.ndarray] = None
+
+	def set_dark(self, dark: np.ndarray):
+		"""
+		Set the dark frame for hot pixels and evaluate the flags again.
+
+		Args:
+			dark (numpy.ndarray): Dark frame with the shape (camcnt, pixel).
+		"""
+		self.dark = np.atleast_2d(np.asarray(dark, dtype=np.float32))
+		if self.samples:
+			self._evaluate()
+
+	def update(self, data: np.ndarray):
+		"""
+		Add samples to the statistics and evaluate the flags.
+
+		Args:
+			data (numpy.ndarray): Samples with the shape (samples, camcnt, pixel).
+		"""
+		if self._sum is None:
+			shape = data.shape[1:]
+			self._sum = np.zeros(shape, dtype=np.float64)
+			self._minimum = np.full(shape, np.iinfo(np.int64).max, dtype=np.int64)
+			self._maximum = np.full(shape, np.iinfo(np.int64).min, dtype=np.int64)
+			self._saturated = np.zeros(shape, dtype=np.int64)
+		self._sum += data.sum(axis=0, dtype=np.float64)
+		np.minimum(self._minimum, data.min(axis=0), out=self._minimum)
+		np.maximum(self._maximum, data.max(axis=0), out=self._maximum)
+		self._saturated += np.count_nonzero(data >= self.full_scale, axis=0)
+		self.samples += data.shape[0]
+		self._evaluate()
+
+	def _evaluate(self):
+		flags = np.zeros(self._sum.shape, dtype=np.uint8)
+		flags[self._saturated > self.saturation_fraction * self.samples] |= PIXEL_SATURATED
+		if self.samples >= self.min_samples:
+			flags[self._minimum == self._maximum] |= PIXEL_STUCK
+		if self.dark is not None:
+			sigma = np.maximum(_robust_sigma(self.dark), 1.0)
+			flags[self.dark > np.median(self.dark, axis=-1, keepdims=True) + self.hot_sigma * sigma] |= PIXEL_HOT
+		mean = self._sum / self.samples
+		residual = mean - _local_median(mean, self.neighbours)
+		# The spread of the residuals in the neighbourhood scales the threshold, so pixels next to an outlier, whose median is shifted by it, are not flagged. The noise floor of one count keeps perfectly flat signals from flagging every pixel.
+		padded = np.pad(residual, ((0, 0), (self.neighbours, self.neighbours)), mode="edge")
+		local_sigma = _robust_sigma(np.lib.stride_tricks.sliding_window_view(padded, 2 * self.neighbours + 1, axis=-1))[..., 0]
+		threshold = self.outlier_sigma * np.maximum(np.maximum(local_sigma, _robust_sigma(residual)), 1.0)
+		flags[residual < -threshold] |= PIXEL_DEAD
+		flags[residual > threshold] |= PIXEL_OUTLIER
+		if self.flags is None or not np.array_equal(flags, self.flags):
+			self._plan = None
+		self.flags = flags
+
+	@property
+	def mask(self) -> Optional[np.ndarray]:
+		"""
+		Boolean array with the shape (camcnt, pixel), True for flagged pixels. None before the first block.
+		"""
+		return None if self.flags is None else self.flags != 0
+
+	def counts(self) -> Dict[str, int]:
+		"""
+		Number of pixels with each flag.
+
+		Returns:
+			Dict[str, int]: "saturated", "stuck", "hot", "dead", "outlier" and "total" for pixels with any flag.
+		"""
+		if self.flags is None:
+			return {name: 0 for name in list(_FLAG_NAMES.values()) + ["total"]}
+		result = {name: int(np.count_nonzero(self.flags & flag)) for flag, name in _FLAG_NAMES.items()}
+		result["total"] = int(np.count_nonzero(self.flags))
+		return result
+
+	def _interpolation_plan(self):
+		"""
+		Indices of all flagged pixels with their nearest good neighbours on both sides and the interpolation weight of the right neighbour.
+		"""
+		if self._plan is None:
+			cameras, bad, left, right, weight = [], [], [], [], []
+			for camera, camera_mask in enumerate(self.mask):
+				good = np.flatnonzero(~camera_mask)
+				flagged = np.flatnonzero(camera_mask)
+				if good.size == 0 or flagged.size == 0:
+					continue
+				position = np.searchsorted(good, flagged)
+				l = good[np.maximum(position - 1, 0)]
+				r = good[np.minimum(position, good.size - 1)]
+				# Pixels at the edges are copied from the single neighbour they have.
+				w = np.where(r != l, (flagged - l) / np.where(r != l, r - l, 1), 0.0)
+				w = np.where(position == 0, 1.0, w)
+				cameras.append(np.full(flagged.size, camera))
+				bad.append(flagged)
+				left.append(l)
+				right.append(r)
+				weight.append(w)
+			if bad:
+				self._plan = tuple(np.concatenate(a) for a in (cameras, bad, left, right)) + (np.concatenate(weight).astype(np.float32),)
+			else:
+				self._plan = ()
+		return self._plan
+
+	def repair(self, data: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+		"""
+		Replace all flagged pixels by linear interpolation between the nearest good pixels of the same sample.
+
+		Args:
+			data (numpy.ndarray): Data with the shape (..., camcnt, pixel), for example one block or all data of get_all_data_array.
+			out (numpy.ndarray, optional): Array for the result with the shape and dtype of data. It can be data itself. When None, a copy is made.
+
+		Returns:
+			numpy.ndarray: The repaired data.
+		"""
+		if out is None:
+			out = data.copy()
+		elif out is not data:
+			out[...] = data
+		if self.flags is None:
+			return out
+		plan = self._interpolation_plan()
+		if not plan:
+			return out
+		cameras, bad, left, right, weight = plan
+		values = data[..., cameras, left] * (1 - weight) + data[..., cameras, right] * weight
+		if np.issubdtype(out.dtype, np.integer):
+			values = np.rint(values)
+		out[..., cameras, bad] = values
+		return out
+
+	def process_block(self, block: int, data: np.ndarray) -> Optional[np.ndarray]:
+		"""
+		Stage interface for BlockStream. Updates the flags with the block and, with repair, returns the repaired block in a buffer that is reused for every block.
+
+		Args:
+			block (int): Block number.
+			data (numpy.ndarray): Block data with the shape (nos, camcnt, pixel).
+
+		Returns:
+			Optional[numpy.ndarray]: The repaired block or None without repair.
+		"""
+		self.update(data)
+		if not self.repair_blocks:
+			return None
+		if self._buffer is None or self._buffer.shape != data.shape or self._buffer.dtype != data.dtype:
+			self._buffer = np.empty_like(data)
+		return self.repair(data, out=self._buffer)
@@ -0,0 +1,197 @@
+## @file: planner.py
+# @brief: Data rate and memory planning from the measurement settings.
+# @details: plan calculates the data volume, the expected data rate and the host memory for each copy strategy before a measurement is initialized, and warns about configurations that will overrun or exhaust memory.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import ctypes
+import math
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from . import core
+from .timing import BTI_BTIMER
+
+__all__ = ["STI_STIMER", "BoardPlan", "MeasurementPlan", "physical_memory", "plan"]
+
+# sti_mode of the sample timer. Only in this mode the sample period is known in advance.
+STI_STIMER = 4
+# Host memory per value for each way to get the data: copy_* functions build a Python list with one int object (28 bytes) and one list slot (8 bytes) per value, besides the 2 byte ctypes buffer. copy_one_block_numpy and .copy() of an array view need 2 bytes per value, views of the DLL buffer need nothing.
+BYTES_PER_VALUE = {"list": 2 + 8 + 28, "ndarray": 2, "view": 0}
+
+@dataclass
+class BoardPlan:
+	"""
+	Plan of one board.
+
+	Attributes:
+		drvno (int): Board number.
+		bytes_per_sample (int): Bytes of one sample of all cameras.
+		bytes_per_block (int): Bytes of one block.
+		bytes_per_run (int): Bytes of all blocks. This is also the size of the data buffer of the DLL.
+		sample_period_s (float, optional): Sample period from stime, None when samples are triggered externally.
+		block_period_s (float, optional): Time between two blocks, from btime and the duration of the samples of one block. None when it depends on external triggers.
+		run_duration_s (float, optional): Expected duration of one measurement cycle.
+		data_rate_bytes_per_s (float, optional): Average data rate.
+		ram_bytes (Dict[str, int]): Host memory to copy the whole measurement for each strategy "list", "ndarray" and "view", including the DLL buffer.
+		recommended_dma_buffer_size_in_scans (int, optional): DMA buffer size that covers the DMA latency budget.
+	"""
+	drvno: int
+	bytes_per_sample: int
+	bytes_per_block: int
+	bytes_per_run: int
+	sample_period_s: Optional[float]
+	block_period_s: Optional[float]
+	run_duration_s: Optional[float]
+	data_rate_bytes_per_s: Optional[float]
+	ram_bytes: Dict[str, int]
+	recommended_dma_buffer_size_in_scans: Optional[int]
+
+@dataclass
+class MeasurementPlan:
+	"""
+	Plan of a measurement with all selected boards.
+
+	Attributes:
+		boards (Dict[int, BoardPlan]): Plan of each selected board.
+		available_memory_bytes (int, optional): Physical memory of the host, None when it is unknown.
+		warnings (List[str]): Problems found in the settings.
+	"""
+	boards: Dict[int, BoardPlan]
+	available_memory_bytes: Optional[int]
+	warnings: List[str] = field(default_factory=list)
+
+	@property
+	def bytes_per_run(self) -> int:
+		"""
+		Bytes of one measurement cycle of all boards.
+		"""
+		return sum(board.bytes_per_run for board in self.boards.values())
+
+	@property
+	def data_rate_bytes_per_s(self) -> Optional[float]:
+		"""
+		Average data rate of all boards, None when the rate of one board is unknown.
+		"""
+		rates = [board.data_rate_bytes_per_s for board in self.boards.values()]
+		return None if any(rate is None for rate in rates) else sum(rates)
+
+	def ram_bytes(self, strategy: str) -> int:
+		"""
+		Host memory of all boards for one copy strategy: "list", "ndarray" or "view".
+		"""
+		return sum(board.ram_bytes[strategy] for board in self.boards.values())
+
+	def summary(self) -> str:
+		"""
+		Human readable summary of the plan.
+		"""
+		mb = 1024 * 1024
+		lines = []
+		for board in self.boards.values():
+			rate = "unknown (external trigger)" if board.data_rate_bytes_per_s is None else f"{board.data_rate_bytes_per_s / mb:.2f} MB/s"
+			lines.append(f"Board {board.drvno}: {board.bytes_per_block / mb:.3f} MB per block, {board.bytes_per_run / mb:.3f} MB per run, data rate {rate}")
+			lines.append("  RAM: " + ", ".join(f"{strategy} {size / mb:.1f} MB" for strategy, size in board.ram_bytes.items()))
+			if board.recommended_dma_buffer_size_in_scans is not None:
+				lines.append(f"  Recommended dma_buffer_size_in_scans: {board.recommended_dma_buffer_size_in_scans}")
+		total_rate = self.data_rate_bytes_per_s
+		lines.append(f"Total: {self.bytes_per_run / mb:.3f} MB per run" + ("" if total_rate is None else f", {total_rate / mb:.2f} MB/s"))
+		if self.available_memory_bytes is not None:
+			lines.append(f"Host memory: {self.available_memory_bytes / mb:.0f} MB")
+		lines.extend("Warning: " + warning for warning in self.warnings)
+		return "\n".join(lines)
+
+def physical_memory() -> Optional[int]:
+	"""
+	Get the physical memory of the host.
+
+	Returns:
+		Optional[int]: Size in bytes or None when it can not be determined.
+	"""
+	if os.name == 'nt':
+		class MEMORYSTATUSEX(ctypes.Structure):
+			_fields_ = [("dwLength", ctypes.c_uint32), ("dwMemoryLoad", ctypes.c_uint32), ("ullTotalPhys", ctypes.c_uint64), ("ullAvailPhys", ctypes.c_uint64), ("ullTotalPageFile", ctypes.c_uint64), ("ullAvailPageFile", ctypes.c_uint64), ("ullTotalVirtual", ctypes.c_uint64), ("ullAvailVirtual", ctypes.c_uint64), ("ullAvailExtendedVirtual", ctypes.c_uint64)]
+		status = MEMORYSTATUSEX()
+		status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+		if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+			return int(status.ullTotalPhys)
+		return None
+	try:
+		return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+	except (ValueError, OSError, AttributeError):
+		return None
+
+def plan(ms: Optional[core.measurement_settings] = None, available_memory_bytes: Optional[int] = None, strategy: str = "list", dma_latency_s: float = 0.05, log_warnings: bool = True) -> MeasurementPlan:
+	"""
+	Calculate data volume, data rate and host memory of a measurement without initializing it. stime and btime are scaled with timer_resolution_mode of each board, see timer_resolution_ns.
+
+	Args:
+		ms (measurement_settings, optional): Settings to plan. When None, stresing.settings is used.
+		available_memory_bytes (int, optional): Host memory to check against. When None, the physical memory of the host is used.
+		strategy (str): Copy strategy that is checked against the memory: "list" for the copy_* functions, "ndarray" for numpy copies or "view" for zero-copy views.
+		dma_latency_s (float): Time the DMA buffer must be able to bridge, used for the recommended DMA buffer size.
+		log_warnings (bool): Log every warning with the logger of the module.
+
+	Returns:
+		MeasurementPlan: The plan with the warnings.
+
+	Raises:
+		ValueError: If the strategy or the timer_resolution_mode of a selected board is unknown.
+	"""
+	if strategy not in BYTES_PER_VALUE:
+		raise ValueError(f"Unknown strategy {strategy}, must be one of {', '.join(BYTES_PER_VALUE)}")
+	ms = core.settings if ms is None else ms
+	if available_memory_bytes is None:
+		available_memory_bytes = physical_memory()
+	boards = {}
+	warnings = []
+	for drvno in range(len(ms.camera_settings)):
+		if not ms.board_sel >> drvno & 1:
+			continue
+		cs = ms.camera_settings[drvno]
+		values_per_sample = cs.pixel * cs.camcnt
+		values_per_run = values_per_sample * ms.nos * ms.nob
+		# Unit of stime and btime in seconds.
+		timer_unit = core.timer_resolution_ns(drvno, ms) * 1e-9
+		sample_period = cs.stime * timer_unit if cs.sti_mode == STI_STIMER and cs.stime > 0 else None
+		samples_duration = sample_period * ms.nos if sample_period is not None else None
+		block_period = None
+		if cs.bti_mode == BTI_BTIMER and cs.btime > 0:
+			block_period = cs.btime * timer_unit
+			if samples_duration is not None and samples_duration > block_period:
+				warnings.append(f"Board {drvno}: nos * stime = {samples_duration * 1e3:.3f} ms is longer than btime = {block_period * 1e3:.3f} ms, block triggers will be missed.")
+				block_period = samples_duration
+		elif samples_duration is not None and ms.nob == 1:
+			block_period = samples_duration
+		run_duration = block_period * ms.nob if block_period is not None else None
+		bytes_per_run = values_per_run * 2
+		data_rate = bytes_per_run / run_duration if run_duration else None
+		if ms.contiuous_measurement and run_duration is not None:
+			cycle = run_duration + ms.cont_pause_in_microseconds * 1e-6
+			data_rate = bytes_per_run / cycle
+		recommended_dma = None
+		if sample_period is not None:
+			recommended_dma = max(2, math.ceil(dma_latency_s / sample_period))
+			recommended_dma += recommended_dma % 2
+			if cs.dma_buffer_size_in_scans < recommended_dma:
+				warnings.append(f"Board {drvno}: dma_buffer_size_in_scans = {cs.dma_buffer_size_in_scans} covers only {cs.dma_buffer_size_in_scans * sample_period * 1e3:.1f} ms, {recommended_dma} scans are recommended to bridge {dma_latency_s * 1e3:.0f} ms.")
+		# The DLL keeps the whole measurement in its own buffer, the copy strategies come on top of it.
+		ram = {name: bytes_per_run + values_per_run * size for name, size in BYTES_PER_VALUE.items()}
+		boards[drvno] = BoardPlan(drvno, values_per_sample * 2, values_per_sample * 2 * ms.nos, bytes_per_run, sample_period, block_period, run_duration, data_rate, ram, recommended_dma)
+	if not boards:
+		warnings.append("No board is selected in board_sel.")
+	result = MeasurementPlan(boards, available_memory_bytes, warnings)
+	if available_memory_bytes is not None and boards:
+		needed = result.ram_bytes(strategy)
+		if needed > available_memory_bytes:
+			warnings.append(f"Copying the measurement as {strategy} needs {needed / 2**20:.0f} MB, but the host has only {available_memory_bytes / 2**20:.0f} MB.")
+		elif result.bytes_per_run > available_memory_bytes / 2:
+			warnings.append(f"The DLL buffers need {result.bytes_per_run / 2**20:.0f} MB, more than half of the {available_memory_bytes / 2**20:.0f} MB host memory.")
+	if sys.maxsize <= 2**32 and any(board.bytes_per_run >= 2**31 for board in boards.values()):
+		warnings.append("The data buffer of one board exceeds 2 GB, which a 32 bit Python can not address.")
+	if log_warnings:
+		for warning in warnings:
+			core.logger.warning(warning)
+	return result
@@ -0,0 +1,191 @@
+## @file: preview.py
+# @brief: Decimated live preview of a running measurement.
+# @details: A PreviewTap reads the samples that were measured since its last frame at a fixed rate and publishes one frame per interval. Frames that are not consumed in time are replaced by newer ones, so a slow display never slows down the acquisition.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from . import core
+
+__all__ = ["PreviewFrame", "PreviewTap"]
+
+@dataclass
+class PreviewFrame:
+	"""
+	One preview frame.
+
+	Attributes:
+		data (numpy.ndarray): For the modes "latest" and "mean" an array with the shape (camcnt, pixel), for "minmax" an array with the shape (2, camcnt, pixel) with the minimum and the maximum.
+		samples (int): Number of samples the frame was computed from.
+		block (int): Block of the last sample.
+		sample (int): Last sample.
+		time_ns (int): time.monotonic_ns() when the frame was published.
+	"""
+	data: np.ndarray
+	samples: int
+	block: int
+	sample: int
+	time_ns: int
+
+class PreviewTap:
+	"""
+	Publishes at most max_fps frames per second of a running measurement to a display. Usage:
+
+		tap = stresing.PreviewTap(max_fps=20, mode="mean")
+		stresing.init_measurement()
+		tap.start()
+		stresing.start_measurement_nonblocking()
+		while running:
+			frame = tap.get_frame(timeout=1)
+			if frame is not None:
+				line.set_ydata(frame.data[0])
+		tap.stop()
+
+	Attributes:
+		published (int): Number of published frames.
+		dropped (int): Number of frames that were replaced by a newer frame before get_frame fetched them.
+	"""
+	MODES = ("latest", "mean", "minmax")
+
+	def __init__(self, max_fps: float = 25.0, mode: str = "latest", drvno: int = 0, consumer: Optional[Callable[[PreviewFrame], None]] = None):
+		"""
+		Args:
+			max_fps (float): Maximum number of frames per second.
+			mode (str): "latest" publishes the last sample, "mean" the mean and "minmax" the minimum and maximum of all samples since the last frame.
+			drvno (int): Board number.
+			consumer: Optional function that is called with every frame from the thread of the tap. Frames are computed from the newest data when it returns, so a slow consumer only lowers the frame rate. An exception of the consumer stops the tap and is raised by get_frame and stop.
+		"""
+		if mode not in self.MODES:
+			raise ValueError(f"Unknown mode {mode}, must be one of {', '.join(self.MODES)}")
+		if max_fps <= 0:
+			raise ValueError("max_fps must be positive")
+		self.max_fps = max_fps
+		self.mode = mode
+		self.drvno = drvno
+		self.consumer = consumer
+		self.published = 0
+		self.dropped = 0
+		self._frame: Optional[PreviewFrame] = None
+		self._condition = threading.Condition()
+		self._thread: Optional[threading.Thread] = None
+		self._stop = threading.Event()
+		self._error: Optional[BaseException] = None
+
+	def _ranges(self, last: int, current: int, total: int) -> List[Tuple[int, int]]:
+		"""
+		Ranges of scan indices measured after last up to and including current.
+		"""
+		if current > last:
+			return [(last + 1, current + 1)]
+		if current < last:
+			# The measurement continued at the beginning of the buffer.
+			return [(last + 1, total), (0, current + 1)]
+		return []
+
+	def _compute(self, scans: np.ndarray, ranges: List[Tuple[int, int]]) -> np.ndarray:
+		if self.mode == "latest":
+			end = ranges[-1][1]
+			return scans[end - 1].copy()
+		if self.mode == "mean":
+			total = sum(np.sum(scans[a:b], axis=0, dtype=np.float64) for a, b in ranges)
+			return (total / sum(b - a for a, b in ranges)).astype(np.float32)
+		minimum = np.minimum.reduce([scans[a:b].min(axis=0) for a, b in ranges])
+		maximum = np.maximum.reduce([scans[a:b].max(axis=0) for a, b in ranges])
+		return np.stack([minimum, maximum])
+
+	def _run(self):
+		try:
+			self._loop()
+		except BaseException as e:
+			core.logger.exception(f"Preview of board {self.drvno} failed")
+			with self._condition:
+				self._error = e
+				self._condition.notify_all()
+
+	def _loop(self):
+		nos = core.settings.nos
+		data = core.get_all_data_array(self.drvno)
+		# All scans of the buffer in measurement order with the shape (nob * nos, camcnt, pixel).
+		scans = data.reshape((-1,) + data.shape[2:])
+		last = -1
+		period = 1.0 / self.max_fps
+		next_time = time.monotonic()
+		while not self._stop.is_set():
+			next_time += period
+			sample, block = core.get_current_scan_number(self.drvno)
+			if block >= 0 and sample >= 0:
+				current = block * nos + sample
+				ranges = self._ranges(last, current, scans.shape[0])
+				if ranges:
+					last = current
+					frame = PreviewFrame(self._compute(scans, ranges), sum(b - a for a, b in ranges), block, sample, time.monotonic_ns())
+					self._publish(frame)
+			# Skip intervals that were missed instead of catching up.
+			delay = next_time - time.monotonic()
+			if delay < 0:
+				next_time = time.monotonic()
+			else:
+				self._stop.wait(delay)
+
+	def _publish(self, frame: PreviewFrame):
+		with self._condition:
+			if self._frame is not None:
+				self.dropped += 1
+			self._frame = frame
+			self.published += 1
+			self._condition.notify_all()
+		if self.consumer is not None:
+			self.consumer(frame)
+
+	def get_frame(self, timeout: Optional[float] = None) -> Optional[PreviewFrame]:
+		"""
+		Get the newest frame that was not fetched yet. Older frames that were not fetched are dropped.
+
+		Args:
+			timeout (float, optional): Maximum time in seconds to wait for a new frame. None waits forever.
+
+		Returns:
+			Optional[PreviewFrame]: The newest frame or None if there was no new frame within the timeout.
+
+		Raises:
+			Exception: The error that stopped the preview thread, e.g. raised by the consumer.
+		"""
+		with self._condition:
+			if self._frame is None and self._error is None:
+				self._condition.wait(timeout)
+			frame, self._frame = self._frame, None
+			if frame is None and self._error is not None:
+				raise self._error
+		return frame
+
+	def start(self):
+		"""
+		Start the preview thread. Call this after init_measurement, because the data buffer is resolved when the thread starts.
+		"""
+		if self._thread is not None:
+			return
+		self._stop.clear()
+		self._error = None
+		self._thread = threading.Thread(target=self._run, name=f"stresing-preview-{self.drvno}", daemon=True)
+		self._thread.start()
+
+	def stop(self):
+		"""
+		Stop the preview thread.
+
+		Raises:
+			Exception: The error that stopped the preview thread, e.g. raised by the consumer.
+		"""
+		if self._thread is None:
+			return
+		self._stop.set()
+		self._thread.join()
+		self._thread = None
+		if self._error is not None:
+			raise self._error
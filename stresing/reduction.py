@@ -0,0 +1,270 @@
+## @file: reduction.py
+# @brief: Software binning and sample accumulation while the measurement is running.
+# @details: The stages in this module reduce every block as it arrives, so only the reduced data has to be kept.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from . import core
+from .stream import BlockStage
+
+__all__ = ["SampleReducer", "RepeatAccumulator"]
+
+# Number of values that RepeatAccumulator squares at once. The scratch buffer of this size is the only memory besides the sums.
+_ACCUMULATE_CHUNK = 1 << 16
+# Number of 16 bit values that a uint32 sum holds without overflow.
+_UINT32_MAX_REPEATS = (2**32 - 1) // (2**16 - 1)
+
+class SampleReducer(BlockStage):
+	"""
+	Stage for BlockStream that sums every samples_per_sum consecutive samples and bins pixel_binning adjacent pixels. Groups of samples continue across block boundaries. Pixels at the end of the line that do not fill a complete bin are dropped.
+	"""
+	def __init__(self, samples_per_sum: int = 1, pixel_binning: int = 1, dtype=np.uint32, on_result: Optional[Callable[[int, np.ndarray], None]] = None):
+		"""
+		Args:
+			samples_per_sum (int): Number of samples summed into one result sample.
+			pixel_binning (int): Number of adjacent pixels summed into one result pixel.
+			dtype: Data type of the sums, numpy.uint32 or numpy.float64. uint32 can hold at least 65536 summed 16 bit values.
+			on_result: Optional function that is called with the block number and the reduced data of each block. When None, the results are collected and returned by result().
+		"""
+		if samples_per_sum < 1 or pixel_binning < 1:
+			raise ValueError("samples_per_sum and pixel_binning must be at least 1")
+		self.samples_per_sum = samples_per_sum
+		self.pixel_binning = pixel_binning
+		self.dtype = np.dtype(dtype)
+		self.on_result = on_result
+		self._results: List[np.ndarray] = []
+		self._partial: Optional[np.ndarray] = None
+		self._partial_count = 0
+
+	def _bin(self, data: np.ndarray) -> np.ndarray:
+		"""
+		Bin the pixels of data with the shape (samples, camcnt, pixel) and convert it to the result type.
+		"""
+		if self.pixel_binning == 1:
+			return data.astype(self.dtype, copy=False)
+		bins = data.shape[-1] // self.pixel_binning
+		binned = data[..., :bins * self.pixel_binning].reshape(data.shape[:-1] + (bins, self.pixel_binning))
+		return binned.sum(axis=-1, dtype=self.dtype)
+
+	def process_block(self, block: int, data: np.ndarray) -> np.ndarray:
+		"""
+		Reduce one block.
+
+		Args:
+			block (int): Block number.
+			data (numpy.ndarray): Block data with the shape (nos, camcnt, pixel).
+
+		Returns:
+			numpy.ndarray: The complete groups of this block with the shape (groups, camcnt, pixel // pixel_binning). It may be empty when a group spans more than one block.
+		"""
+		n = self.samples_per_sum
+		out = []
+		start = 0
+		if self._partial_count:
+			# Complete the group that was started in the previous block.
+			take = min(n - self._partial_count, data.shape[0])
+			self._partial += self._bin(data[:take].sum(axis=0, dtype=self.dtype))
+			self._partial_count += take
+			start = take
+			if self._partial_count == n:
+				out.append(self._partial[np.newaxis])
+				self._partial = None
+				self._partial_count = 0
+		groups = (data.shape[0] - start) // n
+		if groups:
+			full = data[start:start + groups * n]
+			if n > 1:
+				full = full.reshape((groups, n) + data.shape[1:]).sum(axis=1, dtype=self.dtype)
+			out.append(self._bin(full))
+		rest = data[start + groups * n:]
+		if rest.shape[0]:
+			self._partial = self._bin(rest.sum(axis=0, dtype=self.dtype))
+			self._partial_count = rest.shape[0]
+		shape = (0,) + data.shape[1:-1] + (data.shape[-1] // self.pixel_binning,)
+		reduced = np.concatenate(out) if out else np.empty(shape, dtype=self.dtype)
+		if self.on_result is not None:
+			self.on_result(block, reduced)
+		else:
+			self._results.append(reduced)
+		return reduced
+
+	def result(self) -> np.ndarray:
+		"""
+		Get all collected results. A group that is not complete yet is not included.
+
+		Returns:
+			numpy.ndarray: Reduced data with the shape (groups, camcnt, pixel // pixel_binning).
+		"""
+		return np.concatenate(self._results) if self._results else np.empty((0, 0, 0), dtype=self.dtype)
+
+	def reset(self):
+		"""
+		Discard all collected results and the incomplete group.
+		"""
+		self._results = []
+		self._partial = None
+		self._partial_count = 0
+
+class RepeatAccumulator(BlockStage):
+	"""
+	Sum and sum of squares of every value over repeated measurements, added straight from the data buffer of the DLL. The memory stays at two buffers of the size of one measurement for any number of repeats. Usage:
+
+		stresing.init_measurement()
+		accumulator = stresing.RepeatAccumulator(drvno=0)
+		accumulator.measure(100)
+		mean, std = accumulator.mean(), accumulator.std()
+
+	With dtype numpy.uint32, the sums are exact integers: the sum is uint32, which holds 65537 repeats of 16 bit values, and the sum of squares is uint64. Before the 65538th repeat, the sum is converted to uint64 once, so it never wraps. With numpy.float64 both sums are float64, which is exact for more than 2 million repeats.
+
+	As stage for BlockStream, every block is added to the sums of its block number, e.g. to average the cycles of a continuous measurement.
+
+	Attributes:
+		counts (numpy.ndarray): int64 array with the number of repeats of each block, None before the first data.
+	"""
+	def __init__(self, drvno: int = 0, dtype=np.float64):
+		"""
+		Args:
+			drvno (int): Board number.
+			dtype: numpy.uint32 or numpy.float64.
+		"""
+		self.dtype = np.dtype(dtype)
+		if self.dtype == np.uint32:
+			self.square_dtype = np.dtype(np.uint64)
+		elif self.dtype == np.float64:
+			self.square_dtype = self.dtype
+		else:
+			raise ValueError("dtype must be numpy.uint32 or numpy.float64")
+		self.drvno = drvno
+		self.reset()
+
+	def reset(self):
+		"""
+		Discard the sums.
+		"""
+		self.counts: Optional[np.ndarray] = None
+		self._sum: Optional[np.ndarray] = None
+		self._sum_of_squares: Optional[np.ndarray] = None
+		self._scratch = np.empty(_ACCUMULATE_CHUNK, dtype=self.square_dtype)
+
+	def _allocate(self, shape):
+		if self._sum is None:
+			self._sum = np.zeros(shape, dtype=self.dtype)
+			self._sum_of_squares = np.zeros(shape, dtype=self.square_dtype)
+			self.counts = np.zeros(shape[0], dtype=np.int64)
+		elif self._sum.shape != shape:
+			raise ValueError(f"The data has the shape {shape}, the sums {self._sum.shape}. Call reset after changing the settings.")
+		if self._sum.dtype == np.uint32 and self.counts.max() >= _UINT32_MAX_REPEATS:
+			# The next repeat could overflow the uint32 sum.
+			self._sum = self._sum.astype(np.uint64)
+
+	def _accumulate(self, sums: np.ndarray, squares: np.ndarray, data: np.ndarray):
+		"""
+		Add data to the sums in chunks, so squaring needs only the scratch buffer.
+		"""
+		sums = sums.reshape(-1)
+		squares = squares.reshape(-1)
+		values = data.reshape(-1)
+		for start in range(0, values.size, _ACCUMULATE_CHUNK):
+			stop = min(start + _ACCUMULATE_CHUNK, values.size)
+			chunk = values[start:stop]
+			scratch = self._scratch[:stop - start]
+			np.add(sums[start:stop], chunk, out=sums[start:stop], casting="unsafe")
+			np.multiply(chunk, chunk, out=scratch, dtype=self.square_dtype)
+			np.add(squares[start:stop], scratch, out=squares[start:stop])
+
+	def add(self, data: Optional[np.ndarray] = None):
+		"""
+		Add one repeat of all blocks.
+
+		Args:
+			data (numpy.ndarray, optional): Data with the shape (nob, nos, camcnt, pixel). When None, the zero-copy view of get_all_data_array is used.
+
+		Raises:
+			ValueError: If the shape of the data changed since the first repeat.
+			Exception: If the DLL call returns a non-zero status (error), an exception is raised with the error message.
+		"""
+		if data is None:
+			data = core.get_all_data_array(self.drvno)
+		self._allocate(data.shape)
+		self._accumulate(self._sum, self._sum_of_squares, data)
+		self.counts += 1
+
+	def measure(self, repeats: int):
+		"""
+		Start repeats blocking measurements with the current settings and add each one. init_measurement must be called before.
+
+		Args:
+			repeats (int): Number of measurements.
+
+		Raises:
+			Exception: If a DLL call returns a non-zero status (error), an exception is raised with the error message.
+		"""
+		for _ in range(repeats):
+			core.start_measurement_blocking()
+			self.add()
+
+	def process_block(self, block: int, data: np.ndarray) -> None:
+		"""
+		Stage interface for BlockStream. Adds the block to the sums of its block number.
+
+		Args:
+			block (int): Block number.
+			data (numpy.ndarray): Block data with the shape (nos, camcnt, pixel).
+		"""
+		self._allocate((core.settings.nob,) + data.shape)
+		self._accumulate(self._sum[block], self._sum_of_squares[block], data)
+		self.counts[block] += 1
+
+	@property
+	def count(self) -> int:
+		"""
+		Number of repeats of the block with the fewest repeats.
+		"""
+		return 0 if self.counts is None else int(self.counts.min())
+
+	def _counts(self) -> np.ndarray:
+		if self.counts is None:
+			raise ValueError("No data was added")
+		return self.counts.reshape((-1,) + (1,) * (self._sum.ndim - 1))
+
+	def sum(self) -> np.ndarray:
+		"""
+		The sums with the shape (nob, nos, camcnt, pixel). This is the buffer of the accumulator, not a copy. A uint32 sum becomes uint64 after 65537 repeats.
+		"""
+		self._counts()
+		return self._sum
+
+	def mean(self) -> np.ndarray:
+		"""
+		Mean of every value over the repeats as float64 array with the shape (nob, nos, camcnt, pixel). Blocks without repeats are NaN.
+		"""
+		with np.errstate(invalid="ignore", divide="ignore"):
+			return self._sum / self._counts()
+
+	def std(self, ddof: int = 0) -> np.ndarray:
+		"""
+		Standard deviation of every value over the repeats as float64 array with the shape (nob, nos, camcnt, pixel).
+
+		Args:
+			ddof (int): Delta degrees of freedom, 1 for the sample standard deviation.
+		"""
+		counts = self._counts()
+		with np.errstate(invalid="ignore", divide="ignore"):
+			mean = self._sum / counts
+			variance = self._sum_of_squares / counts - mean * mean
+			np.maximum(variance, 0, out=variance)
+			variance *= counts / (counts - ddof)
+			return np.sqrt(variance, out=variance)
+
+	def result(self) -> Dict[str, np.ndarray]:
+		"""
+		Get mean, standard deviation and the number of repeats.
+
+		Returns:
+			Dict[str, numpy.ndarray]: "mean" and "std" with the shape (nob, nos, camcnt, pixel) and "count" with the repeats of each block.
+		"""
+		return {"mean": self.mean(), "std": self.std(), "count": self.counts.copy()}
@@ -0,0 +1,160 @@
+## @file: registers.py
+# @brief: Batched register access with a shadow of the written values.
+# @details: A RegisterBank writes many camera registers with cam_send_data and reads or writes many S0 registers of the PCIe board in one call. It remembers the last written value of every register and skips writes that would not change it, and it can save and restore the written register set.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import ctypes
+from ctypes import POINTER, c_int, c_uint8, c_uint16, c_uint32
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from . import core
+
+__all__ = ["RegisterBank"]
+
+class RegisterBank:
+	"""
+	Register access of one board with a shadow of the written values. The DLL has no batch call, but a batch binds the DLL function once and passes plain integers, which saves most of the Python overhead of calling cam_send_data in a loop. Writes that match the shadow are not sent at all.
+
+	The shadow only knows what was written through this bank. init_measurement programs the camera again, so call invalidate after it and whenever the registers are changed by other means.
+
+	Attributes:
+		drvno (int): Board number.
+		sent (int): Number of register writes that were sent to the hardware.
+		skipped (int): Number of register writes that were skipped, because the value was already written.
+	"""
+	def __init__(self, drvno: int = 0):
+		"""
+		Args:
+			drvno (int): Board number.
+		"""
+		self.drvno = drvno
+		self.sent = 0
+		self.skipped = 0
+		self._camera: Dict[Tuple[int, int], int] = {}
+		self._s0: Dict[int, int] = {}
+
+	def _function(self, name: str, argtypes: list):
+		function = getattr(core.dll, name)
+		function.argtypes = argtypes
+		function.restype = c_int
+		return function
+
+	def write_camera(self, writes: Iterable[Tuple[int, int, int]], force: bool = False) -> int:
+		"""
+		Write camera registers with cam_send_data in the given order.
+
+		Args:
+			writes (Iterable[Tuple[int, int, int]]): (maddr, adaddr, data) of each write.
+			force (bool): Send every write, also when the value is already written.
+
+		Returns:
+			int: Number of writes that were sent.
+
+		Raises:
+			Exception: If the DLL call returns a non-zero status (error), an exception is raised with the error message. The writes before the failed one are kept in the shadow.
+		"""
+		send = self._function("DLLCam_SendData", [c_uint32, c_uint8, c_uint8, c_uint16])
+		sent = 0
+		for maddr, adaddr, data in writes:
+			key = (int(maddr), int(adaddr))
+			if not force and self._camera.get(key) == data:
+				self.skipped += 1
+				continue
+			status = send(self.drvno, key[0], key[1], data)
+			if status != 0:
+				raise Exception(core.convert_error_code_to_msg(status))
+			self._camera[key] = int(data)
+			sent += 1
+		self.sent += sent
+		return sent
+
+	def write_s0(self, writes: Iterable[Tuple[int, int]], force: bool = False) -> int:
+		"""
+		Write 32 bit registers of the S0 space in the given order.
+
+		Args:
+			writes (Iterable[Tuple[int, int]]): (address, data) of each write.
+			force (bool): Send every write, also when the value is already written.
+
+		Returns:
+			int: Number of writes that were sent.
+
+		Raises:
+			Exception: If the DLL call returns a non-zero status (error), an exception is raised with the error message.
+		"""
+		write = self._function("DLLwriteRegisterS0_32", [c_uint32, c_uint32, c_uint32])
+		sent = 0
+		for address, data in writes:
+			address = int(address)
+			if not force and self._s0.get(address) == data:
+				self.skipped += 1
+				continue
+			status = write(self.drvno, data, address)
+			if status != 0:
+				raise Exception(core.convert_error_code_to_msg(status))
+			self._s0[address] = int(data)
+			sent += 1
+		self.sent += sent
+		return sent
+
+	def read_s0(self, addresses: Sequence[int]) -> List[int]:
+		"""
+		Read 32 bit registers of the S0 space. The values are always read from the hardware, because the board changes some of them by itself.
+
+		Args:
+			addresses (Sequence[int]): Addresses of the registers.
+
+		Returns:
+			List[int]: The value of each register.
+
+		Raises:
+			Exception: If the DLL call returns a non-zero status (error), an exception is raised with the error message.
+		"""
+		read = self._function("DLLreadRegisterS0_32", [c_uint32, POINTER(c_uint32), c_uint32])
+		data = c_uint32(0)
+		reference = ctypes.byref(data)
+		values = []
+		for address in addresses:
+			status = read(self.drvno, reference, address)
+			if status != 0:
+				raise Exception(core.convert_error_code_to_msg(status))
+			values.append(data.value)
+		return values
+
+	def snapshot(self, s0_addresses: Optional[Sequence[int]] = None) -> Dict[str, Dict]:
+		"""
+		Save the register set.
+
+		Args:
+			s0_addresses (Sequence[int], optional): S0 registers to read from the hardware into the snapshot, in addition to the written S0 registers.
+
+		Returns:
+			Dict[str, Dict]: {"camera": {(maddr, adaddr): data}, "s0": {address: data}}.
+		"""
+		s0 = dict(self._s0)
+		if s0_addresses:
+			s0.update(zip(s0_addresses, self.read_s0(s0_addresses)))
+		return {"camera": dict(self._camera), "s0": s0}
+
+	def restore(self, snapshot: Dict[str, Dict], force: bool = False) -> int:
+		"""
+		Write all registers of a snapshot. Registers that already have the value of the snapshot are skipped.
+
+		Args:
+			snapshot (Dict[str, Dict]): Snapshot from snapshot().
+			force (bool): Send every write.
+
+		Returns:
+			int: Number of writes that were sent.
+		"""
+		sent = self.write_s0(snapshot.get("s0", {}).items(), force)
+		sent += self.write_camera(((maddr, adaddr, data) for (maddr, adaddr), data in snapshot.get("camera", {}).items()), force)
+		return sent
+
+	def invalidate(self):
+		"""
+		Forget all written values, so that the next writes are sent.
+		"""
+		self._camera.clear()
+		self._s0.clear()
@@ -0,0 +1,661 @@
+## @file: replay.py
+# @brief: Record a measurement to a file and replay it without hardware.
+# @details: The Recorder writes the settings, the raw blocks of all selected boards and the host times of all hooks to one file. ReplayDLL serves a recording through the same functions as ESLSCDLL, so copy_*, the pointer functions, the hooks and get_current_scan_number behave like during the measurement. The playback runs in real time, faster or as fast as possible.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import base64
+import ctypes
+import functools
+import json
+import math
+import queue
+import struct
+import threading
+import time
+from ctypes import POINTER, c_uint16, c_void_p
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import core
+from .timing import BlockTimestamps
+
+__all__ = ["RECORDING_VERSION", "Recorder", "Recording", "ReplayDLL", "start_replay"]
+
+RECORDING_VERSION = 1
+# File layout: 16 byte header (magic, version), the raw blocks, a JSON trailer and a 16 byte footer with the offset of the trailer and the magic again. Every record holds one block of all recorded boards in the order of the boards.
+_MAGIC = b"STRESREC"
+_HEADER = struct.Struct("<8sII")
+_FOOTER = struct.Struct("<Q8s")
+
+# Status codes of the replay backend. They are above the codes of ESLSCDLL.
+REPLAY_SETTINGS_MISMATCH = 1001
+REPLAY_NOT_INITIALIZED = 1002
+REPLAY_INVALID_ARGUMENT = 1003
+REPLAY_NOT_SUPPORTED = 1004
+_ERROR_MESSAGES = {
+	0: "no error",
+	REPLAY_SETTINGS_MISMATCH: "Replay: the settings do not match the recording",
+	REPLAY_NOT_INITIALIZED: "Replay: init_measurement was not called",
+	REPLAY_INVALID_ARGUMENT: "Replay: board, sample, block, camera or pixel is out of range",
+	REPLAY_NOT_SUPPORTED: "Replay: this function is not supported by the replay backend",
+}
+
+class Recorder:
+	"""
+	Records a measurement to one file: the settings, every block of every board when the block done hook reports it and the host time of every hook. The block timestamps are also exported next to the recording, see BlockTimestamps.export. The blocks are written by a background thread from the DLL buffer, so in continuous mode a block must not be overwritten before it is written, which is the case when the disk keeps up with the data rate. Usage:
+
+		with stresing.Recorder("run.rec"):
+			stresing.init_measurement()
+			stresing.start_measurement_blocking()
+	"""
+	def __init__(self, path: str, boards: Optional[Sequence[int]] = None):
+		"""
+		Args:
+			path (str): File path of the recording.
+			boards (Sequence[int], optional): Board numbers. When None, the boards selected by settings.board_sel are used.
+		"""
+		self.path = path
+		self.boards = list(boards) if boards is not None else core.selected_boards()
+		if not self.boards:
+			raise ValueError("No board selected")
+		self.records = 0
+		self._events: List[Tuple[str, int, Optional[int]]] = []
+		self._records: List[int] = []
+		self._listeners = {name: functools.partial(self._on_hook, name) for name in core._HOOKS}
+		self._queue: "queue.Queue[Optional[int]]" = queue.Queue()
+		self._thread: Optional[threading.Thread] = None
+		self._file = None
+		self._error: Optional[BaseException] = None
+
+	def _snapshot(self):
+		self._settings = bytes(core.settings)
+		ms = core.settings
+		self._shapes = {drvno: (int(ms.nos), int(ms.camera_settings[drvno].camcnt), int(ms.camera_settings[drvno].pixel)) for drvno in self.boards}
+		self._nob = int(ms.nob)
+
+	def _on_hook(self, name: str, *args):
+		if name == "measure_start":
+			# The settings can change until the measurement is initialized, so take the snapshot again.
+			self._snapshot()
+		self._events.append((name, core.get_hook_time_ns(name), int(args[0]) if args else None))
+		if name == "block_done":
+			self._queue.put(int(args[0]))
+
+	def _write(self):
+		while True:
+			block = self._queue.get()
+			if block is None:
+				return
+			try:
+				for drvno in self.boards:
+					self._file.write(memoryview(core.get_block_array(drvno, block % self._nob)))
+				self._records.append(block)
+				self.records += 1
+			except BaseException as e:
+				self._error = e
+				core.logger.exception(f"Recording of block {block} failed")
+
+	def start(self):
+		"""
+		Open the file and start recording with the hooks.
+		"""
+		if self._file is not None:
+			return
+		self._snapshot()
+		self._file = open(self.path, "wb")
+		self._file.write(_HEADER.pack(_MAGIC, RECORDING_VERSION, 0))
+		self._thread = threading.Thread(target=self._write, name="stresing-recorder", daemon=True)
+		self._thread.start()
+		for name, listener in self._listeners.items():
+			core.add_hook_listener(name, listener)
+
+	def stop(self):
+		"""
+		Stop recording, write all pending blocks and close the file.
+
+		Raises:
+			Exception: The first error that occurred while writing the blocks.
+		"""
+		if self._file is None:
+			return
+		for name, listener in self._listeners.items():
+			core.remove_hook_listener(name, listener)
+		self._queue.put(None)
+		self._thread.join()
+		self._thread = None
+		trailer = {
+			"version": RECORDING_VERSION,
+			"settings": base64.b64encode(self._settings).decode(),
+			"boards": self.boards,
+			"nob": self._nob,
+			"block_shape": {str(drvno): shape for drvno, shape in self._shapes.items()},
+			"records": self._records,
+			"events": self._events,
+			"epoch_offset_ns": time.time_ns() - time.monotonic_ns(),
+		}
+		offset = self._file.tell()
+		self._file.write(json.dumps(trailer).encode())
+		self._file.write(_FOOTER.pack(offset, _MAGIC))
+		self._file.close()
+		self._file = None
+		BlockTimestamps.from_events(self.boards, self._events, trailer["epoch_offset_ns"]).export(self.path)
+		if self._error is not None:
+			raise self._error
+
+	def __enter__(self) -> "Recorder":
+		self.start()
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.stop()
+
+class Recording:
+	"""
+	A recording written by Recorder. The blocks are memory mapped, so recordings larger than the memory can be replayed.
+
+	Attributes:
+		settings (bytes): Raw measurement_settings at the start of the measurement.
+		boards (List[int]): Recorded board numbers.
+		nob (int): Number of blocks of the measurement.
+		block_shape (Dict[int, Tuple[int, int, int]]): Shape (nos, camcnt, pixel) of one block of each board.
+		records (List[int]): Block number of every record, in the order the blocks were done.
+		events (List[Tuple[str, int, Optional[int]]]): Name, time.monotonic_ns() and argument of every hook call.
+	"""
+	def __init__(self, path: str):
+		"""
+		Args:
+			path (str): File path of the recording.
+
+		Raises:
+			ValueError: If the file is no complete recording.
+		"""
+		with open(path, "rb") as f:
+			magic, version, _ = _HEADER.unpack(f.read(_HEADER.size))
+			if magic != _MAGIC:
+				raise ValueError(f"{path} is no recording")
+			if version > RECORDING_VERSION:
+				raise ValueError(f"{path} has version {version}, only version {RECORDING_VERSION} is supported")
+			size = f.seek(0, 2)
+			f.seek(size - _FOOTER.size)
+			offset, magic = _FOOTER.unpack(f.read(_FOOTER.size))
+			if magic != _MAGIC:
+				raise ValueError(f"{path} is no complete recording, the recorder was not stopped")
+			f.seek(offset)
+			trailer = json.loads(f.read(size - _FOOTER.size - offset))
+		self.settings = base64.b64decode(trailer["settings"])
+		self.boards = [int(drvno) for drvno in trailer["boards"]]
+		self.nob = int(trailer["nob"])
+		self.block_shape = {int(drvno): tuple(shape) for drvno, shape in trailer["block_shape"].items()}
+		self.records = [int(block) for block in trailer["records"]]
+		self.events = [(name, int(time_ns), arg) for name, time_ns, arg in trailer["events"]]
+		self.epoch_offset_ns = int(trailer["epoch_offset_ns"])
+		self._block_values = {drvno: int(np.prod(self.block_shape[drvno])) for drvno in self.boards}
+		self._record_values = sum(self._block_values.values())
+		values = (offset - _HEADER.size) // 2
+		if values:
+			self._data = np.memmap(path, dtype=np.uint16, mode="r", offset=_HEADER.size, shape=(values,))
+		else:
+			self._data = np.empty(0, dtype=np.uint16)
+
+	def block(self, record: int, drvno: int) -> np.ndarray:
+		"""
+		Get one recorded block of one board.
+
+		Args:
+			record (int): Index of the record.
+			drvno (int): Board number.
+
+		Returns:
+			numpy.ndarray: Read only numpy.uint16 array with the shape (nos, camcnt, pixel).
+		"""
+		start = record * self._record_values
+		for board in self.boards:
+			if board == drvno:
+				return self._data[start:start + self._block_values[drvno]].reshape(self.block_shape[drvno])
+			start += self._block_values[board]
+		raise ValueError(f"Board {drvno} is not recorded")
+
+	def timestamps(self) -> BlockTimestamps:
+		"""
+		Get the host timestamps of the recorded blocks from the recorded hook calls.
+
+		Returns:
+			BlockTimestamps: One row per recorded block.
+		"""
+		return BlockTimestamps.from_events(self.boards, self.events, self.epoch_offset_ns)
+
+	@property
+	def duration_ns(self) -> int:
+		"""
+		Time between the first and the last hook call.
+		"""
+		return self.events[-1][1] - self.events[0][1] if self.events else 0
+
+	def apply_settings(self, ms: core.measurement_settings):
+		"""
+		Copy the recorded settings into a measurement_settings structure.
+
+		Args:
+			ms (measurement_settings): The structure to overwrite.
+		"""
+		if len(self.settings) != ctypes.sizeof(ms):
+			raise ValueError(f"The recorded settings have {len(self.settings)} bytes, but measurement_settings has {ctypes.sizeof(ms)} bytes")
+		ctypes.memmove(ctypes.addressof(ms), self.settings, len(self.settings))
+
+def _value(arg) -> int:
+	return arg.value if hasattr(arg, "value") else arg
+
+def _target(arg):
+	# Arguments passed with ctypes.byref.
+	return arg._obj if hasattr(arg, "_obj") else arg
+
+def _destination(arg, values: int) -> np.ndarray:
+	return np.ctypeslib.as_array(ctypes.cast(arg, POINTER(c_uint16)), (values,))
+
+class _ReplayFunction:
+	"""
+	Callable with the argtypes and restype attributes of a ctypes function, which are ignored.
+	"""
+	def __init__(self, function):
+		self.function = function
+		self.argtypes = None
+		self.restype = None
+
+	def __call__(self, *args):
+		return self.function(*args)
+
+class ReplayDLL:
+	"""
+	Replacement for ESLSCDLL that plays a recording back. Usage:
+
+		with stresing.start_replay("run.rec", speed=10):
+			stresing.init_measurement()
+			stresing.start_measurement_blocking()
+			data = stresing.get_all_data_array(0)
+
+	Attributes:
+		recording (Recording): The recording.
+		speed (float, optional): Playback speed, 1 is real time, 10 is ten times faster and None plays as fast as possible. It is read at the start of each playback.
+		shutter_states (Dict[int, int]): Last shutter states that were set for each board.
+		sent (List[Tuple[int, int, int, int]]): Arguments of all cam_send_data calls.
+		s0_registers (Dict[Tuple[int, int], int]): Values written to the S0 registers by (drvno, address). Reading an unwritten register returns 0.
+	"""
+	def __init__(self, recording: Recording, speed: Optional[float] = 1.0):
+		"""
+		Args:
+			recording (Recording): The recording to play.
+			speed (float, optional): Playback speed, None or math.inf plays as fast as possible.
+		"""
+		if speed is not None and speed <= 0:
+			raise ValueError("speed must be positive")
+		self.recording = recording
+		self.speed = speed
+		self.shutter_states: Dict[int, int] = {}
+		self.sent: List[Tuple[int, int, int, int]] = []
+		self.s0_registers: Dict[Tuple[int, int], int] = {}
+		self._functions: Dict[str, _ReplayFunction] = {}
+		self._hooks = {}
+		self._buffers: Dict[int, np.ndarray] = {}
+		self._ms: Optional[core.measurement_settings] = None
+		self._lock = threading.Lock()
+		self._scan: Dict[int, Tuple[int, int]] = {}
+		# Block that is played at the moment with the wall times of its start and done.
+		self._window: Optional[Tuple[int, int, int]] = None
+		self._abort = threading.Event()
+		self._thread: Optional[threading.Thread] = None
+		self._previous_dll = None
+		self._schedule = self._build_schedule()
+
+	def _build_schedule(self) -> List[Tuple[str, int, Optional[int], int, int]]:
+		"""
+		Events with the index of the record that belongs to them and the time of the matching block done.
+		"""
+		events = self.recording.events
+		schedule = []
+		record = 0
+		for i, (name, time_ns, arg) in enumerate(events):
+			done_ns = time_ns
+			if name == "block_start":
+				done_ns = next((t for n, t, _ in events[i + 1:] if n == "block_done"), time_ns)
+			schedule.append((name, time_ns, arg, record, done_ns))
+			if name == "block_done":
+				record += 1
+		return schedule
+
+	def __getattr__(self, name: str) -> _ReplayFunction:
+		if not name.startswith("DLL"):
+			raise AttributeError(name)
+		function = self._functions.get(name)
+		if function is None:
+			implementation = getattr(type(self), "_" + name, None)
+			if implementation is None:
+				def implementation(self, *args, _name=name):
+					core.logger.warning(f"{_name} is not supported by the replay backend")
+					return REPLAY_NOT_SUPPORTED
+			function = _ReplayFunction(functools.partial(implementation, self))
+			self._functions[name] = function
+		return function
+
+	def install(self):
+		"""
+		Use this backend for all functions of stresing and load the recorded settings into stresing.settings.
+		"""
+		if self._previous_dll is not None:
+			return
+		self._previous_dll = core.set_dll(self)
+		self.recording.apply_settings(core.settings)
+
+	def uninstall(self):
+		"""
+		Stop the playback and use the library that was used before install again.
+		"""
+		if self._previous_dll is None:
+			return
+		self._stop_playback()
+		core.set_dll(self._previous_dll)
+		self._previous_dll = None
+
+	def __enter__(self) -> "ReplayDLL":
+		self.install()
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.uninstall()
+
+	# Playback
+
+	def _copy_record(self, record: int, block: int):
+		if record >= len(self.recording.records):
+			return
+		for drvno, buffer in self._buffers.items():
+			buffer[block % self._ms.nob] = self.recording.block(record, drvno)
+
+	def _call_hook(self, name: str, arg: Optional[int]):
+		hook = self._hooks.get(name)
+		if hook is None:
+			return
+		if arg is None:
+			hook()
+		else:
+			hook(arg)
+
+	def _play(self):
+		speed = self.speed
+		realtime = speed is not None and not math.isinf(speed)
+		first_ns = self._schedule[0][1] if self._schedule else 0
+		start_ns = time.monotonic_ns()
+		def wall(time_ns: int) -> int:
+			return start_ns + int((time_ns - first_ns) / speed) if realtime else time.monotonic_ns()
+		copied = -1
+		measure_done = False
+		for name, time_ns, arg, record, done_ns in self._schedule:
+			if realtime:
+				delay = (wall(time_ns) - time.monotonic_ns()) / 1e9
+				if delay > 0 and self._abort.wait(delay):
+					break
+			elif self._abort.is_set():
+				break
+			if name == "block_start":
+				self._copy_record(record, arg)
+				copied = record
+				with self._lock:
+					self._window = (arg % self._ms.nob, wall(time_ns), wall(done_ns))
+			elif name == "block_done":
+				if copied != record:
+					self._copy_record(record, arg)
+				with self._lock:
+					self._window = None
+					for drvno in self._buffers:
+						self._scan[drvno] = (self._ms.nos - 1, arg % self._ms.nob)
+			measure_done = name == "measure_done"
+			self._call_hook(name, arg)
+		with self._lock:
+			self._window = None
+		if not measure_done:
+			# An aborted playback ends like an aborted measurement.
+			self._call_hook("measure_done", None)
+
+	def _stop_playback(self):
+		self._abort.set()
+		if self._thread is not None and self._thread is not threading.current_thread():
+			self._thread.join()
+		self._thread = None
+
+	# Functions of ESLSCDLL
+
+	def _DLLConvertErrorCodeToMsg(self, status) -> bytes:
+		return _ERROR_MESSAGES.get(_value(status), f"Replay: unknown error {_value(status)}").encode()
+
+	def _DLLInitSettingsStruct(self, ms) -> int:
+		self.recording.apply_settings(_target(ms))
+		return 0
+
+	def _DLLInitDriver(self, number_of_boards) -> int:
+		_target(number_of_boards).value = max(self.recording.boards) + 1
+		return 0
+
+	def _DLLExitDriver(self) -> int:
+		self._stop_playback()
+		self._buffers = {}
+		self._ms = None
+		return 0
+
+	def _DLLInitMeasurement(self, ms) -> int:
+		self._stop_playback()
+		for drvno in range(len(ms.camera_settings)):
+			if not ms.board_sel >> drvno & 1:
+				continue
+			cs = ms.camera_settings[drvno]
+			if drvno not in self.recording.block_shape or self.recording.block_shape[drvno] != (ms.nos, cs.camcnt, cs.pixel) or self.recording.nob != ms.nob:
+				return REPLAY_SETTINGS_MISMATCH
+		# Keep a copy, the settings of the measurement must not change when stresing.settings changes.
+		self._ms = core.measurement_settings.from_buffer_copy(ms)
+		self._buffers = {drvno: np.zeros((ms.nob,) + self.recording.block_shape[drvno], dtype=np.uint16) for drvno in self.recording.boards if ms.board_sel >> drvno & 1}
+		with self._lock:
+			self._scan = {drvno: (-1, -1) for drvno in self._buffers}
+			self._window = None
+		return 0
+
+	def _DLLStartMeasurement_blocking(self) -> int:
+		if self._ms is None:
+			return REPLAY_NOT_INITIALIZED
+		self._stop_playback()
+		self._abort.clear()
+		self._play()
+		return 0
+
+	def _DLLStartMeasurement_nonblocking(self) -> int:
+		if self._ms is None:
+			return REPLAY_NOT_INITIALIZED
+		self._stop_playback()
+		self._abort.clear()
+		self._thread = threading.Thread(target=self._play, name="stresing-replay", daemon=True)
+		self._thread.start()
+		return 0
+
+	def _DLLAbortMeasurement(self) -> int:
+		self._stop_playback()
+		return 0
+
+	def _DLLGetCurrentScanNumber(self, drvno, sample, block) -> int:
+		drvno = _value(drvno)
+		with self._lock:
+			if drvno not in self._scan:
+				return REPLAY_INVALID_ARGUMENT
+			current = self._scan[drvno]
+			if self._window is not None:
+				# Between the block hooks the samples advance linearly in time.
+				window_block, start_ns, done_ns = self._window
+				fraction = (time.monotonic_ns() - start_ns) / (done_ns - start_ns) if done_ns > start_ns else 1.0
+				current = (min(max(int(fraction * self._ms.nos), 0), self._ms.nos - 1), window_block)
+		_target(sample).value, _target(block).value = current
+		return 0
+
+	def _buffer(self, drvno: int) -> Optional[np.ndarray]:
+		return self._buffers.get(_value(drvno))
+
+	def _index(self, buffer: np.ndarray, sample, block, camera, pixel=0) -> Optional[int]:
+		"""
+		Flat index of one pixel in the buffer of one board or None when it is out of range.
+		"""
+		index = (_value(block), _value(sample), _value(camera), _value(pixel))
+		if any(i < 0 or i >= n for i, n in zip(index, buffer.shape)):
+			return None
+		return int(np.ravel_multi_index(index, buffer.shape))
+
+	def _copy(self, destination, source: np.ndarray):
+		_destination(destination, source.size)[:] = source.ravel()
+
+	def _DLLCopyOneSample(self, drvno, sample, block, camera, destination) -> int:
+		buffer = self._buffer(drvno)
+		if buffer is None or self._index(buffer, sample, block, camera) is None:
+			return REPLAY_INVALID_ARGUMENT
+		self._copy(destination, buffer[_value(block), _value(sample), _value(camera)])
+		return 0
+
+	def _DLLCopyOneSample_multipleBoards(self, sample, block, camera, *destinations) -> int:
+		for drvno, destination in enumerate(destinations):
+			if drvno in self._buffers:
+				status = self._DLLCopyOneSample(drvno, sample, block, camera, destination)
+				if status != 0:
+					return status
+		return 0
+
+	def _DLLCopyOneBlock(self, drvno, block, destination) -> int:
+		buffer = self._buffer(drvno)
+		if buffer is None or not 0 <= _value(block) < buffer.shape[0]:
+			return REPLAY_INVALID_ARGUMENT
+		self._copy(destination, buffer[_value(block)])
+		return 0
+
+	def _DLLCopyOneBlock_multipleBoards(self, block, *destinations) -> int:
+		for drvno, destination in enumerate(destinations):
+			if drvno in self._buffers:
+				status = self._DLLCopyOneBlock(drvno, block, destination)
+				if status != 0:
+					return status
+		return 0
+
+	def _DLLCopyOneBlockOfOneCamera(self, drvno, block, camera, destination) -> int:
+		buffer = self._buffer(drvno)
+		if buffer is None or self._index(buffer, 0, block, camera) is None:
+			return REPLAY_INVALID_ARGUMENT
+		self._copy(destination, buffer[_value(block), :, _value(camera)])
+		return 0
+
+	def _DLLCopyOneBlockOfOneCamera_multipleBoards(self, block, camera, *destinations) -> int:
+		for drvno, destination in enumerate(destinations):
+			if drvno in self._buffers:
+				status = self._DLLCopyOneBlockOfOneCamera(drvno, block, camera, destination)
+				if status != 0:
+					return status
+		return 0
+
+	def _DLLCopyAllData(self, drvno, destination) -> int:
+		buffer = self._buffer(drvno)
+		if buffer is None:
+			return REPLAY_INVALID_ARGUMENT
+		self._copy(destination, buffer)
+		return 0
+
+	def _DLLCopyAllData_multipleBoards(self, *destinations) -> int:
+		for drvno, destination in enumerate(destinations):
+			if drvno in self._buffers:
+				self._DLLCopyAllData(drvno, destination)
+		return 0
+
+	def _DLLCopyDataArbitrary(self, drvno, sample, block, camera, pixel, length_in_pixel, destination) -> int:
+		buffer = self._buffer(drvno)
+		index = None if buffer is None else self._index(buffer, sample, block, camera, pixel)
+		if index is None or index + _value(length_in_pixel) > buffer.size:
+			return REPLAY_INVALID_ARGUMENT
+		self._copy(destination, buffer.reshape(-1)[index:index + _value(length_in_pixel)])
+		return 0
+
+	def _pointer(self, buffer: np.ndarray, index: Optional[int], pointer, bytes_to_end) -> int:
+		if index is None:
+			return REPLAY_INVALID_ARGUMENT
+		ctypes.cast(ctypes.addressof(_target(pointer)), POINTER(c_void_p))[0] = buffer.ctypes.data + index * buffer.itemsize
+		_target(bytes_to_end).value = buffer.nbytes - index * buffer.itemsize
+		return 0
+
+	def _DLLGetOneSamplePointer(self, drvno, sample, block, camera, pointer, bytes_to_end) -> int:
+		buffer = self._buffer(drvno)
+		if buffer is None:
+			return REPLAY_INVALID_ARGUMENT
+		return self._pointer(buffer, self._index(buffer, sample, block, camera), pointer, bytes_to_end)
+
+	def _DLLGetOneBlockPointer(self, drvno, block, pointer, bytes_to_end) -> int:
+		buffer = self._buffer(drvno)
+		if buffer is None:
+			return REPLAY_INVALID_ARGUMENT
+		return self._pointer(buffer, self._index(buffer, 0, block, 0), pointer, bytes_to_end)
+
+	def _DLLGetAllDataPointer(self, drvno, pointer, bytes_to_end) -> int:
+		buffer = self._buffer(drvno)
+		if buffer is None:
+			return REPLAY_INVALID_ARGUMENT
+		return self._pointer(buffer, 0, pointer, bytes_to_end)
+
+	def _DLLGetPixelPointer(self, drvno, pixel, sample, block, camera, pointer, bytes_to_end) -> int:
+		buffer = self._buffer(drvno)
+		if buffer is None:
+			return REPLAY_INVALID_ARGUMENT
+		return self._pointer(buffer, self._index(buffer, sample, block, camera, pixel), pointer, bytes_to_end)
+
+	def _DLLCalcTrms(self, drvno, first_sample, last_sample, pixel, camera, mean, rms) -> int:
+		buffer = self._buffer(drvno)
+		if buffer is None or self._index(buffer, last_sample, 0, camera, pixel) is None or _value(first_sample) > _value(last_sample):
+			return REPLAY_INVALID_ARGUMENT
+		values = buffer[0, _value(first_sample):_value(last_sample) + 1, _value(camera), _value(pixel)].astype(np.float64)
+		_target(mean).value = float(values.mean())
+		_target(rms).value = float(values.std())
+		return 0
+
+	def _DLLSetShutterStates(self, drvno, states) -> int:
+		self.shutter_states[_value(drvno)] = _value(states)
+		return 0
+
+	def _DLLCam_SendData(self, drvno, maddr, adaddr, data) -> int:
+		self.sent.append((_value(drvno), _value(maddr), _value(adaddr), _value(data)))
+		return 0
+
+	def _DLLreadRegisterS0_32(self, drvno, data, address) -> int:
+		_target(data).value = self.s0_registers.get((_value(drvno), _value(address)), 0)
+		return 0
+
+	def _DLLwriteRegisterS0_32(self, drvno, data, address) -> int:
+		self.s0_registers[(_value(drvno), _value(address))] = _value(data)
+		return 0
+
+	def _DLLSetMeasureStartHook(self, hook):
+		self._hooks["measure_start"] = hook
+
+	def _DLLSetMeasureDoneHook(self, hook):
+		self._hooks["measure_done"] = hook
+
+	def _DLLSetBlockStartHook(self, hook):
+		self._hooks["block_start"] = hook
+
+	def _DLLSetBlockDoneHook(self, hook):
+		self._hooks["block_done"] = hook
+
+	def _DLLSetAllBlocksDoneHook(self, hook):
+		self._hooks["all_blocks_done"] = hook
+
+def start_replay(path: str, speed: Optional[float] = 1.0) -> ReplayDLL:
+	"""
+	Replay a recording through all functions of stresing. The recorded settings are loaded into stresing.settings. Call uninstall on the returned backend or use it as context manager to go back to the hardware.
+
+	Args:
+		path (str): File path of the recording.
+		speed (float, optional): Playback speed, 1 is real time, 10 is ten times faster and None plays as fast as possible.
+
+	Returns:
+		ReplayDLL: The installed backend.
+	"""
+	backend = ReplayDLL(Recording(path), speed)
+	backend.install()
+	return backend
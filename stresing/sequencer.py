@@ -0,0 +1,218 @@
+## @file: sequencer.py
+# @brief: Timed shutter sequences with absolute deadlines.
+# @details: A ShutterSequencer sets the shutter states of a timeline from its own thread. Every transition has an absolute deadline on time.monotonic_ns, either relative to the start of the sequence or to the block start hook of a block. The actual time of every transition is logged next to the scheduled time.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from . import core
+
+__all__ = ["SequenceEvent", "SequenceLogEntry", "ShutterSequencer"]
+
+@dataclass
+class SequenceEvent:
+	"""
+	One transition of a sequence.
+
+	Attributes:
+		states (int): Shutter states as bits, see set_shutter_states.
+		time_s (float): Time in seconds after the start of the sequence or, with block, after the block start.
+		block (int, optional): Align the event to the start of this block. Blocks are counted from 0 with every block start hook after the sequencer was started, so the count continues in continuous mode.
+	"""
+	states: int
+	time_s: float = 0.0
+	block: Optional[int] = None
+
+@dataclass
+class SequenceLogEntry:
+	"""
+	Log of one executed transition.
+
+	Attributes:
+		index (int): Index of the event in the timeline.
+		states (int): Shutter states that were set.
+		scheduled_ns (int): time.monotonic_ns() of the deadline.
+		actual_ns (int): time.monotonic_ns() right before the shutter states were set.
+		done_ns (int): time.monotonic_ns() after set_shutter_states returned.
+	"""
+	index: int
+	states: int
+	scheduled_ns: int
+	actual_ns: int
+	done_ns: int
+
+	@property
+	def error_ns(self) -> int:
+		"""
+		Deviation of the transition from the deadline. Positive values are late.
+		"""
+		return self.actual_ns - self.scheduled_ns
+
+class ShutterSequencer:
+	"""
+	Executes a timeline of shutter states from a dedicated thread. The thread sleeps until shortly before each deadline and spins for the rest, so the transitions are not delayed by the coarse resolution of sleep. Deadlines are absolute, errors do not add up over the timeline. Usage:
+
+		timeline = [(i * 1.0, 0 if i % 2 == 0 else 15) for i in range(20)]
+		with stresing.ShutterSequencer(timeline) as sequencer:
+			sequencer.wait()
+		print(sequencer.jitter())
+
+	Events with a block are started when the block start hook of that block was called. Events are executed in the order of the timeline, so a block aligned event waits for its block even when later events would be due.
+
+	Attributes:
+		log (List[SequenceLogEntry]): Executed transitions.
+	"""
+	def __init__(self, timeline: Sequence[Union[SequenceEvent, Tuple[float, int]]], drvno: int = 0, spin_s: float = 0.002, output: Optional[Callable[[int, int], None]] = None, switch_interval_s: Optional[float] = None):
+		"""
+		Args:
+			timeline (Sequence[Union[SequenceEvent, Tuple[float, int]]]): Events in the order of execution, either SequenceEvent or (time in seconds after the start, states).
+			drvno (int): Board number.
+			spin_s (float): Time before each deadline in seconds that is spent spinning instead of sleeping. It must cover the wake up latency of the operating system.
+			output: Function that is called with drvno and the states. When None, set_shutter_states is used.
+			switch_interval_s (float, optional): When given, sys.setswitchinterval is set to this value while the sequence runs. Other Python threads can hold the GIL for the switch interval (5 ms by default) before the sequencer thread gets it, so a lower value bounds the delay when other threads are busy.
+		"""
+		self.events = [event if isinstance(event, SequenceEvent) else SequenceEvent(int(event[1]), float(event[0])) for event in timeline]
+		self.drvno = drvno
+		self.spin_ns = int(spin_s * 1e9)
+		self.output = output if output is not None else core.set_shutter_states
+		self.switch_interval_s = switch_interval_s
+		self._previous_switch_interval: Optional[float] = None
+		self.log: List[SequenceLogEntry] = []
+		self._block_start_ns: Dict[int, int] = {}
+		self._blocks = 0
+		self._condition = threading.Condition()
+		self._stop = threading.Event()
+		self._thread: Optional[threading.Thread] = None
+		self._error: Optional[BaseException] = None
+		self._uses_blocks = any(event.block is not None for event in self.events)
+
+	def _on_block_start(self, block: int):
+		with self._condition:
+			self._block_start_ns[self._blocks] = core.get_hook_time_ns("block_start")
+			self._blocks += 1
+			self._condition.notify_all()
+
+	def _sleep_until(self, deadline_ns: int) -> bool:
+		"""
+		Wait until the deadline. Returns False when the sequencer was stopped.
+		"""
+		while True:
+			remaining = deadline_ns - time.monotonic_ns() - self.spin_ns
+			if remaining <= 0:
+				break
+			if self._stop.wait(remaining / 1e9):
+				return False
+		while time.monotonic_ns() < deadline_ns:
+			pass
+		return not self._stop.is_set()
+
+	def _block_start(self, block: int) -> Optional[int]:
+		with self._condition:
+			while block not in self._block_start_ns:
+				if self._stop.is_set():
+					return None
+				self._condition.wait(0.1)
+			return self._block_start_ns[block]
+
+	def _run(self, start_ns: int):
+		try:
+			for index, event in enumerate(self.events):
+				base_ns = start_ns
+				if event.block is not None:
+					base_ns = self._block_start(event.block)
+					if base_ns is None:
+						return
+				scheduled_ns = base_ns + int(event.time_s * 1e9)
+				if not self._sleep_until(scheduled_ns):
+					return
+				actual_ns = time.monotonic_ns()
+				self.output(self.drvno, event.states)
+				self.log.append(SequenceLogEntry(index, event.states, scheduled_ns, actual_ns, time.monotonic_ns()))
+		except BaseException as e:
+			self._error = e
+			core.logger.exception("Shutter sequence failed")
+
+	def start(self):
+		"""
+		Start the sequence. Times without block are counted from this call. Start the sequencer before the measurement when events are aligned to blocks.
+		"""
+		if self._thread is not None:
+			return
+		self.log = []
+		self._block_start_ns = {}
+		self._blocks = 0
+		self._error = None
+		self._stop.clear()
+		if self._uses_blocks:
+			core.add_hook_listener("block_start", self._on_block_start)
+		if self.switch_interval_s is not None:
+			self._previous_switch_interval = sys.getswitchinterval()
+			sys.setswitchinterval(self.switch_interval_s)
+		self._thread = threading.Thread(target=self._run, args=(time.monotonic_ns(),), name=f"stresing-sequencer-{self.drvno}", daemon=True)
+		self._thread.start()
+
+	def wait(self, timeout: Optional[float] = None) -> bool:
+		"""
+		Wait until all events are executed.
+
+		Args:
+			timeout (float, optional): Maximum time to wait in seconds. None waits forever.
+
+		Returns:
+			bool: True when the sequence is finished, False when the timeout expired.
+
+		Raises:
+			Exception: The error that stopped the sequence.
+		"""
+		if self._thread is not None:
+			self._thread.join(timeout)
+			if self._thread.is_alive():
+				return False
+		if self._error is not None:
+			raise self._error
+		return True
+
+	def stop(self):
+		"""
+		Stop the sequence. Events that were not executed yet are dropped.
+		"""
+		if self._thread is None:
+			return
+		self._stop.set()
+		with self._condition:
+			self._condition.notify_all()
+		self._thread.join()
+		self._thread = None
+		if self._uses_blocks:
+			core.remove_hook_listener("block_start", self._on_block_start)
+		if self._previous_switch_interval is not None:
+			sys.setswitchinterval(self._previous_switch_interval)
+			self._previous_switch_interval = None
+
+	def __enter__(self) -> "ShutterSequencer":
+		self.start()
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.stop()
+
+	def jitter(self) -> Dict[str, float]:
+		"""
+		Statistics of the deviation of the transitions from their deadlines.
+
+		Returns:
+			Dict[str, float]: "transitions", "mean_ns" of the signed deviation, "p50_ns", "p95_ns", "p99_ns" and "max_ns" of the absolute deviation and "mean_call_ns", the mean duration of the output call.
+		"""
+		errors = np.array([entry.error_ns for entry in self.log], dtype=np.float64)
+		if errors.size == 0:
+			return {"transitions": 0, "mean_ns": 0.0, "p50_ns": 0.0, "p95_ns": 0.0, "p99_ns": 0.0, "max_ns": 0.0, "mean_call_ns": 0.0}
+		percentiles = np.percentile(np.abs(errors), [50, 95, 99, 100])
+		calls = np.array([entry.done_ns - entry.actual_ns for entry in self.log], dtype=np.float64)
+		return {"transitions": int(errors.size), "mean_ns": float(errors.mean()), "p50_ns": float(percentiles[0]), "p95_ns": float(percentiles[1]), "p99_ns": float(percentiles[2]), "max_ns": float(percentiles[3]), "mean_call_ns": float(calls.mean())}
@@ -0,0 +1,152 @@
+## @file: stream.py
+# @brief: Run processing stages on every block while the measurement is running.
+# @details: A BlockStream listens to the block done hook and hands a zero-copy view of each finished block to a chain of stages in a worker thread, so the thread of the DLL is never blocked by processing.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import queue
+import threading
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import core
+
+__all__ = ["BlockStage", "BlockStream", "benchmark_stage"]
+
+class BlockStage:
+	"""
+	Base class of a processing stage of a BlockStream. Stages only need a process_block method, deriving from this class is optional.
+	"""
+	def process_block(self, block: int, data: np.ndarray) -> Optional[np.ndarray]:
+		"""
+		Process one finished block.
+
+		Args:
+			block (int): Block number.
+			data (numpy.ndarray): Block data with the shape (nos, camcnt, pixel). For the first stage this is a zero-copy view of the DLL buffer, it must not be kept after returning.
+
+		Returns:
+			Optional[numpy.ndarray]: Data for the next stage or None to pass data on unchanged.
+		"""
+		return None
+
+	def start(self):
+		"""
+		Called once when the stream is started, before the first block.
+		"""
+		pass
+
+	def finish(self):
+		"""
+		Called once when the stream is stopped, after the last block was processed.
+		"""
+		pass
+
+class BlockStream:
+	"""
+	Runs a chain of stages on every finished block of one board. Usage:
+
+		with stresing.BlockStream([stage1, stage2], drvno=0):
+			stresing.init_measurement()
+			stresing.start_measurement_blocking()
+	"""
+	def __init__(self, stages: Sequence[object], drvno: int = 0):
+		"""
+		Args:
+			stages (Sequence[object]): Objects with a process_block(block, data) method, see BlockStage. They are called in order and each stage gets the result of the previous one.
+			drvno (int): Board number.
+		"""
+		self.stages = list(stages)
+		self.drvno = drvno
+		self.blocks_processed = 0
+		self._queue: "queue.Queue[Optional[int]]" = queue.Queue()
+		self._thread: Optional[threading.Thread] = None
+
+	def _on_block_done(self, block: int):
+		self._queue.put(block)
+
+	def _run(self):
+		while True:
+			block = self._queue.get()
+			if block is None:
+				break
+			try:
+				self.process(block)
+			except Exception:
+				core.logger.exception(f"Processing block {block} of board {self.drvno} failed")
+
+	def process(self, block: int):
+		"""
+		Run all stages on one block. This is called by the worker thread for every finished block, it can also be called directly to reprocess a block after the measurement.
+
+		Args:
+			block (int): Block number.
+		"""
+		# In continuous mode the block counter may keep counting, the data of block n is always at n modulo nob.
+		block = block % core.settings.nob
+		data = core.get_block_array(self.drvno, block)
+		for stage in self.stages:
+			result = stage.process_block(block, data)
+			if result is not None:
+				data = result
+		self.blocks_processed += 1
+
+	def start(self):
+		"""
+		Call start of all stages, start the worker thread and listen to the block done hook. Call this before start_measurement_*.
+		"""
+		if self._thread is not None:
+			return
+		for stage in self.stages:
+			start = getattr(stage, "start", None)
+			if start is not None:
+				start()
+		self._thread = threading.Thread(target=self._run, name=f"stresing-block-stream-{self.drvno}", daemon=True)
+		self._thread.start()
+		core.add_hook_listener("block_done", self._on_block_done)
+
+	def stop(self):
+		"""
+		Stop listening to the hook, process all blocks that are still queued and call finish of all stages.
+		"""
+		if self._thread is None:
+			return
+		core.remove_hook_listener("block_done", self._on_block_done)
+		self._queue.put(None)
+		self._thread.join()
+		self._thread = None
+		for stage in self.stages:
+			finish = getattr(stage, "finish", None)
+			if finish is not None:
+				finish()
+
+	def __enter__(self) -> "BlockStream":
+		self.start()
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.stop()
+
+def benchmark_stage(stage: object, shape: Tuple[int, int, int], blocks: int = 20, seed: int = 0) -> Dict[str, float]:
+	"""
+	Measure how fast a stage processes blocks of random 16 bit data, to compare it with the block rate of a measurement, e.g. from plan. The stage is called like in a BlockStream, but finish is not called.
+
+	Args:
+		stage (object): Object with a process_block(block, data) method.
+		shape (Tuple[int, int, int]): Shape (nos, camcnt, pixel) of one block.
+		blocks (int): Number of blocks that are processed.
+		seed (int): Seed of the random data.
+
+	Returns:
+		Dict[str, float]: "seconds_per_block", "blocks_per_s", "samples_per_s" and "bytes_per_s" of the raw data.
+	"""
+	data = np.random.default_rng(seed).integers(0, 1 << 16, size=shape, dtype=np.uint16)
+	# The first block allocates the buffers of the stage.
+	stage.process_block(0, data)
+	start = time.perf_counter()
+	for block in range(blocks):
+		stage.process_block(block, data)
+	seconds = (time.perf_counter() - start) / blocks
+	return {"seconds_per_block": seconds, "blocks_per_s": 1 / seconds, "samples_per_s": shape[0] / seconds, "bytes_per_s": data.nbytes / seconds}
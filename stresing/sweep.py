@@ -0,0 +1,117 @@
+## @file: sweep.py
+# @brief: Sweeps of one setting with adaptive refinement.
+# @details: adaptive_sweep measures a coarse grid over a range of one setting and then adds points in the middle of the intervals where the reduced measurement changes most or bends most, until the point budget or the tolerance is reached. Flat regions get few points and steep regions get many.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Union
+
+import numpy as np
+
+from . import core
+
+__all__ = ["SweepResult", "adaptive_sweep"]
+
+@dataclass
+class SweepResult:
+	"""
+	Result of a sweep.
+
+	Attributes:
+		field (str): Name of the swept setting.
+		values (numpy.ndarray): Swept values in ascending order.
+		results (numpy.ndarray): Reduced measurement of each value with the shape (points,) for scalar reductions or (points, n).
+		order (numpy.ndarray): Values in the order they were measured.
+	"""
+	field: str
+	values: np.ndarray
+	results: np.ndarray
+	order: np.ndarray
+
+def _settings_owner(field: str, drvno: int):
+	"""
+	Find the structure that holds a setting: the camera_settings of the board or measurement_settings.
+	"""
+	if any(name == field for name, _ in core.camera_settings._fields_):
+		return core.settings.camera_settings[drvno]
+	if any(name == field for name, _ in core.measurement_settings._fields_) and field != "camera_settings":
+		return core.settings
+	raise ValueError(f"Unknown setting {field}")
+
+def _interval_scores(values: np.ndarray, results: np.ndarray) -> np.ndarray:
+	"""
+	Score each interval between neighbouring points by its length in normalized coordinates plus the curvature at its end points. Every component of the results is normalized by its range.
+	"""
+	x = (values - values[0]) / max(values[-1] - values[0], 1)
+	y = results.reshape(len(values), -1)
+	span = np.ptp(y, axis=0)
+	y = y / np.where(span > 0, span, 1)
+	dy = np.linalg.norm(np.diff(y, axis=0), axis=1)
+	scores = np.hypot(np.diff(x), dy)
+	if len(values) >= 3:
+		# Deviation of each inner point from the line through its neighbours.
+		t = ((x[1:-1] - x[:-2]) / (x[2:] - x[:-2]))[:, np.newaxis]
+		curvature = np.linalg.norm(y[1:-1] - (y[:-2] + t * (y[2:] - y[:-2])), axis=1)
+		scores[:-1] += curvature
+		scores[1:] += curvature
+	return scores
+
+def adaptive_sweep(field: str, start: int, stop: int, reduce: Callable[[int], Union[float, np.ndarray]], drvno: int = 0, initial_points: int = 9, max_points: int = 50, tolerance: Optional[float] = None, measure: Optional[Callable[[], None]] = None) -> SweepResult:
+	"""
+	Sweep one setting from start to stop with adaptive refinement. After each measurement, reduce is called to get the quantity of interest, for example one pixel with probe. The setting is restored at the end.
+
+	Args:
+		field (str): Name of a camera setting of the board, for example "stime" or "sec_in_10ns", or of a measurement setting.
+		start (int): First value.
+		stop (int): Last value.
+		reduce: Function that gets drvno and returns a number or a 1D array for several curves.
+		drvno (int): Board number.
+		initial_points (int): Number of points of the coarse grid, including start and stop.
+		max_points (int): Maximum number of measurements.
+		tolerance (float, optional): Stop when the score of every interval is below this value. The score is the length of the interval in coordinates where the swept range and the range of each result are 1, plus the deviation of its end points from the line through their neighbours. None only stops at max_points.
+		measure: Function that does one measurement. When None, init_measurement and start_measurement_blocking are called.
+
+	Returns:
+		SweepResult: All measured values and results.
+
+	Raises:
+		ValueError: If start and stop are equal or initial_points or max_points is less than 2.
+		Exception: If a DLL call returns a non-zero status (error), an exception is raised with the error message.
+	"""
+	owner = _settings_owner(field, drvno)
+	start, stop = sorted((int(start), int(stop)))
+	if start == stop:
+		raise ValueError(f"The sweep range of {field} is empty, start and stop are both {start}")
+	if initial_points < 2 or max_points < 2:
+		raise ValueError("initial_points and max_points must be at least 2")
+	initial_points = min(initial_points, max_points, stop - start + 1)
+	saved = getattr(owner, field)
+	order: List[int] = []
+	measured = {}
+	def measure_at(value: int):
+		setattr(owner, field, value)
+		if measure is None:
+			core.init_measurement()
+			core.start_measurement_blocking()
+		else:
+			measure()
+		measured[value] = np.asarray(reduce(drvno), dtype=np.float64)
+		order.append(value)
+	try:
+		for value in np.unique(np.round(np.linspace(start, stop, initial_points)).astype(np.int64)):
+			measure_at(int(value))
+		while len(order) < max_points:
+			values = np.array(sorted(measured), dtype=np.int64)
+			results = np.stack([measured[value] for value in values])
+			scores = _interval_scores(values.astype(np.float64), results)
+			# Intervals between adjacent integers can not be split.
+			scores[np.diff(values) < 2] = -1
+			interval = int(np.argmax(scores))
+			if scores[interval] < 0 or (tolerance is not None and scores[interval] < tolerance):
+				break
+			measure_at(int((values[interval] + values[interval + 1]) // 2))
+	finally:
+		setattr(owner, field, saved)
+	values = np.array(sorted(measured), dtype=np.int64)
+	return SweepResult(field, values, np.stack([measured[value] for value in values]), np.array(order, dtype=np.int64))
@@ -0,0 +1,269 @@
+## @file: timing.py
+# @brief: Host timestamps of blocks and analysis of the block rate and trigger jitter.
+# @details: The block start and block done hooks record time.monotonic_ns() into preallocated arrays. The analysis compares the measured intervals with the configured block timer.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import core
+
+__all__ = ["BTI_BTIMER", "BlockTimestamps", "timestamps_path", "expected_block_period_ns", "analyze_block_timing"]
+
+# bti_mode of the block timer. Only in this mode the block period is known in advance, see https://entwicklungsburo-stresing.github.io/structcamera__settings.html
+BTI_BTIMER = 4
+
+def timestamps_path(data_path: str, csv: bool = False) -> str:
+	"""
+	Get the file path of the timestamps that belong to a data file.
+
+	Args:
+		data_path (str): File path of the data.
+		csv (bool): True for a .csv file, False for .npz.
+
+	Returns:
+		str: data_path with ".timestamps.csv" or ".timestamps.npz" appended.
+	"""
+	return data_path + (".timestamps.csv" if csv else ".timestamps.npz")
+
+class BlockTimestamps:
+	"""
+	Host timestamps of every block with one row per block and board. The DLL calls the block hooks once for all boards, so the hooks fill the rows of all boards with the same time. Per board times can be recorded with record_done, e.g. by MultiBoardAcquisition.
+
+	Attributes:
+		boards (List[int]): Board numbers, the first axis of the arrays.
+		block (numpy.ndarray): int64 block number of each row.
+		start_ns (numpy.ndarray): int64 array with the shape (boards, rows), time.monotonic_ns() of the block start or -1.
+		done_ns (numpy.ndarray): int64 array with the shape (boards, rows), time.monotonic_ns() of the block done or -1.
+		epoch_offset_ns (int): time.time_ns() - time.monotonic_ns() at creation, add it to convert the timestamps to UNIX time.
+	"""
+	def __init__(self, boards: Optional[Sequence[int]] = None, capacity: Optional[int] = None):
+		"""
+		Args:
+			boards (Sequence[int], optional): Board numbers. When None, the boards selected by settings.board_sel are used.
+			capacity (int, optional): Number of preallocated rows. When None, settings.nob is used. The arrays grow when more blocks arrive, e.g. in continuous mode.
+		"""
+		self.boards = list(boards) if boards is not None else core.selected_boards()
+		self._row_of_board = {drvno: row for row, drvno in enumerate(self.boards)}
+		capacity = max(capacity if capacity is not None else core.settings.nob, 1)
+		self.block = np.full(capacity, -1, dtype=np.int64)
+		self.start_ns = np.full((len(self.boards), capacity), -1, dtype=np.int64)
+		self.done_ns = np.full((len(self.boards), capacity), -1, dtype=np.int64)
+		self.epoch_offset_ns = time.time_ns() - time.monotonic_ns()
+		self._started = 0
+		self._done = 0
+
+	def _ensure_capacity(self, rows: int):
+		if rows <= self.block.size:
+			return
+		capacity = max(rows, 2 * self.block.size)
+		grow = capacity - self.block.size
+		self.block = np.concatenate([self.block, np.full(grow, -1, dtype=np.int64)])
+		self.start_ns = np.concatenate([self.start_ns, np.full((len(self.boards), grow), -1, dtype=np.int64)], axis=1)
+		self.done_ns = np.concatenate([self.done_ns, np.full((len(self.boards), grow), -1, dtype=np.int64)], axis=1)
+
+	def _record_start(self, block: int, time_ns: int):
+		row = self._started
+		self._ensure_capacity(row + 1)
+		self.start_ns[:, row] = time_ns
+		self.block[row] = block
+		self._started += 1
+
+	def _record_done(self, block: int, time_ns: int):
+		row = self._done
+		self._ensure_capacity(row + 1)
+		self.done_ns[:, row] = time_ns
+		self.block[row] = block
+		self._done += 1
+
+	def _on_block_start(self, block: int):
+		self._record_start(block, core.get_hook_time_ns("block_start"))
+
+	def _on_block_done(self, block: int):
+		self._record_done(block, core.get_hook_time_ns("block_done"))
+
+	def record_done(self, drvno: int, row: int, block: int, time_ns: int):
+		"""
+		Record the done time of one block of one board.
+
+		Args:
+			drvno (int): Board number.
+			row (int): Row, the number of blocks since the start.
+			block (int): Block number.
+			time_ns (int): time.monotonic_ns() of the completion.
+		"""
+		self._ensure_capacity(row + 1)
+		self.done_ns[self._row_of_board[drvno], row] = time_ns
+		self.block[row] = block
+		self._done = max(self._done, row + 1)
+
+	def attach(self):
+		"""
+		Start recording with the block start and block done hooks.
+		"""
+		core.add_hook_listener("block_start", self._on_block_start)
+		core.add_hook_listener("block_done", self._on_block_done)
+
+	def detach(self):
+		"""
+		Stop recording.
+		"""
+		core.remove_hook_listener("block_start", self._on_block_start)
+		core.remove_hook_listener("block_done", self._on_block_done)
+
+	def __enter__(self) -> "BlockTimestamps":
+		self.attach()
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.detach()
+
+	@property
+	def rows(self) -> int:
+		"""
+		Number of recorded blocks.
+		"""
+		return max(self._started, self._done)
+
+	def as_dict(self) -> Dict[str, np.ndarray]:
+		"""
+		Get the recorded rows as arrays, e.g. to save them with numpy.savez next to the data.
+
+		Returns:
+			Dict[str, numpy.ndarray]: "board", "block", "start_ns", "done_ns" and "epoch_offset_ns".
+		"""
+		rows = self.rows
+		return {
+			"board": np.asarray(self.boards, dtype=np.int64),
+			"block": self.block[:rows].copy(),
+			"start_ns": self.start_ns[:, :rows].copy(),
+			"done_ns": self.done_ns[:, :rows].copy(),
+			"epoch_offset_ns": np.int64(self.epoch_offset_ns),
+		}
+
+	def save(self, path: str):
+		"""
+		Save the timestamps. Files ending with .csv are written as text with one line per block and board, with UNIX time in nanoseconds, everything else as .npz.
+
+		Args:
+			path (str): File path.
+		"""
+		data = self.as_dict()
+		if path.endswith(".csv"):
+			with open(path, "w") as f:
+				f.write("board,row,block,start_ns,done_ns,start_unix_ns,done_unix_ns\n")
+				for board_row, drvno in enumerate(data["board"]):
+					for row, block in enumerate(data["block"]):
+						start, done = data["start_ns"][board_row, row], data["done_ns"][board_row, row]
+						start_unix = start + self.epoch_offset_ns if start >= 0 else -1
+						done_unix = done + self.epoch_offset_ns if done >= 0 else -1
+						f.write(f"{drvno},{row},{block},{start},{done},{start_unix},{done_unix}\n")
+		else:
+			np.savez(path, **data)
+
+	def export(self, data_path: str, csv: bool = False) -> str:
+		"""
+		Save the timestamps next to a data file, see timestamps_path.
+
+		Args:
+			data_path (str): File path of the data.
+			csv (bool): Save as .csv instead of .npz.
+
+		Returns:
+			str: File path of the timestamps.
+		"""
+		path = timestamps_path(data_path, csv)
+		self.save(path)
+		return path
+
+	@classmethod
+	def from_events(cls, boards: Sequence[int], events: Sequence[Tuple[str, int, Optional[int]]], epoch_offset_ns: int) -> "BlockTimestamps":
+		"""
+		Create the timestamps from recorded hook calls, e.g. Recording.events.
+
+		Args:
+			boards (Sequence[int]): Board numbers.
+			events (Sequence[Tuple[str, int, Optional[int]]]): Name, time.monotonic_ns() and argument of every hook call.
+			epoch_offset_ns (int): time.time_ns() - time.monotonic_ns() of the recording.
+
+		Returns:
+			BlockTimestamps: Timestamps with one row per recorded block.
+		"""
+		blocks = sum(1 for name, _, _ in events if name == "block_start")
+		timestamps = cls(boards, capacity=max(blocks, 1))
+		timestamps.epoch_offset_ns = epoch_offset_ns
+		for name, time_ns, block in events:
+			if name == "block_start":
+				timestamps._record_start(block, time_ns)
+			elif name == "block_done":
+				timestamps._record_done(block, time_ns)
+		return timestamps
+
+	def analyze(self, drvno: Optional[int] = None) -> Dict[str, object]:
+		"""
+		Analyze the recorded done times of one board with analyze_block_timing and the configured block timer of that board.
+
+		Args:
+			drvno (int, optional): Board number, the first board when None.
+
+		Returns:
+			Dict[str, object]: See analyze_block_timing.
+		"""
+		drvno = self.boards[0] if drvno is None else drvno
+		return analyze_block_timing(self.done_ns[self._row_of_board[drvno], :self.rows], expected_block_period_ns(drvno))
+
+def expected_block_period_ns(drvno: int) -> Optional[int]:
+	"""
+	Get the configured block period of one board. It is only known when the block timer is used as block trigger.
+
+	Args:
+		drvno (int): Board number.
+
+	Returns:
+		Optional[int]: btime in nanoseconds when bti_mode is the block timer, otherwise None. btime is scaled with timer_resolution_mode.
+
+	Raises:
+		ValueError: If timer_resolution_mode has an unknown value.
+	"""
+	cs = core.settings.camera_settings[drvno]
+	if cs.bti_mode != BTI_BTIMER or cs.btime == 0:
+		return None
+	return int(cs.btime) * core.timer_resolution_ns(drvno)
+
+def analyze_block_timing(times_ns: np.ndarray, expected_period_ns: Optional[float] = None, outlier_factor: float = 1.5) -> Dict[str, object]:
+	"""
+	Analyze the intervals between consecutive blocks.
+
+	Args:
+		times_ns (numpy.ndarray): Timestamps of consecutive blocks in nanoseconds. Negative values mark missing timestamps and are ignored.
+		expected_period_ns (float, optional): Configured block period. When None, the median interval is used as reference.
+		outlier_factor (float): Intervals longer than outlier_factor times the reference period are reported as gaps.
+
+	Returns:
+		Dict[str, object]: "blocks", "mean_period_ns", "rate_hz", "reference_period_ns", "rate_error" (relative deviation of the mean from the expected period, None without expected period), "jitter_ns" (percentiles 50, 95, 99 and 100 of the absolute deviation from the reference period), "gap_indices" (index of the interval after which a gap was found), "gap_ns" and "missed_blocks" (estimated number of missed triggers).
+	"""
+	times = np.asarray(times_ns, dtype=np.int64)
+	times = times[times >= 0]
+	intervals = np.diff(times).astype(np.float64)
+	if intervals.size == 0:
+		return {"blocks": int(times.size), "mean_period_ns": None, "rate_hz": None, "reference_period_ns": expected_period_ns, "rate_error": None, "jitter_ns": {}, "gap_indices": np.empty(0, dtype=np.int64), "gap_ns": np.empty(0), "missed_blocks": 0}
+	mean_period = float(intervals.mean())
+	reference = float(expected_period_ns) if expected_period_ns else float(np.median(intervals))
+	deviation = np.abs(intervals - reference)
+	percentiles = np.percentile(deviation, [50, 95, 99, 100])
+	gaps = np.flatnonzero(intervals > outlier_factor * reference)
+	missed = int(np.maximum(np.rint(intervals[gaps] / reference) - 1, 0).sum()) if reference > 0 else 0
+	return {
+		"blocks": int(times.size),
+		"mean_period_ns": mean_period,
+		"rate_hz": 1e9 / mean_period if mean_period > 0 else None,
+		"reference_period_ns": reference,
+		"rate_error": (mean_period - expected_period_ns) / expected_period_ns if expected_period_ns else None,
+		"jitter_ns": {"p50": float(percentiles[0]), "p95": float(percentiles[1]), "p99": float(percentiles[2]), "max": float(percentiles[3])},
+		"gap_indices": gaps,
+		"gap_ns": intervals[gaps],
+		"missed_blocks": missed,
+	}
@@ -0,0 +1,302 @@
+## @file: trigger.py
+# @brief: Software event trigger with pre and post trigger windows.
+# @details: An EventTrigger stage evaluates a vectorized condition on all samples of every block and keeps only a window of samples around each hit: the samples before the hit come from a history of the previous samples, the samples after the hit are collected from the following blocks. Long measurements in continuous mode keep only the events instead of hours of baseline.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from . import core
+from .stream import BlockStage
+
+__all__ = ["TriggerEvent", "RoiThreshold", "MeanDeviation", "EventTrigger"]
+
+@dataclass
+class TriggerEvent:
+	"""
+	One captured event.
+
+	Attributes:
+		number (int): Number of the event, counted from 0.
+		block (int): Block of the hit.
+		sample (int): Sample of the hit in its block.
+		scan (int): Sample of the hit counted over all processed blocks.
+		first_scan (int): Scan of the first sample of data.
+		time_ns (int): time.monotonic_ns() of the block done hook of the block of the hit, 0 when the trigger was not started or the DLL has no hooks.
+		data (numpy.ndarray): Copy of the samples with the shape (samples, camcnt, pixel), the hit is at data[scan - first_scan].
+		complete (bool): False when the window was cut by the start or the end of the stream or by a skipped block.
+	"""
+	number: int
+	block: int
+	sample: int
+	scan: int
+	first_scan: int
+	time_ns: int
+	data: np.ndarray
+	complete: bool = True
+
+def _roi_signal(data: np.ndarray, camera: int, start: int, length: Optional[int]) -> np.ndarray:
+	"""
+	Sum of a pixel range of one camera for every sample.
+	"""
+	stop = data.shape[-1] if length is None else start + length
+	return data[:, camera, start:stop].sum(axis=1, dtype=np.int64)
+
+class RoiThreshold:
+	"""
+	Condition that is met when the sum of a pixel range of one camera is above or below a threshold.
+	"""
+	def __init__(self, start: int, length: int, threshold: float, camera: int = 0, above: bool = True):
+		"""
+		Args:
+			start (int): First pixel of the range.
+			length (int): Number of pixels of the range.
+			threshold (float): Threshold of the sum.
+			camera (int): Camera number.
+			above (bool): True triggers when the sum is above the threshold, False when it is below.
+		"""
+		self.start = start
+		self.length = length
+		self.threshold = threshold
+		self.camera = camera
+		self.above = above
+
+	def __call__(self, data: np.ndarray) -> np.ndarray:
+		signal = _roi_signal(data, self.camera, self.start, self.length)
+		return signal > self.threshold if self.above else signal < self.threshold
+
+class MeanDeviation:
+	"""
+	Condition that is met when the sum of a pixel range deviates from its running mean by more than sigma running standard deviations. The mean and the variance are exponential moving averages over the samples that did not trigger, so events do not shift the baseline. The samples of each block are compared with the statistics before the block.
+	"""
+	def __init__(self, sigma: float = 5.0, start: int = 0, length: Optional[int] = None, camera: int = 0, alpha: float = 0.001, warmup: int = 100):
+		"""
+		Args:
+			sigma (float): Threshold in standard deviations.
+			start (int): First pixel of the range.
+			length (int, optional): Number of pixels of the range. None for all pixels from start.
+			camera (int): Camera number.
+			alpha (float): Weight of one sample in the moving averages.
+			warmup (int): Number of samples that only update the statistics before the condition can be met.
+		"""
+		self.sigma = sigma
+		self.start = start
+		self.length = length
+		self.camera = camera
+		self.alpha = alpha
+		self.warmup = warmup
+		self.reset()
+
+	def reset(self):
+		"""
+		Forget the statistics.
+		"""
+		self.mean: Optional[float] = None
+		self.variance = 0.0
+		self.samples = 0
+
+	def __call__(self, data: np.ndarray) -> np.ndarray:
+		signal = _roi_signal(data, self.camera, self.start, self.length).astype(np.float64)
+		if self.mean is None:
+			self.mean = float(signal.mean())
+			self.variance = float(signal.var())
+		if self.samples >= self.warmup:
+			hits = np.abs(signal - self.mean) > self.sigma * np.sqrt(self.variance)
+		else:
+			hits = np.zeros(signal.shape, dtype=bool)
+		baseline = signal[~hits]
+		if baseline.size:
+			# Moving averages over all samples of the block at once: the weight of the block is that of baseline.size single updates.
+			weight = 1 - (1 - self.alpha) ** baseline.size
+			delta = baseline.mean() - self.mean
+			self.mean += weight * delta
+			self.variance = (1 - weight) * (self.variance + weight * delta * delta) + weight * baseline.var()
+			self.samples += baseline.size
+		return hits
+
+class EventTrigger(BlockStage):
+	"""
+	Stage for BlockStream that keeps windows of samples around the samples where a condition is met. Usage:
+
+		trigger = stresing.EventTrigger(stresing.RoiThreshold(500, 20, 100000), pre=50, post=200)
+		with stresing.BlockStream([trigger]):
+			stresing.init_measurement()
+			stresing.start_measurement_nonblocking()
+			...
+		for event in trigger.events:
+			print(event.block, event.sample, event.data.shape)
+
+	A hit starts an event with pre samples before and post samples after the hit. Further hits within holdoff samples after the hit do not start a new event. Windows span block boundaries in measurement order. The history of the last pre samples is copied after every block, so the stage works in continuous mode, where the DLL overwrites the blocks. The time of each block is recorded by a listener of the block done hook, which is added by start and removed by finish, so events get the time of their block also when the stream lags behind. BlockStream calls both, when the stage is used without a stream, use it as context manager or call start and finish.
+
+	Attributes:
+		events (List[TriggerEvent]): Completed events, at most max_events.
+		hits (int): Number of events that were started, including dropped ones.
+		dropped (int): Number of events that were dropped because max_events was reached.
+		scans (int): Number of processed samples.
+	"""
+	def __init__(self, condition: Callable[[np.ndarray], np.ndarray], pre: int = 0, post: int = 0, holdoff: Optional[int] = None, max_events: Optional[int] = None, callback: Optional[Callable[[TriggerEvent], None]] = None):
+		"""
+		Args:
+			condition: Function that gets the block data with the shape (nos, camcnt, pixel) and returns a bool array with the shape (nos,) that is True for the samples that trigger, for example RoiThreshold, MeanDeviation or a numpy expression.
+			pre (int): Number of samples before the hit that are kept.
+			post (int): Number of samples after the hit that are kept.
+			holdoff (int, optional): Minimum distance of two hits in samples. When None, it is post + 1, so windows do not overlap after the hit.
+			max_events (int, optional): Maximum number of stored events. Later events are counted as dropped.
+			callback: Function that is called with every completed event from the thread of the stream.
+		"""
+		if pre < 0 or post < 0:
+			raise ValueError("pre and post must not be negative")
+		self.condition = condition
+		self.pre = pre
+		self.post = post
+		self.holdoff = post + 1 if holdoff is None else max(holdoff, 1)
+		self.max_events = max_events
+		self.callback = callback
+		self._listening = False
+		self.reset()
+
+	def _on_block_done(self, block: int):
+		self._done_ns[block % core.settings.nob] = core.get_hook_time_ns("block_done")
+
+	def start(self):
+		"""
+		Called by BlockStream when it is started. Adds the hook listener that records the time of each block.
+		"""
+		if not self._listening:
+			try:
+				core.add_hook_listener("block_done", self._on_block_done)
+				self._listening = True
+			except AttributeError:
+				# The DLL does not provide hooks, the events get the time 0.
+				core.logger.debug("The DLL does not provide hooks, trigger events get the time 0")
+
+	def __enter__(self) -> "EventTrigger":
+		self.start()
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.finish()
+
+	def reset(self):
+		"""
+		Forget all events, the history and the pending windows.
+		"""
+		self.events: List[TriggerEvent] = []
+		self.hits = 0
+		self.dropped = 0
+		self.scans = 0
+		self._history: Optional[np.ndarray] = None
+		self._history_length = 0
+		self._pending: List[List] = []
+		self._next_allowed = 0
+		self._last_block: Optional[int] = None
+		# Block done time of each block number.
+		self._done_ns: Dict[int, int] = {}
+
+	def _complete(self, event: TriggerEvent):
+		if self.max_events is not None and len(self.events) >= self.max_events:
+			self.dropped += 1
+			return
+		self.events.append(event)
+		if self.callback is not None:
+			self.callback(event)
+
+	def _cut_pending(self):
+		"""
+		Complete all pending events with the samples they have.
+		"""
+		for event, filled in self._pending:
+			event.data = event.data[:filled]
+			event.complete = False
+			self._complete(event)
+		self._pending = []
+
+	def process_block(self, block: int, data: np.ndarray) -> None:
+		"""
+		Stage interface for BlockStream. Evaluates the condition, continues pending windows and starts new ones. The data is passed on unchanged.
+
+		Args:
+			block (int): Block number.
+			data (numpy.ndarray): Block data with the shape (nos, camcnt, pixel).
+		"""
+		nos = data.shape[0]
+		if self._history is None or self._history.shape[1:] != data.shape[1:]:
+			self._history = np.empty((self.pre,) + data.shape[1:], dtype=data.dtype)
+			self._history_length = 0
+		if self._last_block is not None and block != (self._last_block + 1) % core.settings.nob:
+			# A block was skipped, windows can not span the gap.
+			self._cut_pending()
+			self._history_length = 0
+		self._last_block = block
+		# Continue the windows of earlier blocks.
+		still_pending = []
+		for event, filled in self._pending:
+			length = min(event.data.shape[0] - filled, nos)
+			event.data[filled:filled + length] = data[:length]
+			filled += length
+			if filled == event.data.shape[0]:
+				self._complete(event)
+			else:
+				still_pending.append([event, filled])
+		self._pending = still_pending
+		hits = np.flatnonzero(self.condition(data))
+		time_ns = self._done_ns.get(block, 0)
+		position = 0
+		while position < hits.size:
+			# The first hit that is not suppressed by the holdoff of the previous one.
+			position += int(np.searchsorted(hits[position:], self._next_allowed - self.scans))
+			if position >= hits.size:
+				break
+			sample = int(hits[position])
+			scan = self.scans + sample
+			self._next_allowed = scan + self.holdoff
+			self.hits += 1
+			self._start_event(block, sample, scan, time_ns, data)
+		self._update_history(data)
+		self.scans += nos
+		return None
+
+	def _start_event(self, block: int, sample: int, scan: int, time_ns: int, data: np.ndarray):
+		if self.max_events is not None and len(self.events) + len(self._pending) >= self.max_events:
+			self.dropped += 1
+			return
+		# Samples before the hit from the history, then from the block.
+		from_block = min(sample, self.pre)
+		from_history = min(self.pre - from_block, self._history_length)
+		window = np.empty((from_history + from_block + 1 + self.post,) + data.shape[1:], dtype=data.dtype)
+		window[:from_history] = self._history[self._history_length - from_history:self._history_length]
+		available = min(data.shape[0] - (sample - from_block), window.shape[0] - from_history)
+		window[from_history:from_history + available] = data[sample - from_block:sample - from_block + available]
+		filled = from_history + available
+		event = TriggerEvent(self.hits - 1, block, sample, scan, scan - from_block - from_history, time_ns, window, from_history + from_block == self.pre)
+		if filled == window.shape[0]:
+			self._complete(event)
+		else:
+			self._pending.append([event, filled])
+
+	def _update_history(self, data: np.ndarray):
+		"""
+		Keep the last pre samples of the history and the block.
+		"""
+		if self.pre == 0:
+			return
+		if data.shape[0] >= self.pre:
+			self._history[:] = data[-self.pre:]
+			self._history_length = self.pre
+			return
+		keep = min(self._history_length, self.pre - data.shape[0])
+		self._history[:keep] = self._history[self._history_length - keep:self._history_length].copy()
+		self._history[keep:keep + data.shape[0]] = data
+		self._history_length = keep + data.shape[0]
+
+	def finish(self):
+		"""
+		Called by BlockStream when it is stopped. Windows that did not get all post samples are completed with the samples they have and the hook listener is removed.
+		"""
+		self._cut_pending()
+		if self._listening:
+			core.remove_hook_listener("block_done", self._on_block_done)
+			self._listening = False
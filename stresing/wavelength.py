@@ -0,0 +1,251 @@
+## @file: wavelength.py
+# @brief: Pixel to wavelength calibration and resampling onto uniform grids.
+# @details: A WavelengthCalibration maps the pixels of one camera to wavelengths with a polynomial or a lookup table. A WavelengthResampler precomputes for every point of a target grid the two neighbouring pixels and their linear interpolation weights, the rows of a sparse interpolation matrix, and applies them to whole blocks with two gathers.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from .stream import BlockStage
+
+__all__ = ["WavelengthCalibration", "WavelengthResampler"]
+
+# Size of the temporary arrays of WavelengthResampler.resample in bytes.
+_CHUNK_BYTES = 256 * 1024
+
+class WavelengthCalibration:
+	"""
+	Wavelength of every pixel of one camera in nm. Usage:
+
+		calibration = stresing.WavelengthCalibration.from_polynomial([400.0, 0.25, -1e-6], pixel=1024)
+		resampler = stresing.WavelengthResampler(calibration, grid=np.arange(420, 650, 0.5))
+
+	Attributes:
+		wavelengths (numpy.ndarray): float64 array with the wavelength of each pixel in nm. It must be strictly monotonic.
+	"""
+	def __init__(self, wavelengths: Sequence[float]):
+		"""
+		Args:
+			wavelengths (Sequence[float]): Lookup table with the wavelength of each pixel in nm.
+		"""
+		wavelengths = np.asarray(wavelengths, dtype=np.float64)
+		if wavelengths.ndim != 1 or wavelengths.size < 2:
+			raise ValueError("The lookup table must have one wavelength per pixel")
+		steps = np.diff(wavelengths)
+		if not (np.all(steps > 0) or np.all(steps < 0)):
+			raise ValueError("The wavelengths must be strictly monotonic")
+		self.wavelengths = wavelengths
+
+	@classmethod
+	def from_polynomial(cls, coefficients: Sequence[float], pixel: int) -> "WavelengthCalibration":
+		"""
+		Create a calibration from a polynomial of the pixel index.
+
+		Args:
+			coefficients (Sequence[float]): Coefficients in increasing order, wavelength = c0 + c1 * p + c2 * p**2 + ...
+			pixel (int): Number of pixels of the camera.
+
+		Returns:
+			WavelengthCalibration: The calibration.
+		"""
+		return cls(np.polynomial.polynomial.polyval(np.arange(pixel, dtype=np.float64), coefficients))
+
+	@classmethod
+	def fit(cls, pixels: Sequence[float], wavelengths: Sequence[float], pixel: int, degree: int = 2) -> "WavelengthCalibration":
+		"""
+		Fit a polynomial to the positions of known lines, for example centroids from peak_parameters.
+
+		Args:
+			pixels (Sequence[float]): Pixel positions of the lines.
+			wavelengths (Sequence[float]): Wavelengths of the lines in nm.
+			pixel (int): Number of pixels of the camera.
+			degree (int): Degree of the polynomial.
+
+		Returns:
+			WavelengthCalibration: The calibration.
+		"""
+		coefficients = np.polynomial.polynomial.polyfit(np.asarray(pixels, dtype=np.float64), np.asarray(wavelengths, dtype=np.float64), degree)
+		return cls.from_polynomial(coefficients, pixel)
+
+	@property
+	def pixel(self) -> int:
+		return self.wavelengths.size
+
+	def wavenumbers(self) -> np.ndarray:
+		"""
+		Wavenumber of each pixel in 1/cm.
+		"""
+		return 1e7 / self.wavelengths
+
+	def positions(self, grid: np.ndarray, unit: str = "nm") -> np.ndarray:
+		"""
+		Fractional pixel position of each grid point, NaN outside of the calibrated range.
+
+		Args:
+			grid (numpy.ndarray): Wavelengths in nm or wavenumbers in 1/cm.
+			unit (str): "nm" or "1/cm".
+
+		Returns:
+			numpy.ndarray: float64 array with the shape of grid.
+		"""
+		if unit == "nm":
+			axis = self.wavelengths
+		elif unit == "1/cm":
+			axis = self.wavenumbers()
+		else:
+			raise ValueError(f"Unknown unit {unit}, must be nm or 1/cm")
+		index = np.arange(axis.size, dtype=np.float64)
+		if axis[0] > axis[-1]:
+			axis, index = axis[::-1], index[::-1]
+		grid = np.asarray(grid, dtype=np.float64)
+		return np.interp(grid, axis, index, left=np.nan, right=np.nan)
+
+	def save(self, path: str):
+		"""
+		Save the lookup table as .npy file.
+		"""
+		np.save(path, self.wavelengths)
+
+	@classmethod
+	def load(cls, path: str) -> "WavelengthCalibration":
+		"""
+		Load a lookup table saved with save.
+		"""
+		return cls(np.load(path))
+
+class WavelengthResampler(BlockStage):
+	"""
+	Resamples spectra from pixels onto a uniform wavelength or wavenumber grid by linear interpolation. The two pixels and weights of every grid point are computed once, resampling a block is two gathers, two multiplications and one addition. Grid points outside of the calibrated range are set to fill_value.
+
+	As stage for BlockStream, every block is resampled into a float32 buffer with the shape (nos, camcnt, grid) that is reused for every block.
+
+	Attributes:
+		grid (numpy.ndarray): The target grid, read only. Setting a new grid recomputes the weights.
+		unit (str): Unit of the grid, "nm" or "1/cm". Setting a new unit recomputes the weights.
+	"""
+	def __init__(self, calibrations: Union[WavelengthCalibration, Sequence[WavelengthCalibration], Dict[int, WavelengthCalibration]], grid: Sequence[float], unit: str = "nm", fill_value: float = np.nan):
+		"""
+		Args:
+			calibrations: Calibration of each camera of the board, as sequence indexed by camera or dict with camera numbers as keys. One calibration is used for all cameras.
+			grid (Sequence[float]): Target grid in the unit.
+			unit (str): "nm" for wavelengths or "1/cm" for wavenumbers.
+			fill_value (float): Value of grid points outside of the calibrated range.
+		"""
+		if isinstance(calibrations, WavelengthCalibration):
+			self._shared = calibrations
+			calibrations = {}
+		else:
+			self._shared = None
+			if not isinstance(calibrations, dict):
+				calibrations = dict(enumerate(calibrations))
+		self.calibrations: Dict[int, WavelengthCalibration] = calibrations
+		self._weights: Optional[tuple] = None
+		self.grid = grid
+		self.unit = unit
+		self.fill_value = fill_value
+		self._gathered: Optional[np.ndarray] = None
+		self._buffer: Optional[np.ndarray] = None
+		self._scratch: Optional[np.ndarray] = None
+
+	@property
+	def grid(self) -> np.ndarray:
+		return self._grid
+
+	@grid.setter
+	def grid(self, grid: Sequence[float]):
+		# A copy that can not be changed in place, so the cached weights always belong to the grid.
+		self._grid = np.array(grid, dtype=np.float64)
+		self._grid.setflags(write=False)
+		self._weights = None
+
+	@property
+	def unit(self) -> str:
+		return self._unit
+
+	@unit.setter
+	def unit(self, unit: str):
+		self._unit = unit
+		self._weights = None
+
+	def weights(self, camcnt: int) -> tuple:
+		"""
+		Interpolation weights for all cameras: flat indices of the left and right pixel in a (camcnt, pixel) frame with the shape (camcnt, grid), their float32 weights and a mask of the grid points outside of the calibrated range.
+		"""
+		if self._weights is not None and self._weights[0].shape[0] == camcnt:
+			return self._weights
+		pixel = None
+		left = np.empty((camcnt, self.grid.size), dtype=np.intp)
+		weight = np.empty((camcnt, self.grid.size), dtype=np.float32)
+		outside = np.empty((camcnt, self.grid.size), dtype=bool)
+		for camera in range(camcnt):
+			calibration = self._shared if self._shared is not None else self.calibrations.get(camera)
+			if calibration is None:
+				raise ValueError(f"No calibration for camera {camera}")
+			if pixel is None:
+				pixel = calibration.pixel
+			elif calibration.pixel != pixel:
+				raise ValueError("All cameras must have the same number of pixels")
+			position = calibration.positions(self.grid, self.unit)
+			outside[camera] = np.isnan(position)
+			position = np.where(outside[camera], 0, position)
+			index = np.minimum(np.floor(position).astype(np.intp), pixel - 2)
+			left[camera] = camera * pixel + index
+			weight[camera] = position - index
+		self._weights = (left, left + 1, weight, 1 - weight, outside, pixel)
+		return self._weights
+
+	def resample(self, data: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+		"""
+		Resample spectra.
+
+		Args:
+			data (numpy.ndarray): Spectra with the shape (..., camcnt, pixel), for example one block.
+			out (numpy.ndarray, optional): float32 array with the shape (..., camcnt, grid) for the result.
+
+		Returns:
+			numpy.ndarray: The resampled spectra as float32 array with the shape (..., camcnt, grid).
+		"""
+		left, right, weight_right, weight_left, outside, pixel = self.weights(data.shape[-2])
+		if data.shape[-1] != pixel:
+			raise ValueError(f"The data has {data.shape[-1]} pixels, the calibration {pixel}")
+		frames = data.reshape(-1, data.shape[-2] * data.shape[-1])
+		shape = data.shape[:-1] + (self.grid.size,)
+		if out is None:
+			out = np.empty(shape, dtype=np.float32)
+		result = out.reshape(frames.shape[0], -1)
+		# Work on chunks of rows, so that the temporary arrays stay in the CPU cache.
+		rows = max(1, _CHUNK_BYTES // (result.shape[1] * 4))
+		if self._gathered is None or self._gathered.shape[1] != result.shape[1] or self._gathered.dtype != frames.dtype:
+			self._gathered = np.empty((rows, result.shape[1]), dtype=frames.dtype)
+			self._scratch = np.empty((rows, result.shape[1]), dtype=np.float32)
+		left, right, weight_left, weight_right = left.ravel(), right.ravel(), weight_left.ravel(), weight_right.ravel()
+		for start in range(0, frames.shape[0], rows):
+			stop = min(start + rows, frames.shape[0])
+			gathered, scratch = self._gathered[:stop - start], self._scratch[:stop - start]
+			np.take(frames[start:stop], left, axis=1, out=gathered)
+			# The conversion to float32 happens in the multiplication.
+			np.multiply(gathered, weight_left, out=result[start:stop])
+			np.take(frames[start:stop], right, axis=1, out=gathered)
+			np.multiply(gathered, weight_right, out=scratch)
+			result[start:stop] += scratch
+		if outside.any():
+			result[:, outside.ravel()] = self.fill_value
+		return out
+
+	def process_block(self, block: int, data: np.ndarray) -> np.ndarray:
+		"""
+		Stage interface for BlockStream.
+
+		Args:
+			block (int): Block number.
+			data (numpy.ndarray): Block data with the shape (nos, camcnt, pixel).
+
+		Returns:
+			numpy.ndarray: The resampled block. It is overwritten by the next block.
+		"""
+		shape = data.shape[:-1] + (self.grid.size,)
+		if self._buffer is None or self._buffer.shape != shape:
+			self._buffer = np.empty(shape, dtype=np.float32)
+		return self.resample(data, out=self._buffer)
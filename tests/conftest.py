@@ -0,0 +1,121 @@
+## @file: conftest.py
+# @brief: Fixtures of the tests.
+# @details: The tests run without hardware. When the ESLSCDLL library can not be loaded, stresing is imported with a placeholder library that only initializes the settings structure and accepts the hooks. Measurements are played back from synthetic recordings with ReplayDLL.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import base64
+import ctypes
+import json
+from typing import Optional
+from unittest import mock
+
+import numpy as np
+import pytest
+
+class _Function:
+	"""
+	Callable with the argtypes and restype attributes of a ctypes function, which are ignored.
+	"""
+	def __init__(self, function):
+		self.function = function
+		self.argtypes = None
+		self.restype = None
+
+	def __call__(self, *args):
+		return self.function(*args)
+
+class _PlaceholderLibrary:
+	"""
+	Stands in for ESLSCDLL when it is not installed. The settings keep their zero values and the hooks are accepted, so ReplayDLL can be installed with set_dll and removed again. All other functions do not exist.
+	"""
+	def __getattr__(self, name: str) -> _Function:
+		if name == "DLLInitSettingsStruct" or (name.startswith("DLLSet") and name.endswith("Hook")):
+			function = _Function(lambda *args: 0)
+			setattr(self, name, function)
+			return function
+		raise AttributeError(f"{name} needs the ESLSCDLL library")
+
+try:
+	import stresing
+except (ImportError, OSError):
+	with mock.patch("ctypes.CDLL", lambda *args, **kwargs: _PlaceholderLibrary()), mock.patch("ctypes.WinDLL", lambda *args, **kwargs: _PlaceholderLibrary(), create=True), mock.patch("ctypes.util.find_library", lambda name: name):
+		import stresing
+
+from stresing import core, replay
+
+@pytest.fixture(autouse=True)
+def restore_settings():
+	"""
+	Restore stresing.settings after every test, so tests can change the settings freely.
+	"""
+	saved = bytes(core.settings)
+	yield core.settings
+	ctypes.memmove(ctypes.addressof(core.settings), saved, len(saved))
+
+def set_block_shape(ms: core.measurement_settings, nos: int, nob: int, camcnt: int = 1, pixel: int = 64, drvno: int = 0):
+	"""
+	Select one board and set the shape of its data buffer.
+	"""
+	ms.board_sel = 1 << drvno
+	ms.nos = nos
+	ms.nob = nob
+	ms.camera_settings[drvno].camcnt = camcnt
+	ms.camera_settings[drvno].pixel = pixel
+
+def write_recording(path: str, blocks: np.ndarray, nob: Optional[int] = None) -> str:
+	"""
+	Write a recording of board 0 like Recorder does.
+
+	Args:
+		path (str): File path of the recording.
+		blocks (numpy.ndarray): uint16 array with the shape (records, nos, camcnt, pixel), one record per block done.
+		nob (int, optional): Number of blocks of the measurement. When None, every record is one block. With fewer blocks than records, the measurement is continuous.
+
+	Returns:
+		str: The path.
+	"""
+	records, nos, camcnt, pixel = blocks.shape
+	nob = records if nob is None else nob
+	ms = core.measurement_settings.from_buffer_copy(core.settings)
+	set_block_shape(ms, nos, nob, camcnt, pixel)
+	ms.contiuous_measurement = int(records > nob)
+	# One block takes 1 ms.
+	events = [["measure_start", 0, None]]
+	for record in range(records):
+		events.append(["block_start", record * 1000000 + 1000, record % nob])
+		events.append(["block_done", (record + 1) * 1000000, record % nob])
+	events.append(["measure_done", records * 1000000 + 1000, None])
+	trailer = {
+		"version": replay.RECORDING_VERSION,
+		"settings": base64.b64encode(bytes(ms)).decode(),
+		"boards": [0],
+		"nob": nob,
+		"block_shape": {"0": [nos, camcnt, pixel]},
+		"records": [record % nob for record in range(records)],
+		"events": events,
+		"epoch_offset_ns": 0,
+	}
+	with open(path, "wb") as f:
+		f.write(replay._HEADER.pack(replay._MAGIC, replay.RECORDING_VERSION, 0))
+		f.write(np.ascontiguousarray(blocks, dtype=np.uint16).tobytes())
+		offset = f.tell()
+		f.write(json.dumps(trailer).encode())
+		f.write(replay._FOOTER.pack(offset, replay._MAGIC))
+	return path
+
+@pytest.fixture
+def start_replay(tmp_path):
+	"""
+	Function that writes a recording of the given blocks and installs a ReplayDLL for it, which plays as fast as possible. The backend is uninstalled after the test.
+	"""
+	backends = []
+	def start(blocks: np.ndarray, nob: Optional[int] = None) -> stresing.ReplayDLL:
+		path = write_recording(str(tmp_path / f"run{len(backends)}.rec"), blocks, nob)
+		backend = stresing.ReplayDLL(stresing.Recording(path), speed=None)
+		backend.install()
+		backends.append(backend)
+		return backend
+	yield start
+	for backend in reversed(backends):
+		backend.uninstall()
@@ -0,0 +1,44 @@
+## @file: test_bands.py
+# @brief: Tests of BandIntegrator and ColumnStore.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import numpy as np
+import pytest
+
+import stresing
+
+def test_band_integrator_matches_plain_sum():
+	rng = np.random.default_rng(0)
+	# Enough samples for several chunks of the integrator.
+	data = rng.integers(0, 65536, size=(3000, 2, 64), dtype=np.uint16)
+	weights = np.linspace(0.5, 1.5, 8)
+	bands = [(10, 20), (25, 10), stresing.Band(40, 8, weights=weights), stresing.Band(0, 64, camera=1, name="full")]
+	integrator = stresing.BandIntegrator(bands)
+	result = integrator.integrate(data)
+	values = data.astype(np.float64)
+	expected = np.stack([
+		values[:, 0, 10:30].sum(axis=1),
+		values[:, 0, 25:35].sum(axis=1),
+		values[:, 0, 40:48] @ weights,
+		values[:, 1, :].sum(axis=1),
+	], axis=1)
+	assert result.dtype == np.float32
+	np.testing.assert_allclose(result, expected, rtol=1e-6)
+
+def test_band_integrator_stores_rows_of_each_block():
+	integrator = stresing.BandIntegrator([(0, 4)], capacity=1)
+	data = np.ones((5, 1, 8), dtype=np.uint16)
+	for block in range(3):
+		integrator.process_block(block, data * (block + 1))
+	result = integrator.result()
+	np.testing.assert_array_equal(result["block"], np.repeat(np.arange(3), 5))
+	np.testing.assert_array_equal(result["sample"], np.tile(np.arange(5), 3))
+	np.testing.assert_array_equal(result["band0"], np.repeat([4.0, 8.0, 12.0], 5))
+
+def test_band_integrator_rejects_bands_outside_of_the_sensor():
+	integrator = stresing.BandIntegrator([(60, 10)])
+	with pytest.raises(ValueError):
+		integrator.integrate(np.zeros((1, 1, 64), dtype=np.uint16))
+	with pytest.raises(ValueError):
+		stresing.BandIntegrator([(0, 4, 0), stresing.Band(4, 4, name="block")])
@@ -0,0 +1,57 @@
+## @file: test_correction.py
+# @brief: Tests of Correction.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import numpy as np
+import pytest
+
+import stresing
+
+from .conftest import set_block_shape
+
+@pytest.fixture
+def shape(restore_settings):
+	set_block_shape(restore_settings, nos=5, nob=1, camcnt=2, pixel=16)
+	return (5, 2, 16)
+
+def test_dark_and_flat_correction(shape):
+	rng = np.random.default_rng(0)
+	dark = rng.uniform(90, 110, size=shape[1:])
+	sensitivity = rng.uniform(0.5, 1.5, size=shape[1:])
+	flat = dark + 1000 * sensitivity
+	correction = stresing.Correction().load(dark=dark, flat=flat)
+	signal = rng.uniform(0, 2000, size=shape)
+	raw = np.rint(dark + signal * sensitivity).astype(np.uint16)
+	expected = (raw - dark) / sensitivity * sensitivity.mean(axis=-1, keepdims=True)
+	np.testing.assert_allclose(correction.apply(raw), expected, rtol=1e-4, atol=1e-2)
+
+def test_flat_response_is_measured_against_the_background(shape):
+	background = np.full(shape[1:], 300.0)
+	flat = background + 500 + 50 * np.arange(shape[2])
+	correction = stresing.Correction().load(dark=np.full(shape[1:], 100.0), background=background, flat=flat)
+	corrected = correction.apply(np.broadcast_to(flat, shape).astype(np.uint16))
+	np.testing.assert_allclose(corrected, 875.0, rtol=1e-5)
+
+def test_apply_keeps_the_input(shape):
+	block = np.full(shape, 200, dtype=np.float32)
+	correction = stresing.Correction().load(dark=np.full(shape[1:], 100.0))
+	corrected = correction.apply(block)
+	assert corrected is not block
+	np.testing.assert_array_equal(block, 200)
+	np.testing.assert_array_equal(corrected, 100)
+	assert correction.apply(block, out=block) is block
+	np.testing.assert_array_equal(block, 100)
+
+def test_frames_follow_the_settings_fingerprint(shape, restore_settings):
+	cs = restore_settings.camera_settings[0]
+	cs.stime = 100
+	correction = stresing.Correction().load(dark=np.full(shape[1:], 100.0))
+	cs.stime = 200
+	with pytest.raises(ValueError):
+		correction.apply(np.zeros(shape, dtype=np.uint16))
+	correction.load(dark=np.full(shape[1:], 150.0))
+	cs.stime = 100
+	np.testing.assert_array_equal(correction.apply(np.full(shape, 300, dtype=np.uint16)), 200)
+	cs.stime = 200
+	np.testing.assert_array_equal(correction.apply(np.full(shape, 300, dtype=np.uint16)), 150)
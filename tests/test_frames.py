@@ -0,0 +1,34 @@
+## @file: test_frames.py
+# @brief: Tests of frame_view and FrameAssembler.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import numpy as np
+
+import stresing
+
+from .conftest import set_block_shape
+
+def test_frame_assembler_completes_frames_across_blocks(restore_settings):
+	set_block_shape(restore_settings, nos=10, nob=3, camcnt=2, pixel=8)
+	rng = np.random.default_rng(0)
+	blocks = rng.integers(0, 65536, size=(3, 10, 2, 8), dtype=np.uint16)
+	assembler = stresing.FrameAssembler(lines=4, camera=1)
+	for block, data in enumerate(blocks):
+		assembler.process_block(block, data)
+	assembler.finish()
+	frames = np.concatenate([batch.data for batch in assembler.batches(timeout=0)])
+	# 30 samples make 7 frames of 4 lines.
+	samples = blocks.reshape(30, 2, 8)[:28, 1]
+	np.testing.assert_array_equal(frames, samples.reshape(7, 4, 8))
+	assert assembler.frames_assembled == 7
+
+def test_frame_assembler_discards_frames_of_skipped_blocks(restore_settings):
+	set_block_shape(restore_settings, nos=6, nob=4, pixel=8)
+	assembler = stresing.FrameAssembler(lines=4)
+	data = np.zeros((6, 1, 8), dtype=np.uint16)
+	assembler.process_block(0, data)
+	assembler.process_block(2, data)
+	assembler.finish()
+	assert assembler.lines_discarded == 2
+	assert assembler.frames_assembled == 2
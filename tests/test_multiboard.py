@@ -0,0 +1,53 @@
+## @file: test_multiboard.py
+# @brief: Tests of MultiBoardAcquisition with a scripted scan counter.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import itertools
+
+import numpy as np
+
+import stresing
+from stresing import core
+
+from .conftest import set_block_shape
+
+def _script(monkeypatch, positions):
+	"""
+	Replace the scan counter of all boards by a sequence of (sample, block) positions that stays at the last one, and the measurement functions by no-ops.
+	"""
+	counters = {}
+	def get_current_scan_number(drvno):
+		counter = counters.setdefault(drvno, itertools.chain(positions, itertools.repeat(positions[-1])))
+		return next(counter)
+	monkeypatch.setattr(core, "get_current_scan_number", get_current_scan_number)
+	monkeypatch.setattr(core, "start_measurement_nonblocking", lambda: None)
+	monkeypatch.setattr(core, "get_block_array", lambda drvno, block: np.full((core.settings.nos, 1, 4), drvno, dtype=np.uint16))
+
+def test_continuous_measurement_with_one_block(monkeypatch, restore_settings):
+	set_block_shape(restore_settings, nos=4, nob=1, pixel=4)
+	restore_settings.contiuous_measurement = 1
+	# Every cycle writes block 0 again, only the sample counter goes back.
+	_script(monkeypatch, [(0, 0), (3, 0), (1, 0), (3, 0), (2, 0), (3, 0), (0, 0), (3, 0)])
+	acquisition = stresing.MultiBoardAcquisition(boards=[0, 1], poll_interval=0)
+	cycles = []
+	for bundle in acquisition.run(init=False, timeout=1):
+		assert bundle.block == 0
+		assert sorted(bundle.data) == [0, 1]
+		np.testing.assert_array_equal(bundle.data[1], 1)
+		cycles.append(bundle.cycle)
+		if len(cycles) == 4:
+			acquisition.stop()
+	assert cycles == [0, 1, 2, 3]
+	assert acquisition.skew_statistics()["blocks"] == 4
+
+def test_blocks_are_delivered_when_all_boards_completed_them(monkeypatch, restore_settings):
+	set_block_shape(restore_settings, nos=2, nob=3, pixel=4)
+	restore_settings.contiuous_measurement = 0
+	_script(monkeypatch, [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2), (1, 2)])
+	timestamps = stresing.BlockTimestamps(boards=[0, 1])
+	acquisition = stresing.MultiBoardAcquisition(boards=[0, 1], poll_interval=0, timestamps=timestamps)
+	bundles = list(acquisition.run(init=False, timeout=1))
+	assert [bundle.block for bundle in bundles] == [0, 1, 2]
+	assert timestamps.rows == 3
+	np.testing.assert_array_equal(timestamps.done_ns[:, :3], [[bundle.completed_ns[drvno] for bundle in bundles] for drvno in (0, 1)])
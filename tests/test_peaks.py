@@ -0,0 +1,39 @@
+## @file: test_peaks.py
+# @brief: Tests of peak_parameters and PeakTracker.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import numpy as np
+import pytest
+
+import stresing
+
+def _gaussian(centers: np.ndarray, pixel: int = 64, sigma: float = 2.0) -> np.ndarray:
+	x = np.arange(pixel)
+	return 100 + 1000 * np.exp(-0.5 * ((x - centers[:, np.newaxis]) / sigma) ** 2)
+
+def test_peak_parameters_of_gaussian():
+	centers = np.array([20.0, 31.5, 40.25])
+	spectra = _gaussian(centers)
+	centroid, height, fwhm = stresing.peak_parameters(spectra)
+	np.testing.assert_allclose(centroid, centers, atol=1e-3)
+	np.testing.assert_allclose(height, spectra.max(axis=1) - spectra.min(axis=1), rtol=1e-6)
+	# The FWHM of a gaussian is 2.355 sigma. The sampled maximum and the linear interpolation of the crossings widen it slightly.
+	np.testing.assert_allclose(fwhm, 2.355 * 2.0, rtol=0.05)
+
+def test_peak_tracker_follows_peak():
+	tracker = stresing.PeakTracker([(8, 20)], follow=True)
+	for block, center in enumerate([18.0, 22.0, 26.0]):
+		spectra = _gaussian(np.full(4, center)).astype(np.uint16)[:, np.newaxis, :]
+		tracker.process_block(block, spectra)
+	result = tracker.result()
+	np.testing.assert_allclose(result["centroid"][:, 0], np.repeat([18.0, 22.0, 26.0], 4), atol=0.05)
+	np.testing.assert_array_equal(result["window_start"][:, 0], [8, 8, 12])
+	np.testing.assert_array_equal(result["block"], np.repeat(np.arange(3), 4))
+
+def test_peak_tracker_checks_windows():
+	with pytest.raises(ValueError):
+		stresing.PeakTracker([(0, 0)])
+	tracker = stresing.PeakTracker([(60, 10)])
+	with pytest.raises(ValueError):
+		tracker.process_block(0, np.zeros((1, 1, 64), dtype=np.uint16))
@@ -0,0 +1,55 @@
+## @file: test_pixel_health.py
+# @brief: Tests of PixelHealth.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import numpy as np
+
+import stresing
+
+def _ramp(samples: int = 8, pixel: int = 32) -> np.ndarray:
+	"""
+	Samples of two cameras with a linear ramp and some noise, so no pixel is stuck.
+	"""
+	rng = np.random.default_rng(0)
+	ramp = 1000 + 10 * np.arange(pixel)
+	return (ramp + rng.integers(-2, 3, size=(samples, 2, pixel))).astype(np.uint16)
+
+def test_pixel_health_flags_defective_pixels():
+	data = _ramp()
+	data[:, 0, 10] = 5000
+	data[:, 0, 20] = 0
+	data[:, 1, 5] = 65535
+	health = stresing.PixelHealth(min_samples=1000)
+	health.update(data)
+	assert health.flags[0, 10] & stresing.PIXEL_OUTLIER
+	assert health.flags[0, 20] & stresing.PIXEL_DEAD
+	assert health.flags[1, 5] & stresing.PIXEL_SATURATED
+	counts = health.counts()
+	assert counts["total"] == 3
+	assert counts["stuck"] == 0
+
+def test_pixel_health_flags_stuck_pixels():
+	data = _ramp(samples=16)
+	data[:, 1, 7] = 1070
+	health = stresing.PixelHealth(min_samples=16)
+	health.update(data)
+	assert np.array_equal(np.argwhere(health.flags & stresing.PIXEL_STUCK), [[1, 7]])
+
+def test_pixel_health_repairs_by_interpolation():
+	data = _ramp()
+	data[:, 0, 10] = 5000
+	data[:, 0, 11] = 5000
+	data[:, 1, 0] = 60000
+	health = stresing.PixelHealth(min_samples=1000, repair=True)
+	repaired = health.process_block(0, data)
+	expected = data.astype(np.float64)
+	# Two adjacent pixels are interpolated between pixel 9 and 12, the first pixel is copied from pixel 1.
+	expected[:, 0, 10] = expected[:, 0, 9] * 2 / 3 + expected[:, 0, 12] / 3
+	expected[:, 0, 11] = expected[:, 0, 9] / 3 + expected[:, 0, 12] * 2 / 3
+	expected[:, 1, 0] = expected[:, 1, 1]
+	assert repaired.dtype == data.dtype
+	np.testing.assert_allclose(repaired, np.rint(expected), atol=1)
+	assert (data[:, 0, 10] == 5000).all()
+	good = ~health.mask
+	np.testing.assert_array_equal(repaired[:, good], data[:, good])
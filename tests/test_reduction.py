@@ -0,0 +1,58 @@
+## @file: test_reduction.py
+# @brief: Tests of SampleReducer and RepeatAccumulator.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import numpy as np
+import pytest
+
+import stresing
+
+def test_sample_reducer_groups_span_blocks():
+	rng = np.random.default_rng(0)
+	blocks = rng.integers(0, 65536, size=(3, 10, 2, 17), dtype=np.uint16)
+	reducer = stresing.SampleReducer(samples_per_sum=4, pixel_binning=3)
+	for block, data in enumerate(blocks):
+		reducer.process_block(block, data)
+	# 30 samples make 7 complete groups, the last 2 pixels do not fill a bin.
+	samples = blocks.reshape(30, 2, 17).astype(np.uint64)
+	expected = samples[:28].reshape(7, 4, 2, 17).sum(axis=1)[..., :15].reshape(7, 2, 5, 3).sum(axis=-1)
+	result = reducer.result()
+	assert result.dtype == np.uint32
+	np.testing.assert_array_equal(result, expected)
+
+def test_sample_reducer_rejects_invalid_factors():
+	with pytest.raises(ValueError):
+		stresing.SampleReducer(samples_per_sum=0)
+	with pytest.raises(ValueError):
+		stresing.SampleReducer(pixel_binning=0)
+
+@pytest.mark.parametrize("dtype", [np.uint32, np.float64])
+def test_repeat_accumulator_matches_numpy(dtype):
+	rng = np.random.default_rng(1)
+	repeats = rng.integers(0, 65536, size=(20, 2, 3, 1, 8), dtype=np.uint16)
+	accumulator = stresing.RepeatAccumulator(dtype=dtype)
+	for data in repeats:
+		accumulator.add(data)
+	assert accumulator.count == 20
+	np.testing.assert_array_equal(accumulator.sum(), repeats.sum(axis=0, dtype=np.uint64))
+	np.testing.assert_allclose(accumulator.mean(), repeats.mean(axis=0), rtol=1e-12)
+	np.testing.assert_allclose(accumulator.std(), repeats.std(axis=0), rtol=1e-7)
+	np.testing.assert_allclose(accumulator.std(ddof=1), repeats.std(axis=0, ddof=1), rtol=1e-7)
+
+def test_repeat_accumulator_widens_uint32_sum():
+	accumulator = stresing.RepeatAccumulator(dtype=np.uint32)
+	data = np.full((1, 1, 1, 2), 65535, dtype=np.uint16)
+	# 65538 full scale repeats overflow uint32.
+	for _ in range(65538):
+		accumulator.add(data)
+	assert accumulator.sum().dtype == np.uint64
+	np.testing.assert_array_equal(accumulator.sum(), 65535 * 65538)
+	np.testing.assert_array_equal(accumulator.mean(), 65535.0)
+	np.testing.assert_array_equal(accumulator.std(), 0.0)
+
+def test_repeat_accumulator_rejects_shape_change():
+	accumulator = stresing.RepeatAccumulator()
+	accumulator.add(np.zeros((1, 2, 1, 4), dtype=np.uint16))
+	with pytest.raises(ValueError):
+		accumulator.add(np.zeros((1, 3, 1, 4), dtype=np.uint16))
@@ -0,0 +1,56 @@
+## @file: test_replay.py
+# @brief: Tests of the replay backend and of BlockStream with replayed measurements.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import numpy as np
+import pytest
+
+import stresing
+from stresing import core
+
+def _blocks(records: int = 3, nos: int = 12, camcnt: int = 2, pixel: int = 32) -> np.ndarray:
+	rng = np.random.default_rng(0)
+	return rng.integers(0, 65536, size=(records, nos, camcnt, pixel), dtype=np.uint16)
+
+def test_replay_delivers_the_recorded_data(start_replay):
+	blocks = _blocks()
+	start_replay(blocks)
+	assert core.settings.nob == 3 and core.settings.nos == 12
+	stresing.init_measurement()
+	stresing.start_measurement_blocking()
+	np.testing.assert_array_equal(stresing.get_all_data_array(0), blocks)
+	np.testing.assert_array_equal(stresing.get_block_array(0, 1), blocks[1])
+
+def test_replay_rejects_other_settings(start_replay):
+	start_replay(_blocks())
+	core.settings.nos = 13
+	with pytest.raises(Exception):
+		stresing.init_measurement()
+
+def test_block_stream_runs_stages_on_every_block(start_replay):
+	blocks = _blocks()
+	start_replay(blocks)
+	reducer = stresing.SampleReducer(samples_per_sum=5, pixel_binning=4)
+	integrator = stresing.BandIntegrator([(0, 8), (4, 8, 1)])
+	stream = stresing.BlockStream([integrator, reducer])
+	with stream:
+		stresing.init_measurement()
+		stresing.start_measurement_blocking()
+	assert stream.blocks_processed == 3
+	samples = blocks.reshape(36, 2, 32).astype(np.uint64)
+	expected = samples[:35].reshape(7, 5, 2, 32).sum(axis=1).reshape(7, 2, 8, 4).sum(axis=-1)
+	np.testing.assert_array_equal(reducer.result(), expected)
+	bands = integrator.result()
+	np.testing.assert_array_equal(bands["block"], np.repeat(np.arange(3), 12))
+	np.testing.assert_allclose(bands["band1"], samples[:, 1, 4:12].sum(axis=1), rtol=1e-6)
+
+def test_repeat_accumulator_measures_repeats(start_replay):
+	blocks = _blocks(records=2)
+	start_replay(blocks)
+	stresing.init_measurement()
+	accumulator = stresing.RepeatAccumulator(dtype=np.uint32)
+	accumulator.measure(3)
+	assert accumulator.count == 3
+	np.testing.assert_array_equal(accumulator.mean(), blocks)
+	np.testing.assert_array_equal(accumulator.std(), 0)
@@ -0,0 +1,27 @@
+## @file: test_sweep.py
+# @brief: Tests of adaptive_sweep.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import numpy as np
+import pytest
+
+import stresing
+
+def test_sweep_refines_the_step(restore_settings):
+	cs = restore_settings.camera_settings[0]
+	cs.stime = 7
+	result = stresing.adaptive_sweep("stime", 0, 100, lambda drvno: float(restore_settings.camera_settings[drvno].stime >= 43), initial_points=5, max_points=20, measure=lambda: None)
+	assert cs.stime == 7
+	assert len(result.order) <= 20
+	assert 42 in result.values and 43 in result.values
+	np.testing.assert_array_equal(result.results, (result.values >= 43).astype(float))
+
+@pytest.mark.parametrize("start, stop, initial_points, max_points", [(50, 50, 9, 50), (0, 100, 1, 50), (0, 100, 9, 1)])
+def test_sweep_rejects_invalid_ranges(restore_settings, start, stop, initial_points, max_points):
+	with pytest.raises(ValueError):
+		stresing.adaptive_sweep("stime", start, stop, lambda drvno: 0.0, initial_points=initial_points, max_points=max_points, measure=lambda: None)
+
+def test_sweep_rejects_unknown_settings():
+	with pytest.raises(ValueError):
+		stresing.adaptive_sweep("no_such_setting", 0, 10, lambda drvno: 0.0, measure=lambda: None)
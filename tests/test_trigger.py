@@ -0,0 +1,48 @@
+## @file: test_trigger.py
+# @brief: Tests of EventTrigger.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import numpy as np
+
+import stresing
+from stresing import core
+
+from .conftest import set_block_shape
+
+def _blocks(hits, blocks: int = 3, nos: int = 10) -> np.ndarray:
+	"""
+	Blocks whose sample number is stored in pixel 0, with a signal in pixel 1 at the scans in hits.
+	"""
+	data = np.zeros((blocks * nos, 1, 4), dtype=np.uint16)
+	data[:, 0, 0] = np.arange(blocks * nos)
+	data[hits, 0, 1] = 1000
+	return data.reshape(blocks, nos, 1, 4)
+
+def test_event_windows_span_blocks(restore_settings):
+	set_block_shape(restore_settings, nos=10, nob=3, pixel=4)
+	blocks = _blocks([12, 14, 19, 28])
+	trigger = stresing.EventTrigger(stresing.RoiThreshold(1, 1, 500), pre=3, post=4)
+	for block, data in enumerate(blocks):
+		trigger.process_block(block, data)
+	trigger.finish()
+	# The hit at 14 is within the holdoff of the hit at 12.
+	assert trigger.hits == 3
+	first, second, third = trigger.events
+	assert (first.block, first.sample, first.scan, first.complete) == (1, 2, 12, True)
+	np.testing.assert_array_equal(first.data[:, 0, 0], np.arange(9, 17))
+	assert (second.block, second.sample, second.first_scan, second.complete) == (1, 9, 16, True)
+	np.testing.assert_array_equal(second.data[:, 0, 0], np.arange(16, 24))
+	# The window of the last hit is cut at the end of the stream.
+	assert (third.scan, third.complete) == (28, False)
+	np.testing.assert_array_equal(third.data[:, 0, 0], np.arange(25, 30))
+
+def test_event_trigger_listens_only_while_started():
+	listeners = core._hook_listeners["block_done"]
+	count = len(listeners)
+	trigger = stresing.EventTrigger(stresing.RoiThreshold(1, 1, 500))
+	trigger.reset()
+	assert len(listeners) == count
+	with trigger:
+		assert len(listeners) == count + 1
+	assert len(listeners) == count
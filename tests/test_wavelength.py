@@ -0,0 +1,55 @@
+## @file: test_wavelength.py
+# @brief: Tests of WavelengthCalibration and WavelengthResampler.
+# @date: 19.10.2026
+# @copyright: Copyright (c) 2025, Entwicklungsbüro Stresing. Released under the LPGL-3.0.
+
+import numpy as np
+
+import stresing
+
+PIXEL = 128
+
+def _calibration() -> stresing.WavelengthCalibration:
+	return stresing.WavelengthCalibration.from_polynomial([400.0, 0.5, -2e-4], PIXEL)
+
+def _spectra() -> np.ndarray:
+	rng = np.random.default_rng(0)
+	return rng.integers(0, 65536, size=(6, 2, PIXEL), dtype=np.uint16)
+
+def _interp(spectra: np.ndarray, axis: np.ndarray, grid: np.ndarray) -> np.ndarray:
+	if axis[0] > axis[-1]:
+		axis, spectra = axis[::-1], spectra[..., ::-1]
+	flat = spectra.reshape(-1, spectra.shape[-1]).astype(np.float64)
+	result = np.stack([np.interp(grid, axis, row, left=np.nan, right=np.nan) for row in flat])
+	return result.reshape(spectra.shape[:-1] + (grid.size,))
+
+def test_resampler_matches_interp():
+	calibration = _calibration()
+	# The grid reaches beyond both ends of the calibration.
+	grid = np.linspace(390, 470, 301)
+	spectra = _spectra()
+	resampler = stresing.WavelengthResampler(calibration, grid)
+	result = resampler.resample(spectra)
+	assert result.shape == (6, 2, grid.size)
+	np.testing.assert_allclose(result, _interp(spectra, calibration.wavelengths, grid), rtol=1e-5, atol=1e-2)
+
+def test_resampler_wavenumbers_match_interp():
+	calibration = _calibration()
+	grid = np.linspace(21500, 24500, 200)
+	spectra = _spectra()
+	resampler = stresing.WavelengthResampler([calibration, calibration], grid, unit="1/cm")
+	np.testing.assert_allclose(resampler.resample(spectra), _interp(spectra, calibration.wavenumbers(), grid), rtol=1e-5, atol=1e-2)
+
+def test_resampler_recomputes_weights_after_grid_or_unit_change():
+	calibration = _calibration()
+	spectra = _spectra()
+	resampler = stresing.WavelengthResampler(calibration, np.linspace(410, 440, 50))
+	resampler.resample(spectra)
+	grid = np.linspace(420, 460, 80)
+	resampler.grid = grid
+	np.testing.assert_allclose(resampler.resample(spectra), _interp(spectra, calibration.wavelengths, grid), rtol=1e-5, atol=1e-2)
+	grid = np.linspace(21500, 24500, 80)
+	resampler.grid = grid
+	resampler.unit = "1/cm"
+	np.testing.assert_allclose(resampler.resample(spectra), _interp(spectra, calibration.wavenumbers(), grid), rtol=1e-5, atol=1e-2)
+	assert not resampler.grid.flags.writeable